@@ -1,15 +1,109 @@
 # app.py
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from typing import List, Union
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
-import io
 from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.pipeline.micro_batcher import MicroBatcher
+from src.entity.request_entity import PodcastEpisode, EpisodePrediction
+from src.constants import training_pipeline
+from src.utils.instrumentation import metrics_registry, profile_call, track
+from src.utils.model_registry import ModelRegistry
+from src.utils.data_schema import SchemaValidationError
+from src.exceptions import CustomException
+from src.logger import logging
 
-app = FastAPI()
 
-from fastapi.middleware.cors import CORSMiddleware
+model_registry = ModelRegistry()
+
+
+def load_latest_pipeline() -> PredictionPipeline:
+    # Models trained before the registry existed are served from the fixed saved_models/ and Artifacts/ paths
+    version = model_registry.latest_version()
+    return PredictionPipeline(bundle_dir=model_registry.bundle_dir(version) if version else None)
+
+
+# Replaced as a whole on hot reload; a request reads it once and finishes on the pipeline it got
+pipeline = load_latest_pipeline()
+reload_stop = threading.Event()
+
+# CSV parsing, preprocessing and inference run here, never on the event loop
+prediction_executor = ThreadPoolExecutor(max_workers=training_pipeline.PREDICTION_WORKER_THREADS,
+                                         thread_name_prefix="prediction")
+
+# Concurrent JSON requests are merged into one preprocessing pass and one model call
+def predict_current(dataframe: pd.DataFrame) -> pd.DataFrame:
+    # Looked up per micro-batch, so batches formed after a hot reload go to the new model
+    return pipeline.initiate_prediction(dataframe)
+
+
+micro_batcher = MicroBatcher(predict_current, prediction_executor)
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EPISODE_COLUMNS = list(PodcastEpisode.model_fields)
+
+
+def warm_up_pipeline():
+    try:
+        pipeline.warm_up()
+    except Exception as e:
+        logging.error(f"Prediction pipeline warm-up failed: {e}")
+        if pipeline.bundle_version is None:
+            logging.error(f"No model bundle in {model_registry.registry_dir}: run `python main.py` or copy a registry "
+                          f"with a LATEST version there (see README, Docker Deployment)")
+
+
+def reload_pipeline(version: str):
+    global pipeline
+    # Loaded and warmed next to the serving pipeline, which keeps answering requests meanwhile
+    new_pipeline = PredictionPipeline(bundle_dir=model_registry.bundle_dir(version))
+    new_pipeline.warm_up()
+    previous_version = pipeline.bundle_version
+    # A single reference swap; in-flight requests and streams keep the old pipeline until they finish
+    pipeline = new_pipeline
+    logging.info(f"Hot reload: serving model version {version} (was {previous_version})")
+
+
+def watch_model_registry(interval_seconds: float):
+    failed_version = None
+    while not reload_stop.wait(interval_seconds):
+        version = model_registry.latest_version()
+        if version is None or version in (pipeline.bundle_version, failed_version):
+            continue
+        try:
+            with track("serving.model_reload"):
+                reload_pipeline(version)
+        except Exception as e:
+            # Not retried until LATEST changes again
+            failed_version = version
+            logging.error(f"Hot reload of model version {version} failed, still serving {pipeline.bundle_version}: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and trace the model in the background so /ready can report progress
+    threading.Thread(target=warm_up_pipeline, daemon=True).start()
+    reload_interval = model_registry.model_registry_config.reload_interval_seconds
+    if reload_interval > 0:
+        threading.Thread(target=watch_model_registry, args=(reload_interval,), daemon=True).start()
+    await micro_batcher.start()
+    yield
+    reload_stop.set()
+    await micro_batcher.stop()
+    prediction_executor.shutdown(wait=False)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,26 +114,172 @@ app.add_middleware(
 )
 
 
+def http_error(error: Exception) -> HTTPException:
+    # CustomException keeps the exception it wraps as its first argument
+    cause = error
+    while isinstance(cause, CustomException) and cause.args and isinstance(cause.args[0], Exception):
+        cause = cause.args[0]
+    # Input that does not match the schema is the client's mistake; anything else is a server failure
+    if isinstance(cause, SchemaValidationError):
+        return HTTPException(status_code=422, detail=str(cause))
+    return HTTPException(status_code=500, detail=str(error))
+
+
+def read_upload(current_pipeline: PredictionPipeline, read_fn):
+    try:
+        return read_fn()
+    except ValueError as e:
+        # pandas fails on values the schema dtypes cannot hold: text in a numeric column, a row without an id, no rows
+        raise SchemaValidationError(f"Uploaded CSV does not match {current_pipeline.data_schema.schema_file_path}: {e}")
+
+
+def open_upload(current_pipeline: PredictionPipeline, upload):
+    # The header is checked against the schema before any row is parsed, so a wrong file never starts a stream
+    header = next(csv.reader([upload.readline().decode("utf-8-sig")]), [])
+    current_pipeline.data_schema.validate_columns(header)
+    upload.seek(0)
+
+    # Parse the spooled upload in row chunks instead of decoding the whole body into one string
+    return read_upload(current_pipeline, lambda: iter(current_pipeline.data_schema.read_csv(
+        upload, include_target=False, chunksize=training_pipeline.PREDICTION_UPLOAD_CHUNK_SIZE)))
+
 
+def score_next_chunk(current_pipeline: PredictionPipeline, reader, output_format: str, first_chunk: bool):
+    chunk = read_upload(current_pipeline, lambda: next(reader, None))
+    if chunk is None:
+        return None
+
+    results_df = current_pipeline.initiate_prediction(chunk)
+    if output_format == "csv":
+        return results_df.to_csv(index=False, header=first_chunk)
+    # Already newline-terminated, one record per line
+    return results_df.to_json(orient="records", lines=True)
+
+
+def score_all_chunks(current_pipeline: PredictionPipeline, reader, output_format: str):
+    bodies = []
+    while True:
+        body = score_next_chunk(current_pipeline, reader, output_format, not bodies)
+        if body is None:
+            return bodies
+        bodies.append(body)
+
+
+def profile_path(route: str) -> str:
+    return os.path.join(training_pipeline.PROFILE_DIR, f"{route}_{time.time_ns()}.prof")
+
+
+def stream_error_trailer(output_format: str, error: HTTPException) -> str:
+    # Last line of a stream that failed part way, so a client can tell it from a complete response
+    if output_format == "csv":
+        return f"# error {error.status_code}: {' '.join(str(error.detail).split())}\n"
+    return json.dumps({"error": {"status_code": error.status_code, "detail": error.detail}}) + "\n"
+
+
+async def stream_predictions(current_pipeline: PredictionPipeline, reader, first_body: str, output_format: str):
+    loop = asyncio.get_running_loop()
+    yield first_body
+    try:
+        while True:
+            body = await loop.run_in_executor(prediction_executor, score_next_chunk, current_pipeline, reader,
+                                              output_format, False)
+            if body is None:
+                break
+            yield body
+    except Exception as e:
+        # The status line is already sent, so the error goes into the body after the rows scored so far
+        logging.error(f"Error while streaming predictions: {e}")
+        yield stream_error_trailer(output_format, http_error(e))
+
+
+@app.get("/ready")
+async def ready():
+    current_pipeline = pipeline
+    if not current_pipeline.is_ready:
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True, "model_version": current_pipeline.bundle_version}
+
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format: per-step seconds, rows and memory of everything this process has scored,
+    # plus hit rate, evictions and size of the prediction cache
+    current_pipeline = pipeline
+    body = metrics_registry.to_prometheus()
+    body += ("# HELP podcast_model_info Registered model version being served.\n# TYPE podcast_model_info gauge\n"
+             f'podcast_model_info{{version="{current_pipeline.bundle_version or "unregistered"}"}} 1\n')
+    if current_pipeline.prediction_cache is not None:
+        body += current_pipeline.prediction_cache.to_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+def check_profiling(profile: bool):
+    if profile and not training_pipeline.REQUEST_PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Request profiling is disabled (set REQUEST_PROFILING_ENABLED=1)")
 
-pipeline = PredictionPipeline()
 
 @app.post("/predict/")
-async def predict(file: UploadFile = File(...)):
+async def predict(file: UploadFile = File(...), format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+                  profile: bool = Query(False)):
+    # The whole upload is scored by one model, even if a hot reload happens while it streams
+    current_pipeline = pipeline
+    if not current_pipeline.is_ready:
+        raise HTTPException(status_code=503, detail="Model is still warming up")
+    check_profiling(profile)
+
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
+        loop = asyncio.get_running_loop()
+
+        reader = await loop.run_in_executor(prediction_executor, open_upload, current_pipeline, file.file)
+
+        if profile:
+            # cProfile only sees its own thread, so the whole upload is scored in one executor call
+            path = profile_path("predict_upload")
+            bodies = await loop.run_in_executor(prediction_executor, profile_call, path, score_all_chunks,
+                                                current_pipeline, reader, format)
+            return StreamingResponse(iter(bodies), media_type=MEDIA_TYPES[format], headers={"X-Profile-Path": path})
+
+        # Score the first chunk before responding so bad input still gets a proper error status
+        first_body = await loop.run_in_executor(prediction_executor, score_next_chunk, current_pipeline, reader,
+                                                format, True)
+
+    except Exception as e:
+        raise http_error(e)
+
+    return StreamingResponse(stream_predictions(current_pipeline, reader, first_body or "", format), media_type=MEDIA_TYPES[format])
 
-        results_df = pipeline.initiate_prediction(df)
-        
-        # Return only first 10 rows
-        limited_results = results_df.head(10).to_dict(orient="records")
 
-        return JSONResponse(content=limited_results)
+@app.post("/predict", response_model=Union[EpisodePrediction, List[EpisodePrediction]])
+async def predict_records(records: Union[PodcastEpisode, List[PodcastEpisode]], profile: bool = Query(False)):
+    current_pipeline = pipeline
+    if not current_pipeline.is_ready:
+        raise HTTPException(status_code=503, detail="Model is still warming up")
+    check_profiling(profile)
+
+    single_record = isinstance(records, PodcastEpisode)
+    episodes = [records] if single_record else records
+    if not episodes:
+        return []
+
+    try:
+        dataframe = pd.DataFrame([episode.model_dump() for episode in episodes], columns=EPISODE_COLUMNS)
+        # Schema dtypes for the numeric fields; optional fields that are null in every record would otherwise be object columns.
+        # Strings stay object because micro-batches from different requests are concatenated.
+        dataframe = current_pipeline.data_schema.apply_dtypes(dataframe, categorical=False)
+        if profile:
+            # Scored on its own, outside the micro-batcher, so the profile covers only this request
+            loop = asyncio.get_running_loop()
+            results_df = await loop.run_in_executor(prediction_executor, profile_call, profile_path("predict_records"),
+                                                    current_pipeline.initiate_prediction, dataframe)
+        else:
+            results_df = await micro_batcher.submit(dataframe)
+        results = results_df.to_dict(orient="records")
+
+        return results[0] if single_record else results
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+        raise http_error(e)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,109 @@
+# CategoricalEncoder against the per-column sklearn LabelEncoder loops it replaced, on synthetic data.
+#   python -m benchmarks.bench_categorical_encoding --rows 1000000 10000000
+# Two inputs per size: "categorical" columns as loaded from the cleaned columnar artifact (training path)
+# and "object" columns of Python strings as parsed from a CSV upload or JSON records (inference path).
+# Results go to benchmarks/results/categorical_encoding_<commit>.json.
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_pipeline import time_call, make_result, git_commit
+from benchmarks.synthetic_data import generate_podcast_data
+from src.utils.categorical_encoder import CategoricalEncoder
+from src.utils.instrumentation import peak_rss_bytes
+
+ENCODED_COLUMNS = ["Podcast_Name", "Episode_Title", "Genre", "Publication_Day", "Publication_Time", "Episode_Sentiment"]
+
+
+def legacy_fit_transform(dataframe: pd.DataFrame) -> dict:
+    # DataTransformation.label_encoding + other_columns_encoding before CategoricalEncoder
+    from sklearn.preprocessing import LabelEncoder
+    return {col: LabelEncoder().fit_transform(dataframe[col]) for col in ENCODED_COLUMNS}
+
+
+def legacy_transform(dataframe: pd.DataFrame, lookups: dict) -> dict:
+    # The previous transform-only path: pd.Index.get_indexer over the LabelEncoder classes
+    codes = {}
+    for col in ENCODED_COLUMNS:
+        col_codes = lookups[col].get_indexer(dataframe[col])
+        col_codes[col_codes == -1] = len(lookups[col])
+        codes[col] = col_codes
+    return codes
+
+
+def check_codes(expected: dict, actual: dict):
+    for col in ENCODED_COLUMNS:
+        if not np.array_equal(expected[col], actual[col]):
+            raise AssertionError(f"CategoricalEncoder codes differ from LabelEncoder for {col}")
+
+
+def bench_encoding(n_rows: int, repeat: int) -> list:
+    results = []
+    categorical_df = generate_podcast_data(n_rows, include_target=False)[ENCODED_COLUMNS]
+    # Object columns share the category string objects, so this costs 8 bytes per cell rather than a string each
+    object_df = categorical_df.astype(object)
+
+    for input_kind, dataframe in [("categorical", categorical_df), ("object", object_df)]:
+        timings = time_call(legacy_fit_transform, repeat, lambda: (dataframe,))
+        results.append(make_result("encoding", f"fit_transform[{input_kind},LabelEncoder]", n_rows, timings))
+        legacy_codes = legacy_fit_transform(dataframe)
+
+        encoder = CategoricalEncoder()
+        timings = time_call(lambda df: encoder.fit_transform(df, ENCODED_COLUMNS), repeat, lambda: (dataframe,))
+        results.append(make_result("encoding", f"fit_transform[{input_kind},CategoricalEncoder]", n_rows, timings))
+        check_codes(legacy_codes, encoder.fit_transform(dataframe, ENCODED_COLUMNS))
+
+        lookups = {col: pd.Index(encoder.vocabularies[col].astype(object)) for col in ENCODED_COLUMNS}
+        timings = time_call(legacy_transform, repeat, lambda: (dataframe, lookups))
+        results.append(make_result("encoding", f"transform[{input_kind},get_indexer]", n_rows, timings))
+
+        transform_all = lambda df: {col: encoder.transform(df[col], col) for col in ENCODED_COLUMNS}
+        timings = time_call(transform_all, repeat, lambda: (dataframe,))
+        results.append(make_result("encoding", f"transform[{input_kind},CategoricalEncoder]", n_rows, timings))
+        check_codes(legacy_codes, transform_all(dataframe))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CategoricalEncoder against per-column LabelEncoder loops")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=1, help="Timed calls per step; the median is reported")
+    parser.add_argument("--output", default=None,
+                        help="Result file (default: benchmarks/results/categorical_encoding_<commit>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = []
+    for n_rows in args.rows:
+        results += bench_encoding(n_rows, args.repeat)
+
+    report = {
+        "metadata": {
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "argv": sys.argv[1:],
+            "peak_rss_bytes": peak_rss_bytes(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"categorical_encoding_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
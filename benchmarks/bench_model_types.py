@@ -0,0 +1,119 @@
+# Side-by-side comparison of the model types on the same transformed data and validation split:
+# training time, validation RMSE, single-row latency, bulk rows/sec and model file size of each served runtime.
+#   python -m benchmarks.bench_model_types --transformed-data-dir Artifacts/<run>/data_transformation/transformed_data
+# Models are trained into a temporary directory, so saved_models/ is left alone.
+# Results go to benchmarks/results/model_types_<commit>.json.
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_pipeline import time_call, latency_percentiles, git_commit
+from src.components.model_trainer import ModelTrainer
+from src.pipeline.model_runtime import NumpyModelRuntime, GBDTModelRuntime
+from src.utils.instrumentation import peak_rss_bytes
+
+MODEL_TYPES = ["mlp", "gbdt"]
+
+
+def latest_transformed_data_dir() -> str:
+    runs = sorted(glob.glob(os.path.join("Artifacts", "*", "data_transformation", "transformed_data")), key=os.path.getmtime)
+    if not runs:
+        raise FileNotFoundError("No transformed data under Artifacts/, run main.py first or pass --transformed-data-dir")
+    return runs[-1]
+
+
+def bench_model_type(model_type: str, transformed_data_dir: str, tmp_dir: str, epochs: int, repeat: int,
+                     single_row_calls: int) -> dict:
+    trainer = ModelTrainer(epochs=epochs, model_type=model_type)
+    trainer.transformed_data_dir = transformed_data_dir
+    trainer.model_save_path = os.path.join(tmp_dir, "model.pkl")
+    trainer.numpy_model_save_path = os.path.join(tmp_dir, "model.npz")
+    trainer.gbdt_model_save_path = os.path.join(tmp_dir, "model_gbdt.pkl")
+    trainer.quantization_mode = None
+
+    train_seconds = time_call(trainer.initiate_model_trainer, 1)[0]
+
+    # The runtime each model type is served with
+    if model_type == "gbdt":
+        backend, runtime = "gbdt", GBDTModelRuntime(trainer.gbdt_model_save_path)
+    else:
+        backend, runtime = "numpy", NumpyModelRuntime(trainer.numpy_model_save_path)
+    runtime.warm_up()
+
+    arrays, feature_columns, _, val_indices = trainer.load_arrays()
+    X_val, y_val = trainer.gather_rows(arrays, feature_columns, val_indices)
+    predictions = runtime.predict(X_val).reshape(-1)
+    rmse = float(np.sqrt(np.mean((predictions - y_val) ** 2)))
+
+    bulk_seconds = min(time_call(runtime.predict, repeat, lambda: (X_val,)))
+    single_row_latencies = time_call(runtime.predict, single_row_calls,
+                                     lambda rows=iter(range(single_row_calls)): (X_val[next(rows) % len(X_val)][None, :],))
+
+    result = {
+        "model_type": model_type,
+        "backend": backend,
+        "train_seconds": round(train_seconds, 3),
+        "validation_rows": len(y_val),
+        "rmse": round(rmse, 5),
+        "bulk_rows_per_sec": round(len(X_val) / bulk_seconds, 1),
+        **latency_percentiles(single_row_latencies),
+        "model_file_bytes": os.path.getsize(runtime.model_file_path),
+    }
+    print(f"{model_type:>5} ({backend:>5}): trained in {result['train_seconds']:>7.2f}s  RMSE {result['rmse']:>8.4f}  "
+          f"{result['bulk_rows_per_sec']:>11.0f} rows/s  single row p50 {result['latency_ms_p50']:.3f} ms  "
+          f"{result['model_file_bytes']:>9} bytes")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the MLP and gradient-boosted trees side by side")
+    parser.add_argument("--transformed-data-dir", default=None,
+                        help="Columnar training data (default: the most recent Artifacts/<run>/data_transformation/transformed_data)")
+    parser.add_argument("--model-types", nargs="+", choices=MODEL_TYPES, default=MODEL_TYPES)
+    parser.add_argument("--epochs", type=int, default=None, help="Maximum MLP epochs (default: TRAINING_EPOCHS)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed bulk predictions per model; the fastest is reported")
+    parser.add_argument("--single-row-calls", type=int, default=500)
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/model_types_<commit>.json)")
+    args = parser.parse_args()
+
+    transformed_data_dir = args.transformed_data_dir or latest_transformed_data_dir()
+    print(f"Training data: {transformed_data_dir}")
+
+    commit = git_commit()
+    with tempfile.TemporaryDirectory(prefix="bench_model_types_") as tmp_dir:
+        results = [bench_model_type(model_type, transformed_data_dir, tmp_dir, args.epochs, args.repeat,
+                                    args.single_row_calls)
+                   for model_type in args.model_types]
+
+    report = {
+        "metadata": {
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "transformed_data_dir": transformed_data_dir,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "argv": sys.argv[1:],
+            "peak_rss_bytes": peak_rss_bytes(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"model_types_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
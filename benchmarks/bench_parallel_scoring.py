@@ -0,0 +1,52 @@
+# Throughput of batch scoring versus worker count.
+# Run from the project root after training (needs Artifacts/ encoders and saved_models/model.pkl):
+#   python -m benchmarks.bench_parallel_scoring --rows 2000000 --workers 1 2 4 8 16 32
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.pipeline.batch_prediction import BatchPrediction
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel batch scoring")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--shard-size", type=int, default=50_000)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "parallel_scoring.json"))
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "input.csv")
+        generate_podcast_data(args.rows, include_target=False).to_csv(input_path, index=False)
+
+        for workers in args.workers:
+            output_path = os.path.join(tmp_dir, f"predictions_{workers}.csv")
+            # Sharded whatever the row count, so small --rows still measure the workers
+            batch_prediction = BatchPrediction(input_path, output_path, chunk_size=args.shard_size, workers=workers,
+                                               parallel_min_rows=0)
+
+            start = time.perf_counter()
+            batch_prediction.initiate_batch_prediction()
+            elapsed = time.perf_counter() - start
+
+            results.append({"workers": workers, "rows": args.rows, "shard_size": args.shard_size,
+                            "seconds": round(elapsed, 3), "rows_per_sec": round(args.rows / elapsed, 1)})
+
+    baseline = results[0]["rows_per_sec"]
+    print(f"{'workers':>8} {'seconds':>10} {'rows/sec':>12} {'speedup':>8}")
+    for result in results:
+        result["speedup"] = round(result["rows_per_sec"] / baseline, 2)
+        print(f"{result['workers']:>8} {result['seconds']:>10.2f} {result['rows_per_sec']:>12.0f} {result['speedup']:>8.2f}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# Timings of the training and inference hot paths on synthetic data matching data_schema/data.yaml.
+# Run from the project root after training (the prediction and api suites need Artifacts/ encoders and saved_models/):
+#   python -m benchmarks.bench_pipeline --rows 10000 100000 1000000 10000000
+#   python -m benchmarks.bench_pipeline --suites preprocessing transformation --compare benchmarks/results/pipeline_<commit>.json
+# Results go to benchmarks/results/pipeline_<commit>.json, one entry per (suite, name, rows).
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.data_transformation import DataTransformation
+from src.utils.columnar_storage import save_columnar_frame, load_columnar_frame
+from src.utils.instrumentation import peak_rss_bytes
+
+SUITES = ["preprocessing", "transformation", "prediction", "api"]
+
+
+def time_call(func, repeat: int, setup=None) -> list:
+    # setup() builds fresh arguments outside the timed region (most steps modify their input frame)
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def make_result(suite: str, name: str, rows: int, timings: list, **extra) -> dict:
+    median = statistics.median(timings)
+    result = {
+        "suite": suite,
+        "name": name,
+        "rows": rows,
+        "repeat": len(timings),
+        "seconds_median": round(median, 6),
+        "seconds_min": round(min(timings), 6),
+        "rows_per_sec": round(rows / median, 1) if median else None,
+        **extra,
+    }
+    print(f"{suite:>14} {name:<40} {rows:>10} rows {median * 1000:>11.2f} ms {result['rows_per_sec'] or 0:>14.0f} rows/s")
+    return result
+
+
+def latency_percentiles(latencies: list) -> dict:
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {"latency_ms_p50": round(float(p50), 3), "latency_ms_p95": round(float(p95), 3),
+            "latency_ms_p99": round(float(p99), 3)}
+
+
+def bench_preprocessing(n_rows: int, repeat: int, tmp_dir: str) -> tuple:
+    results = []
+    csv_path = os.path.join(tmp_dir, f"train_{n_rows}.csv")
+    generate_podcast_data(n_rows).to_csv(csv_path, index=False)
+
+    preprocessing = DataPreprocessing()
+    timings = time_call(lambda: preprocessing.data_schema.read_csv(csv_path), repeat)
+    results.append(make_result("preprocessing", "read_csv", n_rows, timings))
+    raw_df = preprocessing.data_schema.read_csv(csv_path)
+
+    # --- Fit path (training): each step runs on the output of the previous one ---
+    timings = time_call(preprocessing.fill_missing_values, repeat, lambda: (raw_df.copy(),))
+    results.append(make_result("preprocessing", "fill_missing_values", n_rows, timings))
+    filled_df = preprocessing.fill_missing_values(raw_df.copy())
+
+    timings = time_call(preprocessing.replace_zero_values, repeat, lambda: (filled_df.copy(),))
+    results.append(make_result("preprocessing", "replace_zero_values", n_rows, timings))
+    replaced_df = preprocessing.replace_zero_values(filled_df.copy())
+
+    timings = time_call(preprocessing.types_of_columns, repeat, lambda: (replaced_df,))
+    results.append(make_result("preprocessing", "types_of_columns", n_rows, timings))
+    numeric_features, _ = preprocessing.types_of_columns(replaced_df)
+
+    timings = time_call(preprocessing.remove_outliers, repeat, lambda: (replaced_df.copy(), numeric_features))
+    results.append(make_result("preprocessing", "remove_outliers", n_rows, timings))
+    cleaned_df = preprocessing.remove_outliers(replaced_df.copy(), numeric_features)
+
+    # --- Transform path (inference): fitted statistics, outliers clipped instead of dropped ---
+    state = preprocessing.preprocessing_state
+    timings = time_call(lambda df: preprocessing.fill_missing_values(df, state=state), repeat, lambda: (raw_df.copy(),))
+    results.append(make_result("preprocessing", "fill_missing_values[state]", n_rows, timings))
+    timings = time_call(lambda df: preprocessing.replace_zero_values(df, state=state), repeat, lambda: (filled_df.copy(),))
+    results.append(make_result("preprocessing", "replace_zero_values[state]", n_rows, timings))
+    timings = time_call(lambda df: preprocessing.remove_outliers(df, numeric_features, state=state, clip=True), repeat,
+                        lambda: (replaced_df.copy(),))
+    results.append(make_result("preprocessing", "remove_outliers[state,clip]", n_rows, timings))
+
+    cleaned_dir = os.path.join(tmp_dir, f"cleaned_{n_rows}")
+    timings = time_call(lambda: save_columnar_frame(cleaned_df, cleaned_dir), repeat)
+    results.append(make_result("preprocessing", "save_columnar_frame", len(cleaned_df), timings))
+
+    os.remove(csv_path)
+    return results, cleaned_dir
+
+
+def bench_transformation(cleaned_dir: str, repeat: int, tmp_dir: str) -> list:
+    results = []
+    transformation = DataTransformation()
+    # Encoders fitted on synthetic data must not overwrite the trained ones in Artifacts/
+    config = transformation.data_transformation_config
+    config.podcast_encoder_path = os.path.join(tmp_dir, "podcast_encoder.pkl")
+    config.title_encoder_path = os.path.join(tmp_dir, "title_encoder.pkl")
+    config.other_encoder_path = os.path.join(tmp_dir, "other_cat_encoder.pkl")
+
+    # Same input as the training pipeline: a copy-on-write memory map of the cleaned artifact
+    def cleaned_frame():
+        return (load_columnar_frame(cleaned_dir, mmap_mode="c"),)
+    n_rows = len(cleaned_frame()[0])
+
+    timings = time_call(lambda: load_columnar_frame(cleaned_dir, mmap_mode="c"), repeat)
+    results.append(make_result("transformation", "load_columnar_frame", n_rows, timings))
+    timings = time_call(transformation.label_encoding, repeat, cleaned_frame)
+    results.append(make_result("transformation", "label_encoding", n_rows, timings))
+    timings = time_call(transformation.other_columns_encoding, repeat, cleaned_frame)
+    results.append(make_result("transformation", "other_columns_encoding", n_rows, timings))
+
+    timings = time_call(transformation.load_fitted_encoders, repeat)
+    results.append(make_result("transformation", "load_fitted_encoders", n_rows, timings))
+    timings = time_call(transformation.transform_label_encoding, repeat, cleaned_frame)
+    results.append(make_result("transformation", "transform_label_encoding", n_rows, timings))
+    timings = time_call(transformation.transform_other_columns_encoding, repeat, cleaned_frame)
+    results.append(make_result("transformation", "transform_other_columns_encoding", n_rows, timings))
+
+    encoded_df = transformation.transform_other_columns_encoding(transformation.transform_label_encoding(cleaned_frame()[0]))
+    timings = time_call(transformation.drop_unwanted_columns, repeat, lambda: (encoded_df.copy(),))
+    results.append(make_result("transformation", "drop_unwanted_columns", n_rows, timings))
+
+    return results
+
+
+def bench_prediction(sizes: list, repeat: int, single_row_calls: int) -> list:
+    from src.pipeline.prediction_pipeline import PredictionPipeline
+
+    results = []
+    # Uncached, so repeats measure the full path; the cached path is timed separately below
+    pipeline = PredictionPipeline(use_cache=False)
+    pipeline.warm_up()
+
+    # Single-row latency: one call per row, as the JSON endpoint sees them without micro-batching
+    pool = generate_podcast_data(single_row_calls, include_target=False, seed=7)
+    single_rows = (pool.iloc[[i]].copy() for i in range(single_row_calls))
+    latencies = time_call(pipeline.initiate_prediction, single_row_calls, lambda: (next(single_rows),))
+    results.append(make_result("prediction", "initiate_prediction[single_row]", 1, latencies,
+                               backend=pipeline.model_backend, **latency_percentiles(latencies)))
+
+    for n_rows in sizes:
+        bulk_df = generate_podcast_data(n_rows, include_target=False, seed=7)
+        timings = time_call(pipeline.initiate_prediction, repeat, lambda: (bulk_df.copy(),))
+        results.append(make_result("prediction", "initiate_prediction[bulk]", n_rows, timings, backend=pipeline.model_backend))
+        del bulk_df
+
+    # Every row already cached: hashing and lookups only (sizes that fit in the cache)
+    cached_pipeline = PredictionPipeline(use_cache=True)
+    cached_pipeline.warm_up()
+    for n_rows in sizes:
+        if n_rows > cached_pipeline.prediction_cache.max_entries:
+            continue
+        cached_df = generate_podcast_data(n_rows, include_target=False, seed=7)
+        cached_pipeline.initiate_prediction(cached_df.copy())
+        timings = time_call(cached_pipeline.initiate_prediction, repeat, lambda: (cached_df.copy(),))
+        results.append(make_result("prediction", "initiate_prediction[bulk,cached]", n_rows, timings,
+                                   backend=cached_pipeline.model_backend))
+
+    return results
+
+
+def bench_api(clients: list, requests_per_level: int, upload_rows: int) -> list:
+    from fastapi.testclient import TestClient
+    import app
+
+    results = []
+    records = json.loads(generate_podcast_data(256, include_target=False, seed=11).to_json(orient="records"))
+    upload = generate_podcast_data(upload_rows, include_target=False, seed=13).to_csv(index=False)
+
+    with TestClient(app.app) as client:
+        while not app.pipeline.is_ready:
+            time.sleep(0.01)
+
+        def post_record(i):
+            start = time.perf_counter()
+            client.post("/predict", json=records[i % len(records)]).raise_for_status()
+            return time.perf_counter() - start
+
+        def post_upload(i):
+            start = time.perf_counter()
+            response = client.post("/predict/", files={"file": ("episodes.csv", upload)}, params={"format": "csv"})
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        for name, post, rows_per_request in [("/predict[json]", post_record, 1), ("/predict/[csv_upload]", post_upload, upload_rows)]:
+            for n_clients in clients:
+                with ThreadPoolExecutor(max_workers=n_clients) as executor:
+                    start = time.perf_counter()
+                    latencies = list(executor.map(post, range(requests_per_level)))
+                    elapsed = time.perf_counter() - start
+                # One timing for the whole level, so rows_per_sec is throughput across all clients
+                results.append(make_result("api", f"{name}[clients={n_clients}]", requests_per_level * rows_per_request,
+                                           [elapsed], backend=app.pipeline.model_backend, clients=n_clients,
+                                           requests=requests_per_level, requests_per_sec=round(requests_per_level / elapsed, 1),
+                                           **latency_percentiles(latencies)))
+
+    return results
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare_results(baseline_path: str, results: list, tolerance: float):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    baseline_seconds = {(r["suite"], r["name"], r["rows"]): r["seconds_median"] for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} ({baseline['metadata']['commit']}), slower than {1 + tolerance:.2f}x is flagged")
+    for result in results:
+        old = baseline_seconds.get((result["suite"], result["name"], result["rows"]))
+        if not old:
+            continue
+        ratio = result["seconds_median"] / old
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{result['suite']:>14} {result['name']:<40} {result['rows']:>10} rows {ratio:>7.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, transformation, prediction and API hot paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Synthetic data sizes, e.g. 10000 100000 1000000 10000000")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per step; the median is reported")
+    parser.add_argument("--backend", choices=["keras", "numpy", "tflite", "gbdt"], default=None,
+                        help="Model backend for the prediction and api suites (default: MODEL_BACKEND)")
+    parser.add_argument("--single-row-calls", type=int, default=200)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level in the api suite")
+    parser.add_argument("--upload-rows", type=int, default=1000, help="Rows per /predict/ upload in the api suite")
+    parser.add_argument("--prediction-cache", action="store_true",
+                        help="Keep the prediction cache on in the api suite (its requests repeat the same rows)")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/pipeline_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    # Read by PredictionPipelineConfig, so they must be set before the pipeline (or app) is created
+    if args.backend:
+        os.environ["MODEL_BACKEND"] = args.backend
+    if not args.prediction_cache:
+        os.environ["PREDICTION_CACHE_ENABLED"] = "0"
+
+    commit = git_commit()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in args.rows:
+            if "preprocessing" in args.suites or "transformation" in args.suites:
+                preprocessing_results, cleaned_dir = bench_preprocessing(n_rows, args.repeat, tmp_dir)
+                if "preprocessing" in args.suites:
+                    results += preprocessing_results
+                if "transformation" in args.suites:
+                    results += bench_transformation(cleaned_dir, args.repeat, tmp_dir)
+
+    if "prediction" in args.suites:
+        results += bench_prediction(args.rows, args.repeat, args.single_row_calls)
+    if "api" in args.suites:
+        results += bench_api(args.clients, args.requests, args.upload_rows)
+
+    report = {
+        "metadata": {
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model_backend": os.getenv("MODEL_BACKEND"),
+            "api_prediction_cache": args.prediction_cache,
+            "argv": sys.argv[1:],
+            "peak_rss_bytes": peak_rss_bytes(),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"pipeline_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare_results(args.compare, results, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
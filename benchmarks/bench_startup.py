@@ -0,0 +1,70 @@
+# Cold-start cost of the serving process: import time, warm-up time, time-to-first-prediction and resident memory.
+# Run from the project root after training (needs Artifacts/ and saved_models/):
+#   python -m benchmarks.bench_startup --runs 5 --backend numpy
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Executed in a fresh interpreter so every run pays the full import cost
+CHILD_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+from benchmarks.synthetic_data import generate_podcast_data
+record = json.loads(generate_podcast_data(1, include_target=False).to_json(orient="records"))[0]
+with TestClient(app.app) as client:
+    while not app.pipeline.is_ready:
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    response = client.post("/predict", json=record)
+    response.raise_for_status()
+    first_prediction = time.perf_counter()
+from src.utils.instrumentation import current_rss_bytes
+print(json.dumps({
+    "import_seconds": imported - start,
+    "warm_up_seconds": ready - imported,
+    "first_request_seconds": first_prediction - ready,
+    "in_process_seconds": first_prediction - start,
+    "rss_bytes": current_rss_bytes(),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serving cold start")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--backend", choices=["keras", "numpy", "tflite", "gbdt"], default=None,
+                        help="Model backend of the served process (default: MODEL_BACKEND)")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "startup.json"))
+    args = parser.parse_args()
+
+    env = dict(os.environ, **({"MODEL_BACKEND": args.backend} if args.backend else {}))
+
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], capture_output=True, text=True, check=True,
+                                   env=env)
+        wall = time.perf_counter() - start
+
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        run["time_to_first_prediction_seconds"] = wall
+        runs.append(run)
+
+    summary = {key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]}
+    for key, value in summary.items():
+        print(f"{key:>35}: {value / 2**20:.0f} MiB" if key == "rss_bytes" else f"{key:>35}: {value:.3f}s")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"runs": runs, "median": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
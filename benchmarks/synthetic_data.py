@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.data_schema import DataSchema
+
+PODCAST_NAMES = [f"Podcast {i}" for i in range(48)]
+EPISODE_TITLES = [f"Episode {i}" for i in range(1, 101)]
+GENRES = ["True Crime", "Comedy", "Education", "Technology", "Health",
+          "News", "Music", "Sports", "Business", "Lifestyle"]
+PUBLICATION_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+PUBLICATION_TIMES = ["Morning", "Afternoon", "Evening", "Night"]
+SENTIMENTS = ["Positive", "Negative", "Neutral"]
+
+CATEGORY_VALUES = {
+    "Podcast_Name": PODCAST_NAMES,
+    "Episode_Title": EPISODE_TITLES,
+    "Genre": GENRES,
+    "Publication_Day": PUBLICATION_DAYS,
+    "Publication_Time": PUBLICATION_TIMES,
+    "Episode_Sentiment": SENTIMENTS,
+}
+
+
+def generate_podcast_data(n_rows: int, start_id: int = 0, include_target: bool = True, seed: int = 42,
+                          schema: DataSchema = None) -> pd.DataFrame:
+    # Columns, order and dtypes follow data_schema/data.yaml. String columns are built as categoricals
+    # from integer codes, which keeps 10M rows at about 0.5 GB.
+    schema = schema or DataSchema()
+    rng = np.random.default_rng(seed)
+
+    # Missing-value rates roughly follow the real train.csv
+    episode_length = np.round(rng.uniform(0, 120, n_rows), 2)
+    episode_length[rng.random(n_rows) < 0.11] = np.nan
+    guest_popularity = np.round(rng.uniform(0, 100, n_rows), 2)
+    guest_popularity[rng.random(n_rows) < 0.19] = np.nan
+    number_of_ads = rng.integers(0, 4, n_rows).astype(float)
+    number_of_ads[rng.random(n_rows) < 0.001] = np.nan
+
+    columns = {
+        "id": np.arange(start_id, start_id + n_rows),
+        "Episode_Length_minutes": episode_length,
+        "Host_Popularity_percentage": np.round(rng.uniform(1, 120, n_rows), 2),
+        "Guest_Popularity_percentage": guest_popularity,
+        "Number_of_Ads": number_of_ads,
+    }
+    for col, values in CATEGORY_VALUES.items():
+        columns[col] = pd.Categorical.from_codes(rng.integers(0, len(values), n_rows), categories=values)
+    if include_target:
+        columns["Listening_Time_minutes"] = np.round(
+            np.nan_to_num(episode_length, nan=60.0) * rng.uniform(0.3, 0.9, n_rows), 5)
+
+    names = schema.column_names(include_target)
+    missing = [col for col in names if col not in columns]
+    if missing:
+        raise ValueError(f"No generator for schema columns {missing}")
+
+    dataframe = pd.DataFrame({col: columns[col] for col in names})
+    numeric_dtypes = {col: dtype for col, dtype in schema.columns.items() if col in names and dtype != "object"}
+    return dataframe.astype(numeric_dtypes)
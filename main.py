@@ -1,28 +1,73 @@
-from src.components.data_ingestion import DataIngestion
-from src.components.data_preprocessing import DataPreprocessing
-from src.components.data_transformation import DataTransformation
-from src.components.model_trainer import ModelTrainer
-from src.entity.config_entity import TrainingPipelineConfig
-from src.entity.artifact_entity import DataIngestionArtifact
+from src.pipeline.training_pipeline import TrainingPipeline
 from src.logger import logging
-import os
-import sys
-from src.exceptions import CustomException
+import argparse
 from src.constants import training_pipeline
-import pandas as pd
-
-data_ingestion = DataIngestion()
-data_ingestion.initiate_data_ingestion()
-print("Data ingestion completed successfully.")
+from src.utils.instrumentation import profile_call
+import os
+import time
 
-data_preprocessing = DataPreprocessing()
-data_preprocessing.initiate_data_preprocessing()
-print("Data preprocessing completed successfully.")
 
-data_transformation = DataTransformation()
-data_transformation.initiate_data_transformation(pd.read_csv(data_transformation.data_file_path), data_transformation.columns_to_encode)
-print("Data transformation completed successfully.")
+# Guarded because the tuning worker processes are spawned and re-import this module
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the podcast listening time training pipeline")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Preprocess and encode the training data in chunks instead of loading it into memory")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help=f"Rows per chunk in streaming mode (default: {training_pipeline.CHUNK_SIZE})")
+    parser.add_argument("--epochs", type=int, default=None,
+                        help=f"Maximum training epochs (default: {training_pipeline.TRAINING_EPOCHS})")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help=f"Training batch size (default: {training_pipeline.TRAINING_BATCH_SIZE})")
+    parser.add_argument("--mixed-precision", dest="mixed_precision_policy", default=None,
+                        help="Keras precision policy for training, e.g. mixed_bfloat16")
+    parser.add_argument("--architecture", dest="model_architecture", choices=["dense", "embedding"], default=None,
+                        help=f"Model variant (default: {training_pipeline.MODEL_ARCHITECTURE})")
+    parser.add_argument("--model-type", choices=["mlp", "gbdt"], default=None,
+                        help=f"Keras MLP or scikit-learn gradient-boosted trees (default: {training_pipeline.MODEL_TYPE})")
+    parser.add_argument("--quantization", choices=["int8", "dynamic_int8", "float16"], default=None,
+                        help="Also export a quantized TFLite model for the tflite backend (default: QUANTIZATION_MODE, off)")
+    parser.add_argument("--tune", action="store_true",
+                        help="Search hyperparameters in parallel trials before training, resuming an interrupted search")
+    parser.add_argument("--trials", type=int, default=None,
+                        help=f"Number of tuning trials (default: {training_pipeline.TUNING_TRIALS})")
+    parser.add_argument("--cv", action="store_true",
+                        help="Train K fold models in parallel and serve their average, with out-of-fold predictions")
+    parser.add_argument("--cv-folds", type=int, default=None,
+                        help=f"Number of cross-validation folds (default: {training_pipeline.CV_FOLDS})")
+    parser.add_argument("--cv-workers", type=int, default=None,
+                        help=f"Number of fold processes (default: {training_pipeline.CV_WORKERS})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Re-run every stage instead of reusing unchanged stage outputs from {training_pipeline.STAGE_CACHE_DIR}")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Write a cProfile dump of the whole run to {training_pipeline.PROFILE_DIR}/")
+    args = parser.parse_args()
 
-model_trainer = ModelTrainer()
-model_trainer.initiate_model_trainer()
+    pipeline = TrainingPipeline(
+        streaming=args.streaming,
+        chunk_size=args.chunk_size,
+        tune=args.tune,
+        n_trials=args.trials,
+        cv=args.cv,
+        cv_folds=args.cv_folds,
+        cv_workers=args.cv_workers,
+        use_cache=not args.no_cache,
+        trainer_kwargs={
+            "epochs": args.epochs,
+            "batch_size": args.batch_size,
+            "mixed_precision_policy": args.mixed_precision_policy,
+            "model_architecture": args.model_architecture,
+            "model_type": args.model_type,
+            "quantization_mode": args.quantization,
+        },
+    )
+    if args.profile:
+        stage_results = profile_call(os.path.join(training_pipeline.PROFILE_DIR, f"train_{time.strftime('%Y%m%d_%H%M%S')}.prof"),
+                                     pipeline.run_pipeline)
+    else:
+        stage_results = pipeline.run_pipeline()
 
+    # The pipeline itself only logs; this is the command's console summary
+    for result in stage_results:
+        print(f"{result['stage']}: {'cached' if result['cached'] else 'done'} ({result['seconds']:.1f}s)")
+    print(f"Registered model version {pipeline.model_version}")
+    print(f"Run report: {pipeline.run_report_path}")
@@ -0,0 +1,246 @@
+from src.exceptions import CustomException
+from src.logger import logging
+
+from src.entity.config_entity import TrainingPipelineConfig, CrossValidationConfig
+from src.entity.artifact_entity import CrossValidationArtifact
+from src.components.model_trainer import ModelTrainer
+from src.utils.columnar_storage import read_columnar_schema
+from src.utils.instrumentation import track
+from tensorflow import keras
+from sklearn.model_selection import KFold, train_test_split
+import numpy as np
+import pickle
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Each worker memory-maps the transformed artifact once and trains the folds it is handed. The folds are
+# recomputed from the seed in every process and out-of-fold predictions are written straight into one
+# memory-mapped file, so neither rows nor index arrays are pickled between processes.
+_worker_state = None
+
+
+def fold_indices(n_rows: int, n_folds: int, random_state: int) -> list:
+    return list(KFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(np.arange(n_rows)))
+
+
+def _init_worker(transformed_data_dir: str, oof_predictions_path: str, n_folds: int, trainer_kwargs: dict,
+                 intra_op_threads: int):
+    global _worker_state
+    import tensorflow as tf
+
+    # Split the cores between workers instead of letting every process grab all of them
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    trainer = ModelTrainer(**trainer_kwargs)
+    trainer.transformed_data_dir = transformed_data_dir
+    if trainer.mixed_precision_policy:
+        keras.mixed_precision.set_global_policy(trainer.mixed_precision_policy)
+    arrays, feature_columns, _, _ = trainer.load_arrays()
+
+    _worker_state = {
+        "trainer": trainer,
+        "arrays": arrays,
+        "feature_columns": feature_columns,
+        "folds": fold_indices(len(arrays[trainer.target_column]), n_folds, trainer.random_state),
+        "table_sizes": trainer.embedding_table_sizes() if trainer.model_architecture == "embedding" else None,
+        "oof_predictions_path": oof_predictions_path,
+    }
+
+
+def _run_fold(fold: int) -> dict:
+    state = _worker_state
+    trainer = state["trainer"]
+    arrays, feature_columns = state["arrays"], state["feature_columns"]
+    train_indices, val_indices = state["folds"][fold]
+    start = time.perf_counter()
+
+    # Early stopping picks its epoch on an inner split of the fold's training rows; the held-out rows are only
+    # predicted, so their predictions stay a true out-of-fold estimate
+    fit_indices, stopping_indices = train_test_split(train_indices, test_size=trainer.validation_split,
+                                                     random_state=trainer.random_state)
+
+    keras.backend.clear_session()
+    model = trainer.create_model(len(feature_columns), feature_columns, state["table_sizes"], **trainer.model_hyperparameters)
+    train_data = trainer.build_dataset(arrays, feature_columns, fit_indices, shuffle=True)
+    validation_data = trainer.build_dataset(arrays, feature_columns, stopping_indices, shuffle=False)
+
+    early_stopping = keras.callbacks.EarlyStopping(monitor='val_loss', patience=trainer.early_stopping_patience,
+                                                   restore_best_weights=True)
+    history = model.fit(train_data, epochs=trainer.epochs, validation_data=validation_data,
+                        callbacks=[early_stopping], shuffle=False, verbose=0)
+
+    # gather_rows returns the rows in index order
+    val_indices = np.sort(val_indices)
+    X_val, y_val = trainer.gather_rows(arrays, feature_columns, val_indices)
+    predictions = model.predict(X_val, batch_size=8192, verbose=0).reshape(-1)
+    oof_predictions = np.load(state["oof_predictions_path"], mmap_mode="r+")
+    oof_predictions[val_indices] = predictions
+    oof_predictions.flush()
+    del oof_predictions
+
+    return {
+        "fold": fold,
+        "train_rows": len(fit_indices),
+        "early_stopping_rows": len(stopping_indices),
+        "val_rows": len(val_indices),
+        "epochs": len(history.history["val_loss"]),
+        "early_stopping_loss": float(min(history.history["val_loss"])),
+        "rmse": float(np.sqrt(np.mean((predictions - y_val) ** 2))),
+        "seconds": round(time.perf_counter() - start, 2),
+        "weights": model.get_weights(),
+    }
+
+
+class CrossValidationTrainer:
+    def __init__(self, transformed_data_dir: str = None, n_folds: int = None, workers: int = None,
+                 hyperparameters: dict = None, trainer_kwargs: dict = None):
+        training_pipeline_config = TrainingPipelineConfig()
+        self.cross_validation_config = CrossValidationConfig(training_pipeline_config=training_pipeline_config)
+        self.transformed_data_dir = transformed_data_dir or self.cross_validation_config.transformed_data_dir
+        self.cross_validation_dir = self.cross_validation_config.cross_validation_dir
+        self.oof_predictions_path = self.cross_validation_config.oof_predictions_path
+        self.report_path = self.cross_validation_config.report_path
+        self.n_folds = n_folds or self.cross_validation_config.n_folds
+        self.workers = workers or self.cross_validation_config.workers
+
+        # Fold workers and the final ensemble use the same trainer settings (epochs, architecture, tuned values)
+        self.trainer_kwargs = {**(trainer_kwargs or {}), "hyperparameters": hyperparameters}
+        self.trainer = ModelTrainer(**self.trainer_kwargs)
+
+    def run_folds(self) -> list:
+        try:
+            workers = min(self.workers, self.n_folds)
+            intra_op_threads = max(1, (os.cpu_count() or 1) // workers)
+            fold_results = []
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.transformed_data_dir, self.oof_predictions_path, self.n_folds,
+                                               self.trainer_kwargs, intra_op_threads)) as executor:
+                futures = [executor.submit(_run_fold, fold) for fold in range(self.n_folds)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    logging.info(f"Fold {result['fold']} done in {result['seconds']}s after {result['epochs']} epochs: "
+                                 f"RMSE {result['rmse']:.4f} on {result['val_rows']} held-out rows")
+                    fold_results.append(result)
+
+            return sorted(fold_results, key=lambda result: result["fold"])
+
+        except Exception as e:
+            logging.error(f"Error during cross-validation folds: {e}")
+            raise CustomException(e, sys)
+
+    def ensemble_model(self, fold_results: list, feature_columns: list):
+        try:
+            # One functional model averaging the fold models, so every backend serves it with one predict call
+            table_sizes = self.trainer.embedding_table_sizes() if self.trainer.model_architecture == "embedding" else None
+            members = []
+            for result in fold_results:
+                member = self.trainer.create_model(len(feature_columns), feature_columns, table_sizes,
+                                                   **self.trainer.model_hyperparameters)
+                member.set_weights(result["weights"])
+                members.append(member)
+
+            inputs = keras.Input(shape=(len(feature_columns),))
+            outputs = keras.layers.Average()([member(inputs) for member in members])
+            return keras.Model(inputs, outputs)
+
+        except Exception as e:
+            logging.error(f"Error during fold ensemble creation: {e}")
+            raise CustomException(e, sys)
+
+    def initiate_cross_validation(self) -> CrossValidationArtifact:
+        try:
+            if self.trainer.model_type != "mlp":
+                raise ValueError(f"Cross-validation trains the MLP, not model type '{self.trainer.model_type}'")
+            logging.info(f"{self.n_folds}-fold cross-validation on {self.transformed_data_dir} with {self.workers} worker(s)")
+            start = time.perf_counter()
+            os.makedirs(self.cross_validation_dir, exist_ok=True)
+
+            # One float32 slot per training row, NaN until the fold holding the row out has written it
+            n_rows = read_columnar_schema(self.transformed_data_dir)["n_rows"]
+            oof_predictions = np.lib.format.open_memmap(self.oof_predictions_path, mode="w+", dtype=np.float32,
+                                                        shape=(n_rows,))
+            oof_predictions[:] = np.nan
+            oof_predictions.flush()
+            del oof_predictions
+
+            with track("cross_validation.folds") as step:
+                fold_results = self.run_folds()
+                step.rows = sum(result["train_rows"] * result["epochs"] for result in fold_results)
+
+            # --- Out-of-fold score: every row predicted by the one model that did not train on it ---
+            self.trainer.transformed_data_dir = self.transformed_data_dir
+            arrays, feature_columns, _, _ = self.trainer.load_arrays()
+            oof_predictions = np.load(self.oof_predictions_path, mmap_mode="r")
+            if np.isnan(oof_predictions).any():
+                raise ValueError(f"{int(np.isnan(oof_predictions).sum())} rows have no out-of-fold prediction")
+            target = arrays[self.trainer.target_column]
+            oof_rmse = float(np.sqrt(np.mean((oof_predictions - target) ** 2)))
+            fold_rmse = np.array([result["rmse"] for result in fold_results])
+            logging.info(f"Out-of-fold RMSE {oof_rmse:.4f} (folds {fold_rmse.mean():.4f} +/- {fold_rmse.std():.4f})")
+
+            # --- Final model: the average of the fold models, saved where ModelTrainer saves its model ---
+            model = self.ensemble_model(fold_results, feature_columns)
+            os.makedirs(os.path.dirname(self.trainer.model_save_path), exist_ok=True)
+            with open(self.trainer.model_save_path, "wb") as f:
+                pickle.dump(model, f)
+            logging.info(f"Ensemble of {len(fold_results)} fold models saved at {self.trainer.model_save_path}")
+
+            # Export checks run on a sample of rows; each of them was a training row for all but one member
+            rng = np.random.default_rng(self.trainer.random_state)
+            sample_indices = rng.choice(n_rows, min(4096, n_rows), replace=False)
+            X_sample, y_sample = self.trainer.gather_rows(arrays, feature_columns, sample_indices)
+            self.trainer.export_numpy_model(model, X_sample)
+            if self.trainer.quantization_mode:
+                # Drawn separately: gather_rows sorts the rows, so a slice of the sample would only cover low row ids
+                calibration_indices = rng.choice(n_rows, min(self.trainer.quantization_calibration_rows, n_rows),
+                                                 replace=False)
+                calibration_features, _ = self.trainer.gather_rows(arrays, feature_columns, calibration_indices)
+                self.trainer.export_quantized_model(model, calibration_features, X_sample, y_sample)
+
+            report = {
+                "n_folds": self.n_folds,
+                "rows": n_rows,
+                "oof_rmse": round(oof_rmse, 5),
+                "fold_rmse_mean": round(float(fold_rmse.mean()), 5),
+                "fold_rmse_std": round(float(fold_rmse.std()), 5),
+                "seconds": round(time.perf_counter() - start, 2),
+                "folds": [{key: value for key, value in result.items() if key != "weights"} for result in fold_results],
+            }
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+            logging.info(f"Cross-validation report written to {self.report_path}")
+
+            return CrossValidationArtifact(
+                oof_predictions_path=self.oof_predictions_path,
+                report_path=self.report_path,
+                oof_rmse=oof_rmse,
+            )
+
+        except Exception as e:
+            logging.error(f"Error during cross-validation: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train fold models in parallel and save their average as the model")
+    parser.add_argument("--data-dir", dest="transformed_data_dir", required=True,
+                        help="Transformed data artifact, e.g. Artifacts/<timestamp>/data_transformation/transformed_data")
+    parser.add_argument("--folds", type=int, default=None, help="Number of folds")
+    parser.add_argument("--workers", type=int, default=None, help="Number of fold processes")
+    parser.add_argument("--epochs", type=int, default=None, help="Maximum training epochs per fold")
+    args = parser.parse_args()
+
+    cross_validation = CrossValidationTrainer(args.transformed_data_dir, args.folds, args.workers,
+                                              trainer_kwargs={"epochs": args.epochs})
+    artifact = cross_validation.initiate_cross_validation()
+    print(f"Out-of-fold RMSE {artifact.oof_rmse:.4f} -> {artifact.report_path}")
@@ -4,10 +4,14 @@ from src.logger import logging
 
 import os
 import sys
+import pickle
 import numpy as np
 import pandas as pd
 from src.entity.config_entity import DataPreprocessingConfig, TrainingPipelineConfig
-from src.entity.artifact_entity import DataIngestionArtifact, DataPreprocessingArtifact
+from src.entity.artifact_entity import DataIngestionArtifact, DataPreprocessingArtifact, PreprocessingState
+from src.utils.columnar_storage import save_columnar_frame
+from src.utils.data_schema import DataSchema
+from src.utils.instrumentation import instrument, track
 
 
 class DataPreprocessing:
@@ -22,16 +26,29 @@ class DataPreprocessing:
             self.data_file_path = data_ingestion_artifact.data_file_path
             self.data_preprocessing_artifact = None
 
+            # Compact dtypes from data_schema/data.yaml, applied while parsing the CSV
+            self.data_schema = DataSchema()
+
+            # Training statistics recorded while fitting, reused as constants at inference
+            self.preprocessing_state = PreprocessingState()
+
             logging.info(f"DataPreprocessing initialized with data file at: {self.data_file_path}")
 
 
-    def fill_missing_values(self, dataframe: pd.DataFrame):
+    @instrument("data_preprocessing.fill_missing_values")
+    def fill_missing_values(self, dataframe: pd.DataFrame, state: PreprocessingState = None):
         try:
             logging.info("Filling missing values")
             logging.info("Filling missing values in the dataset")
-            dataframe['Episode_Length_minutes'] = dataframe['Episode_Length_minutes'].fillna(dataframe['Episode_Length_minutes'].median())
-            dataframe['Guest_Popularity_percentage'] = dataframe['Guest_Popularity_percentage'].fillna(dataframe['Guest_Popularity_percentage'].median())
-            dataframe['Number_of_Ads'] = dataframe['Number_of_Ads'].fillna(dataframe['Number_of_Ads'].median())
+            fill_cols = self.data_preprocessing_config.columns_to_fill
+
+            if state is None:
+                medians = dataframe[fill_cols].median()
+                self.preprocessing_state.medians = medians.to_dict()
+            else:
+                medians = pd.Series(state.medians)
+
+            dataframe[fill_cols] = dataframe[fill_cols].fillna(medians)
             logging.info("completed Filling missing values")
 
             return dataframe
@@ -40,13 +57,13 @@ class DataPreprocessing:
             logging.error(f"Error during filling missing values: {e}")
             raise CustomException(e, sys)
     
-    def replace_zero_values(self, dataframe: pd.DataFrame):
+    @instrument("data_preprocessing.replace_zero_values")
+    def replace_zero_values(self, dataframe: pd.DataFrame, state: PreprocessingState = None):
         try:
             logging.info("Replacing zero values in the dataset")
 
             # Define columns where 0 likely means missing
-            cols_to_replace = ['Episode_Length_minutes', 'Host_Popularity_percentage', 
-                            'Guest_Popularity_percentage', 'Listening_Time_minutes']
+            cols_to_replace = self.data_preprocessing_config.zero_as_missing_columns
 
             # Keep only those columns which are present in the DataFrame
             existing_cols = [col for col in cols_to_replace if col in dataframe.columns]
@@ -55,8 +72,13 @@ class DataPreprocessing:
             dataframe[existing_cols] = dataframe[existing_cols].replace(0, np.nan)
 
             # Impute NaNs with mean
-            for col in existing_cols:
-                dataframe[col] = dataframe[col].fillna(dataframe[col].mean())
+            if state is None:
+                means = dataframe[existing_cols].mean()
+                self.preprocessing_state.means = means.to_dict()
+            else:
+                means = pd.Series(state.means)
+
+            dataframe[existing_cols] = dataframe[existing_cols].fillna(means)
 
             logging.info("Replaced zero values successfully with mean in the dataset")
 
@@ -72,8 +94,9 @@ class DataPreprocessing:
         try:
             logging.info("Identifying types of columns")
             # define numerical & categorical columns
-            numeric_features = [feature for feature in dataframe.columns if dataframe[feature].dtype != 'O']
-            categorical_features = [feature for feature in dataframe.columns if dataframe[feature].dtype == 'O']
+            # Strings may arrive as object or categorical columns depending on how the frame was read
+            numeric_features = [feature for feature in dataframe.columns if pd.api.types.is_numeric_dtype(dataframe[feature])]
+            categorical_features = [feature for feature in dataframe.columns if feature not in numeric_features]
 
             # print columns
             logging.info('We have {} numerical features : {}'.format(len(numeric_features), numeric_features))
@@ -86,23 +109,68 @@ class DataPreprocessing:
             logging.error(f"Error during identifying types of columns: {e}")
             raise CustomException(e, sys)
         
-    def remove_outliers(self, dataframe: pd.DataFrame, columns: list):
+    @instrument("data_preprocessing.remove_outliers")
+    def remove_outliers(self, dataframe: pd.DataFrame, columns: list, state: PreprocessingState = None, clip: bool = False):
         try:
             logging.info("Removing outliers from the dataset")
+
+            if state is None:
+                # One quantile pass over all columns instead of one per column
+                quartiles = dataframe[columns].quantile([0.25, 0.75])
+                IQR = quartiles.loc[0.75] - quartiles.loc[0.25]
+                lower_bounds = quartiles.loc[0.25] - 1.5 * IQR
+                upper_bounds = quartiles.loc[0.75] + 1.5 * IQR
+                self.preprocessing_state.lower_bounds = lower_bounds.astype(float).to_dict()
+                self.preprocessing_state.upper_bounds = upper_bounds.astype(float).to_dict()
+            else:
+                # Apply the bounds learned on the training data
+                columns = [col for col in columns if col in state.lower_bounds]
+                lower_bounds = pd.Series(state.lower_bounds)[columns]
+                upper_bounds = pd.Series(state.upper_bounds)[columns]
+
+            if clip:
+                dataframe[columns] = dataframe[columns].clip(lower=lower_bounds, upper=upper_bounds, axis=1)
+                logging.info(f"Outliers clipped to IQR bounds for {columns}")
+                return dataframe
+
+            # Column by column in the native dtype, so no 2-D float64 copy of the numeric block is made
+            mask = np.ones(len(dataframe), dtype=bool)
             for col in columns:
-                Q1 = dataframe[col].quantile(0.25)
-                Q3 = dataframe[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                dataframe = dataframe[(dataframe[col] >= lower_bound) & (dataframe[col] <= upper_bound)]
-                logging.info(f"Outliers removed from {col} using IQR method")
+                values = dataframe[col].to_numpy()
+                mask &= (values >= lower_bounds[col]) & (values <= upper_bounds[col])
+            dataframe = dataframe[mask]
+            logging.info(f"Removed {int((~mask).sum())} outlier rows using IQR method on {columns}")
+
             return dataframe
 
         except Exception as e:
             logging.error(f"Error during removing outliers: {e}")
             raise CustomException(e, sys)
-        
+
+    def save_preprocessing_state(self):
+        try:
+            state_path = self.data_preprocessing_config.preprocessing_state_path
+            os.makedirs(os.path.dirname(state_path), exist_ok=True)
+            with open(state_path, "wb") as f:
+                pickle.dump(self.preprocessing_state, f)
+            logging.info(f"Preprocessing state saved at {state_path}")
+
+        except Exception as e:
+            logging.error(f"Error during saving preprocessing state: {e}")
+            raise CustomException(e, sys)
+
+    def load_preprocessing_state(self) -> PreprocessingState:
+        try:
+            state_path = self.data_preprocessing_config.preprocessing_state_path
+            with open(state_path, "rb") as f:
+                self.preprocessing_state = pickle.load(f)
+            logging.info(f"Preprocessing state loaded from {state_path}")
+
+            return self.preprocessing_state
+
+        except Exception as e:
+            logging.error(f"Error during loading preprocessing state: {e}")
+            raise CustomException(e, sys)
 
 
     def initiate_data_preprocessing(self):
@@ -110,8 +178,11 @@ class DataPreprocessing:
             logging.info("Data Preprocessing started")
 
             # --- Load Data ---
-            df = pd.read_csv(self.data_file_path)
+            with track("data_preprocessing.read_csv") as step:
+                df = self.data_schema.read_csv(self.data_file_path)
+                step.rows = len(df)
             logging.info(f"Data loaded successfully from {self.data_file_path}")
+            self.preprocessing_state = PreprocessingState()
 
             # --- Fill Missing Values ---
             df = self.fill_missing_values(df)
@@ -126,17 +197,18 @@ class DataPreprocessing:
             df = self.remove_outliers(df, numeric_features)
 
 
-            # --- Validate and Create Directory if not exists ---
-            os.makedirs(os.path.dirname(self.data_preprocessing_config.cleaned_data_file_path), exist_ok=True)
-
-            # --- Save Cleaned Data ---
-            df.to_csv(self.data_preprocessing_config.cleaned_data_file_path, index=False)
-            logging.info(f"Cleaned data saved at {self.data_preprocessing_config.cleaned_data_file_path}")
+            # --- Save Cleaned Data as a columnar artifact ---
+            with track("data_preprocessing.save_cleaned_data", rows=len(df)):
+                save_columnar_frame(df, self.data_preprocessing_config.cleaned_data_dir)
+            logging.info(f"Cleaned data saved at {self.data_preprocessing_config.cleaned_data_dir}")
 
             self.data_preprocessing_artifact = DataPreprocessingArtifact(
-                cleaned_data_file_path=self.data_preprocessing_config.cleaned_data_file_path
+                cleaned_data_dir=self.data_preprocessing_config.cleaned_data_dir
             )
 
+            # --- Save Training Statistics ---
+            self.save_preprocessing_state()
+
             return self.data_preprocessing_artifact
 
         except Exception as e:
@@ -2,15 +2,15 @@ from src.exceptions import CustomException
 from src.logger import logging
 import os
 import sys
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import pickle
 from typing import List, Tuple
 from src.entity.config_entity import DataTransformationConfig, TrainingPipelineConfig
 from src.entity.artifact_entity import DataPreprocessingArtifact, DataTransformationArtifact
-
-from sklearn.preprocessing import StandardScaler
+from src.utils.columnar_storage import save_columnar_frame
+from src.utils.categorical_encoder import CategoricalEncoder
+from src.utils.instrumentation import instrument, track
 
 
 class DataTransformation:
@@ -19,36 +19,36 @@ class DataTransformation:
         self.data_transformation_config = DataTransformationConfig(training_pipeline_config=training_pipeline_config)
 
         data_preprocessing_artifact = DataPreprocessingArtifact(    
-            cleaned_data_file_path=self.data_transformation_config.cleaned_data_file_path
+            cleaned_data_dir=self.data_transformation_config.cleaned_data_dir
         )
 
-        self.data_file_path = data_preprocessing_artifact.cleaned_data_file_path
+        self.cleaned_data_dir = data_preprocessing_artifact.cleaned_data_dir
         self.data_transformation_artifact = None    
 
         # Move hardcoded columns into init for clean reference
         self.columns_to_encode = self.data_transformation_config.columns_to_encode
         self.columns_to_drop = self.data_transformation_config.columns_to_drop
 
+        # Sorted vocabulary arrays shared by all encoded columns (see src/utils/categorical_encoder.py)
+        self.categorical_encoder = CategoricalEncoder()
+        # Filled by load_fitted_encoders() for the transform-only (inference) path
+        self.category_lookups = None
+
+    @instrument("data_transformation.label_encoding")
     def label_encoding(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         try:
             logging.info("Starting label encoding for Podcast_Name and Episode_Title.")
 
-            podcast_le = LabelEncoder()
-            title_le = LabelEncoder()
-
-            podcast_le.fit(dataframe['Podcast_Name'])
-            title_le.fit(dataframe['Episode_Title'])
+            codes = self.categorical_encoder.fit_transform(dataframe, ['Podcast_Name', 'Episode_Title'])
 
-            dataframe['Podcast_ID'] = podcast_le.transform(dataframe['Podcast_Name'])
-            dataframe['Title_ID'] = title_le.transform(dataframe['Episode_Title'])
+            dataframe['Podcast_ID'] = codes['Podcast_Name']
+            dataframe['Title_ID'] = codes['Episode_Title']
 
             os.makedirs(os.path.dirname(self.data_transformation_config.podcast_encoder_path), exist_ok=True)
             os.makedirs(os.path.dirname(self.data_transformation_config.title_encoder_path), exist_ok=True)
 
-            with open(self.data_transformation_config.podcast_encoder_path, "wb") as f:
-                pickle.dump(podcast_le, f)
-            with open(self.data_transformation_config.title_encoder_path, "wb") as f:
-                pickle.dump(title_le, f)
+            self.categorical_encoder.save(self.data_transformation_config.podcast_encoder_path, ['Podcast_Name'])
+            self.categorical_encoder.save(self.data_transformation_config.title_encoder_path, ['Episode_Title'])
 
             logging.info("Label encoders saved successfully.")
 
@@ -57,20 +57,16 @@ class DataTransformation:
             logging.error(f"Error during label encoding: {e}")
             raise CustomException(e, sys)
 
+    @instrument("data_transformation.other_columns_encoding")
     def other_columns_encoding(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         try:
             logging.info("Starting encoding for other categorical columns.")
 
-            encoders = {}
-
-            for col in self.columns_to_encode:
-                cat_encoder = LabelEncoder()
-                dataframe[col] = cat_encoder.fit_transform(dataframe[col])
-                encoders[col] = cat_encoder
+            for col, codes in self.categorical_encoder.fit_transform(dataframe, self.columns_to_encode).items():
+                dataframe[col] = codes
 
             os.makedirs(os.path.dirname(self.data_transformation_config.other_encoder_path), exist_ok=True)
-            with open(self.data_transformation_config.other_encoder_path, "wb") as f:
-                pickle.dump(encoders, f)
+            self.categorical_encoder.save(self.data_transformation_config.other_encoder_path, self.columns_to_encode)
 
             logging.info("Other column encoders saved successfully.")
 
@@ -79,6 +75,84 @@ class DataTransformation:
             logging.error(f"Error during other columns encoding: {e}")
             raise CustomException(e, sys)
 
+    def fit_encoders_from_vocabulary(self, vocabularies: dict) -> dict:
+        try:
+            logging.info("Fitting encoders from precomputed category vocabularies.")
+
+            # Sorted like a fit on the column, so the same vocabulary gives the in-memory path's codes
+            # (streaming preprocessing passes the vocabulary of the rows that survive the outlier filter)
+            encoder = CategoricalEncoder.from_vocabularies(
+                {col: vocabularies[col] for col in ['Podcast_Name', 'Episode_Title', *self.columns_to_encode]})
+
+            os.makedirs(os.path.dirname(self.data_transformation_config.podcast_encoder_path), exist_ok=True)
+            encoder.save(self.data_transformation_config.podcast_encoder_path, ['Podcast_Name'])
+            encoder.save(self.data_transformation_config.title_encoder_path, ['Episode_Title'])
+            encoder.save(self.data_transformation_config.other_encoder_path, self.columns_to_encode)
+
+            logging.info("Encoders fitted from vocabularies and saved successfully.")
+
+            return self.load_fitted_encoders()
+        except Exception as e:
+            logging.error(f"Error during fitting encoders from vocabularies: {e}")
+            raise CustomException(e, sys)
+
+    def load_fitted_encoders(self) -> dict:
+        try:
+            logging.info("Loading fitted encoders for transform-only encoding.")
+
+            # Encoders pickled as sklearn LabelEncoders by older runs load too
+            encoder = CategoricalEncoder()
+            encoder.load(self.data_transformation_config.podcast_encoder_path, column='Podcast_Name')
+            encoder.load(self.data_transformation_config.title_encoder_path, column='Episode_Title')
+            encoder.load(self.data_transformation_config.other_encoder_path)
+
+            self.categorical_encoder = encoder
+            self.category_lookups = encoder.vocabularies
+
+            logging.info("Fitted encoders loaded successfully.")
+
+            return self.category_lookups
+        except Exception as e:
+            logging.error(f"Error during loading fitted encoders: {e}")
+            raise CustomException(e, sys)
+
+    def lookup_category_codes(self, values: pd.Series, column: str) -> np.ndarray:
+        # Categories never seen during training go to one extra bucket after the known codes
+        return self.categorical_encoder.transform(values, column)
+
+    @instrument("data_transformation.transform_label_encoding")
+    def transform_label_encoding(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        try:
+            logging.info("Applying fitted label encoders for Podcast_Name and Episode_Title.")
+
+            if self.category_lookups is None:
+                self.load_fitted_encoders()
+
+            dataframe['Podcast_ID'] = self.lookup_category_codes(dataframe['Podcast_Name'], 'Podcast_Name')
+            dataframe['Title_ID'] = self.lookup_category_codes(dataframe['Episode_Title'], 'Episode_Title')
+
+            return dataframe
+        except Exception as e:
+            logging.error(f"Error during transform-only label encoding: {e}")
+            raise CustomException(e, sys)
+
+    @instrument("data_transformation.transform_other_columns_encoding")
+    def transform_other_columns_encoding(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        try:
+            logging.info("Applying fitted encoders for other categorical columns.")
+
+            if self.category_lookups is None:
+                self.load_fitted_encoders()
+
+            for col in self.columns_to_encode:
+                dataframe[col] = self.lookup_category_codes(dataframe[col], col)
+
+            return dataframe
+        except Exception as e:
+            logging.error(f"Error during transform-only other columns encoding: {e}")
+            raise CustomException(e, sys)
+
+    @instrument("data_transformation.drop_unwanted_columns")
     def drop_unwanted_columns(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         try:
             logging.info(f"Dropping unwanted columns: {self.columns_to_drop}")
@@ -119,6 +193,7 @@ class DataTransformation:
     def standardize_data(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         try:
             logging.info("Standardizing data.")
+            from sklearn.preprocessing import StandardScaler
             numeric_cols = dataframe.select_dtypes(include=['float64', 'int64']).columns
             
             sc = StandardScaler()
@@ -152,15 +227,13 @@ class DataTransformation:
 
             logging.info("Data transformation pipeline completed successfully.")
 
-            # --- Validate and Create Directory if not exists ---
-            os.makedirs(os.path.dirname(self.data_transformation_config.cleaned_data_file_path), exist_ok=True)
-
-            # --- Save Cleaned Data ---
-            dataframe.to_csv(self.data_transformation_config.cleaned_data_file_path, index=False)
-            logging.info(f"Cleaned data saved at {self.data_transformation_config.cleaned_data_file_path}")
+            # --- Save Transformed Data as a columnar artifact (int32 codes, float32 features) ---
+            with track("data_transformation.save_transformed_data", rows=len(dataframe)):
+                save_columnar_frame(dataframe, self.data_transformation_config.transformed_data_dir)
+            logging.info(f"Transformed data saved at {self.data_transformation_config.transformed_data_dir}")
 
             self.data_transformation_artifact = DataTransformationArtifact(
-                cleaned_data_file_path=self.data_transformation_config.cleaned_data_file_path
+                transformed_data_dir=self.data_transformation_config.transformed_data_dir
             )
 
             return self.data_transformation_artifact
@@ -174,5 +247,5 @@ class DataTransformation:
 # if __name__ == "__main__":
 #     # Example usage
 #     data_transformation = DataTransformation()
-#     data_transformation.initiate_data_transformation(pd.read_csv(data_transformation.data_file_path), data_transformation.columns_to_encode)
+#     data_transformation.initiate_data_transformation(load_columnar_frame(data_transformation.cleaned_data_dir, mmap_mode="c"), data_transformation.columns_to_encode)
 #     print("Data transformation completed successfully.")
\ No newline at end of file
@@ -0,0 +1,267 @@
+from src.exceptions import CustomException
+from src.logger import logging
+
+from src.entity.config_entity import TrainingPipelineConfig, HyperparameterTunerConfig
+from src.entity.artifact_entity import HyperparameterTunerArtifact
+from src.components.model_trainer import ModelTrainer
+from tensorflow import keras
+import numpy as np
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Each worker memory-maps the transformed artifact and builds the train/validation split once,
+# then reuses them for every trial it runs. All workers share the same pages through the OS cache.
+_worker_state = None
+
+
+def _init_worker(transformed_data_dir: str, search_dir: str, trainer_kwargs: dict, min_epochs_before_pruning: int,
+                 intra_op_threads: int):
+    global _worker_state
+    import tensorflow as tf
+
+    # Split the cores between workers instead of letting every process grab all of them
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    trainer = ModelTrainer(**trainer_kwargs)
+    trainer.transformed_data_dir = transformed_data_dir
+    if trainer.mixed_precision_policy:
+        keras.mixed_precision.set_global_policy(trainer.mixed_precision_policy)
+    arrays, feature_columns, train_indices, val_indices = trainer.load_arrays()
+    table_sizes = trainer.embedding_table_sizes() if trainer.model_architecture == "embedding" else None
+
+    _worker_state = {
+        "trainer": trainer,
+        "arrays": arrays,
+        "feature_columns": feature_columns,
+        "train_indices": train_indices,
+        "val_indices": val_indices,
+        "table_sizes": table_sizes,
+        "batch_size": trainer.batch_size,
+        "search_dir": search_dir,
+        "min_epochs_before_pruning": min_epochs_before_pruning,
+    }
+
+
+def _run_trial(trial_id: int, hyperparameters: dict) -> dict:
+    state = _worker_state
+    trainer = state["trainer"]
+    trainer.batch_size = hyperparameters.get("batch_size", state["batch_size"])
+    model_hyperparameters = {k: v for k, v in hyperparameters.items() if k != "batch_size"}
+
+    keras.backend.clear_session()
+    model = trainer.create_model(len(state["feature_columns"]), state["feature_columns"], state["table_sizes"],
+                                 **model_hyperparameters)
+    train_data = trainer.build_dataset(state["arrays"], state["feature_columns"], state["train_indices"], shuffle=True)
+    validation_data = trainer.build_dataset(state["arrays"], state["feature_columns"], state["val_indices"], shuffle=False)
+
+    pruning = MedianStoppingCallback(trial_id, hyperparameters, state["search_dir"], state["min_epochs_before_pruning"])
+    early_stopping = keras.callbacks.EarlyStopping(monitor='val_loss', patience=trainer.early_stopping_patience,
+                                                   restore_best_weights=True)
+    model.fit(train_data, epochs=trainer.epochs, validation_data=validation_data,
+              callbacks=[early_stopping, pruning], shuffle=False, verbose=0)
+
+    return pruning.finish()
+
+
+def trial_file_path(search_dir: str, trial_id: int) -> str:
+    return os.path.join(search_dir, f"trial_{trial_id:04d}.json")
+
+
+def write_json_atomic(path: str, content: dict):
+    # Other workers read trial files while they are being updated
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_trials(search_dir: str) -> dict:
+    trials = {}
+    for file_name in sorted(os.listdir(search_dir)):
+        if file_name.startswith("trial_") and file_name.endswith(".json"):
+            try:
+                with open(os.path.join(search_dir, file_name)) as f:
+                    trial = json.load(f)
+                trials[trial["trial_id"]] = trial
+            except (OSError, ValueError, KeyError):
+                continue
+    return trials
+
+
+class MedianStoppingCallback(keras.callbacks.Callback):
+    # Records the trial after every epoch and stops it once its best validation loss is worse than
+    # the median of the other trials at the same epoch
+
+    def __init__(self, trial_id: int, hyperparameters: dict, search_dir: str, min_epochs_before_pruning: int):
+        super().__init__()
+        self.trial_id = trial_id
+        self.hyperparameters = hyperparameters
+        self.search_dir = search_dir
+        self.min_epochs_before_pruning = min_epochs_before_pruning
+        self.val_loss_history = []
+        self.status = "running"
+        self.start_time = time.perf_counter()
+
+    def trial_record(self) -> dict:
+        return {
+            "trial_id": self.trial_id,
+            "hyperparameters": self.hyperparameters,
+            "status": self.status,
+            "val_loss_history": self.val_loss_history,
+            "best_val_loss": min(self.val_loss_history, default=math.inf),
+            "elapsed_sec": round(time.perf_counter() - self.start_time, 2),
+        }
+
+    def should_prune(self, epoch: int) -> bool:
+        if epoch + 1 < self.min_epochs_before_pruning:
+            return False
+
+        # Best-so-far of every other trial that has reached this epoch, including running ones
+        others = [min(trial["val_loss_history"][:epoch + 1])
+                  for trial_id, trial in read_trials(self.search_dir).items()
+                  if trial_id != self.trial_id and len(trial["val_loss_history"]) > epoch]
+        if len(others) < 2:
+            return False
+        return min(self.val_loss_history) > float(np.median(others))
+
+    def on_epoch_end(self, epoch, logs=None):
+        val_loss = float((logs or {}).get("val_loss", math.inf))
+        self.val_loss_history.append(val_loss if math.isfinite(val_loss) else math.inf)
+
+        if not math.isfinite(val_loss) or self.should_prune(epoch):
+            self.status = "pruned"
+            self.model.stop_training = True
+        write_json_atomic(trial_file_path(self.search_dir, self.trial_id), self.trial_record())
+
+    def finish(self) -> dict:
+        if self.status == "running":
+            self.status = "completed"
+        record = self.trial_record()
+        write_json_atomic(trial_file_path(self.search_dir, self.trial_id), record)
+        return record
+
+
+class HyperparameterTuner:
+    def __init__(self, transformed_data_dir: str = None, n_trials: int = None, workers: int = None,
+                 trainer_kwargs: dict = None):
+        training_pipeline_config = TrainingPipelineConfig()
+        self.hyperparameter_tuner_config = HyperparameterTunerConfig(training_pipeline_config=training_pipeline_config)
+        self.transformed_data_dir = transformed_data_dir or self.hyperparameter_tuner_config.transformed_data_dir
+        self.search_dir = self.hyperparameter_tuner_config.search_dir
+        self.best_hyperparameters_path = self.hyperparameter_tuner_config.best_hyperparameters_path
+        self.n_trials = n_trials or self.hyperparameter_tuner_config.n_trials
+        self.workers = workers or self.hyperparameter_tuner_config.workers
+        self.epochs = self.hyperparameter_tuner_config.epochs
+        self.min_epochs_before_pruning = self.hyperparameter_tuner_config.min_epochs_before_pruning
+        self.seed = self.hyperparameter_tuner_config.seed
+        self.hyperparameter_space = self.hyperparameter_tuner_config.hyperparameter_space
+
+        # Trials train the same model variant as the final model (architecture, precision, input pipeline);
+        # only the epoch budget is the tuner's own
+        self.trainer_kwargs = {**(trainer_kwargs or {}), "epochs": self.epochs}
+        self.trainer = ModelTrainer(**self.trainer_kwargs)
+
+    def trainer_settings(self) -> dict:
+        return {"model_architecture": self.trainer.model_architecture,
+                "mixed_precision_policy": self.trainer.mixed_precision_policy,
+                "input_pipeline": self.trainer.input_pipeline,
+                "batch_size": self.trainer.batch_size}
+
+    def sample_hyperparameters(self, trial_id: int) -> dict:
+        # Seeded per trial, so a resumed search proposes exactly the same trials
+        rng = np.random.default_rng([self.seed, trial_id])
+        hyperparameters = {}
+        for name, values in self.hyperparameter_space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                hyperparameters[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+            else:
+                hyperparameters[name] = values[int(rng.integers(len(values)))]
+        return hyperparameters
+
+    def run_trials(self, trial_ids: list):
+        try:
+            workers = min(self.workers, len(trial_ids))
+            intra_op_threads = max(1, (os.cpu_count() or 1) // workers)
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(self.transformed_data_dir, self.search_dir, self.trainer_kwargs,
+                                               self.min_epochs_before_pruning, intra_op_threads)) as executor:
+                futures = [executor.submit(_run_trial, trial_id, self.sample_hyperparameters(trial_id))
+                           for trial_id in trial_ids]
+                for future in as_completed(futures):
+                    trial = future.result()
+                    logging.info(f"Trial {trial['trial_id']} {trial['status']} after {len(trial['val_loss_history'])} epochs: "
+                                 f"best val_loss {trial['best_val_loss']:.4f} with {trial['hyperparameters']}")
+
+        except Exception as e:
+            logging.error(f"Error during tuning trials: {e}")
+            raise CustomException(e, sys)
+
+    def initiate_hyperparameter_tuning(self) -> HyperparameterTunerArtifact:
+        try:
+            logging.info(f"Hyperparameter search started in {self.search_dir} on {self.transformed_data_dir}")
+            os.makedirs(self.search_dir, exist_ok=True)
+
+            # --- Resume: trials that finished (or were pruned) in an earlier run are not repeated ---
+            finished = {trial_id for trial_id, trial in read_trials(self.search_dir).items()
+                        if trial["status"] in ("completed", "pruned")}
+            pending = [trial_id for trial_id in range(self.n_trials) if trial_id not in finished]
+            logging.info(f"{len(finished)} trials already finished, running {len(pending)} with {self.workers} worker(s)")
+
+            if pending:
+                self.run_trials(pending)
+
+            # --- Pick the best trial and persist its hyperparameters ---
+            trials = [trial for trial in read_trials(self.search_dir).values()
+                      if trial["status"] in ("completed", "pruned") and math.isfinite(trial["best_val_loss"])]
+            if not trials:
+                raise ValueError("No tuning trial produced a finite validation loss")
+
+            best_trial = min(trials, key=lambda trial: trial["best_val_loss"])
+            write_json_atomic(self.best_hyperparameters_path, {
+                "trial_id": best_trial["trial_id"],
+                "hyperparameters": best_trial["hyperparameters"],
+                "best_val_loss": best_trial["best_val_loss"],
+            })
+            logging.info(f"Best trial {best_trial['trial_id']}: val_loss {best_trial['best_val_loss']:.4f} "
+                         f"with {best_trial['hyperparameters']}")
+
+            return HyperparameterTunerArtifact(
+                best_hyperparameters_path=self.best_hyperparameters_path,
+                best_hyperparameters=best_trial["hyperparameters"],
+                best_val_loss=best_trial["best_val_loss"],
+            )
+
+        except Exception as e:
+            logging.error(f"Error during hyperparameter tuning: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search model and optimizer hyperparameters on a transformed data artifact")
+    parser.add_argument("--data-dir", dest="transformed_data_dir", required=True,
+                        help="Transformed data artifact, e.g. Artifacts/<timestamp>/data_transformation/transformed_data")
+    parser.add_argument("--trials", type=int, default=None, help="Number of trials in the search")
+    parser.add_argument("--workers", type=int, default=None, help="Number of trial processes")
+    parser.add_argument("--architecture", dest="model_architecture", choices=["dense", "embedding"], default=None,
+                        help="Model variant the trials train")
+    parser.add_argument("--mixed-precision", dest="mixed_precision_policy", default=None,
+                        help="Keras precision policy for the trials, e.g. mixed_bfloat16")
+    args = parser.parse_args()
+
+    tuner = HyperparameterTuner(args.transformed_data_dir, args.trials, args.workers,
+                                trainer_kwargs={"model_architecture": args.model_architecture,
+                                                "mixed_precision_policy": args.mixed_precision_policy})
+    artifact = tuner.initiate_hyperparameter_tuning()
+    print(f"Best val_loss {artifact.best_val_loss:.4f} with {artifact.best_hyperparameters} -> {artifact.best_hyperparameters_path}")
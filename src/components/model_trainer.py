@@ -2,12 +2,19 @@ from src.exceptions import CustomException
 from src.logger import logging
 
 from src.entity.config_entity import TrainingPipelineConfig, ModelTrainerConfig
+from src.utils.columnar_storage import load_columnar_frame, load_columnar_arrays, read_columnar_schema
+from src.components.data_transformation import DataTransformation
+from src.pipeline.model_runtime import (export_numpy_model, export_quantized_model, embedding_layer_name,
+                                        NumpyModelRuntime, TFLiteModelRuntime)
+from src.utils.instrumentation import instrument, track
 # from src.entity.artifact_entity import DataPreprocessingArtifact, DataTransformationArtifact, ModelTrainerArtifact
+import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout
-from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.layers import Dense, Dropout, Embedding, Concatenate
+from tensorflow.keras.optimizers import Adam, RMSprop, SGD
 from sklearn.model_selection import train_test_split
+from sklearn.ensemble import HistGradientBoostingRegressor
 import numpy as np
 import pandas as pd
 import pickle
@@ -15,92 +22,512 @@ import pickle
 
 import os
 import sys
+import json
+import time
+import argparse
+
+
+OPTIMIZERS = {"adam": Adam, "rmsprop": RMSprop, "sgd": SGD}
+# create_model() arguments that can be tuned; batch_size is tuned too but applies to fit()
+MODEL_HYPERPARAMETERS = ("units", "num_layers", "dropout", "optimizer", "learning_rate")
+
+
+class ThroughputLogger(keras.callbacks.Callback):
+    # Logs training samples/sec per epoch so batch size and thread settings can be tuned
+
+    def __init__(self, n_samples: int):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epoch_start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self.epoch_start
+        samples_per_sec = self.n_samples / elapsed if elapsed else 0.0
+        if logs is not None:
+            logs["samples_per_sec"] = samples_per_sec
+        logging.info(f"Epoch {epoch + 1}: {self.n_samples} samples in {elapsed:.1f}s ({samples_per_sec:.0f} samples/sec)")
+
+
+def timed_call(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
 
 
 class ModelTrainer:
-    def __init__(self):
+    def __init__(self, epochs: int = None, batch_size: int = None, input_pipeline: str = None,
+                 mixed_precision_policy: str = None, model_architecture: str = None, hyperparameters: dict = None,
+                 model_type: str = None, quantization_mode: str = None):
         training_pipeline_config = TrainingPipelineConfig()
         self.model_trainer_config = ModelTrainerConfig(training_pipeline_config=training_pipeline_config)
-        self.clean_data_file_path = self.model_trainer_config.cleaned_data_file_path
+        self.transformed_data_dir = self.model_trainer_config.transformed_data_dir
         self.model_save_path = self.model_trainer_config.model_file_path
+        self.numpy_model_save_path = self.model_trainer_config.numpy_model_file_path
+        self.quantized_model_save_path = self.model_trainer_config.quantized_model_file_path
+        self.quantization_report_path = self.model_trainer_config.quantization_report_path
+        self.quantization_mode = quantization_mode or self.model_trainer_config.quantization_mode
+        self.quantization_calibration_rows = self.model_trainer_config.quantization_calibration_rows
+        self.target_column = self.model_trainer_config.target_column
+        self.model_type = model_type or self.model_trainer_config.model_type
+        self.gbdt_model_save_path = self.model_trainer_config.gbdt_model_file_path
+        self.gbdt_categorical_columns = self.model_trainer_config.gbdt_categorical_columns
+        self.gbdt_hyperparameters = self.model_trainer_config.gbdt_hyperparameters
+        self.gbdt_early_stopping_rounds = self.model_trainer_config.gbdt_early_stopping_rounds
+
+        # Tuned values (see hyperparameter_tuner.py) override the create_model() defaults and the batch size
+        self.hyperparameters = hyperparameters or {}
+        self.model_hyperparameters = {k: v for k, v in self.hyperparameters.items() if k in MODEL_HYPERPARAMETERS}
+
+        self.epochs = epochs or self.model_trainer_config.epochs
+        self.batch_size = batch_size or self.hyperparameters.get("batch_size") or self.model_trainer_config.batch_size
+        self.input_pipeline = input_pipeline or self.model_trainer_config.input_pipeline
+        self.mixed_precision_policy = mixed_precision_policy or self.model_trainer_config.mixed_precision_policy
+        self.early_stopping_patience = self.model_trainer_config.early_stopping_patience
+        self.validation_split = self.model_trainer_config.validation_split
+        self.random_state = self.model_trainer_config.random_state
+        self.model_architecture = model_architecture or self.model_trainer_config.model_architecture
+        self.embedding_columns = self.model_trainer_config.embedding_columns
+        self.embedding_dim = self.model_trainer_config.embedding_dim
+        self.embedding_hash_buckets = self.model_trainer_config.embedding_hash_buckets
+
+    def configure_runtime(self):
+        try:
+            config = self.model_trainer_config
+            # Thread pools can only be sized before TensorFlow runs its first op
+            try:
+                if config.intra_op_threads:
+                    tf.config.threading.set_intra_op_parallelism_threads(config.intra_op_threads)
+                if config.inter_op_threads:
+                    tf.config.threading.set_inter_op_parallelism_threads(config.inter_op_threads)
+            except RuntimeError as e:
+                logging.warning(f"TensorFlow thread settings not applied: {e}")
+
+            if self.mixed_precision_policy:
+                keras.mixed_precision.set_global_policy(self.mixed_precision_policy)
+            logging.info(f"Training with input pipeline '{self.input_pipeline}', {self.epochs} epochs, batch size {self.batch_size}, "
+                         f"precision policy '{keras.mixed_precision.global_policy().name}'")
+
+        except Exception as e:
+            logging.error(f"Error during training runtime configuration: {e}")
+            raise CustomException(e, sys)
 
 
     def load_data(self):
         try:
-            df = pd.read_csv(self.clean_data_file_path)
-            X = df.drop(columns=["Listening_Time_minutes"])
-            y = df["Listening_Time_minutes"]
+            df = load_columnar_frame(self.transformed_data_dir)
+            X = df.drop(columns=[self.target_column])
+            y = df[self.target_column]
 
             logging.info("splitting the data into X_train, X_val, y_train, y_val")
-            X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+            X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=self.validation_split, random_state=self.random_state)
             logging.info("Data loaded and split successfully")
             return X_train, X_val, y_train, y_val
         except Exception as e:
             logging.error(f"Error during data loading: {e}")
             raise CustomException(e, sys)
 
-    def create_model(self,input_dim):
-        model = Sequential()
-        model.add(Dense(128, activation='relu', input_shape=(input_dim,)))
-        model.add(Dropout(0.3))
+    def load_arrays(self):
+        try:
+            # Memory-mapped columns: batches are gathered from the page cache, nothing is copied up front
+            arrays = load_columnar_arrays(self.transformed_data_dir)
+            schema = read_columnar_schema(self.transformed_data_dir)
+            feature_columns = [column["name"] for column in schema["columns"] if column["name"] != self.target_column]
+
+            # Same split as load_data(), expressed as row indices
+            train_indices, val_indices = train_test_split(np.arange(schema["n_rows"]), test_size=self.validation_split,
+                                                          random_state=self.random_state)
+            logging.info(f"Loaded {schema['n_rows']} rows with {len(feature_columns)} features from {self.transformed_data_dir}")
+            return arrays, feature_columns, train_indices, val_indices
+
+        except Exception as e:
+            logging.error(f"Error during columnar data loading: {e}")
+            raise CustomException(e, sys)
+
+    def gather_rows(self, arrays: dict, feature_columns: list, indices: np.ndarray):
+        # Sorted indices turn the random gather into forward reads through each memory map
+        indices = np.sort(indices)
+        features = np.empty((len(indices), len(feature_columns)), dtype=np.float32)
+        for j, col in enumerate(feature_columns):
+            features[:, j] = arrays[col][indices]
+        return features, arrays[self.target_column][indices].astype(np.float32)
+
+    def build_dataset(self, arrays: dict, feature_columns: list, indices: np.ndarray, shuffle: bool):
+        try:
+            n_features = len(feature_columns)
 
-        model.add(Dense(128, activation='relu'))
-        model.add(Dropout(0.3))
+            def gather(batch_indices):
+                return self.gather_rows(arrays, feature_columns, batch_indices)
 
-        model.add(Dense(1))  # Output layer
+            def gather_batch(batch_indices):
+                features, target = tf.numpy_function(gather, [batch_indices], (tf.float32, tf.float32))
+                features.set_shape([None, n_features])
+                target.set_shape([None])
+                return features, target
 
-        optimizer = Adam(learning_rate=0.001)
+            # Shuffle row indices (8 bytes each) rather than rows, reshuffled every epoch
+            dataset = tf.data.Dataset.from_tensor_slices(indices.astype(np.int64))
+            if shuffle:
+                dataset = dataset.shuffle(len(indices), seed=self.random_state, reshuffle_each_iteration=True)
+            dataset = dataset.batch(self.batch_size)
+            dataset = dataset.map(gather_batch, num_parallel_calls=tf.data.AUTOTUNE)
+            return dataset.prefetch(tf.data.AUTOTUNE)
+
+        except Exception as e:
+            logging.error(f"Error during tf.data pipeline creation: {e}")
+            raise CustomException(e, sys)
+
+    def embedding_table_sizes(self) -> dict:
+        try:
+            category_lookups = DataTransformation().load_fitted_encoders()
+
+            table_sizes = {}
+            for column, source_column in self.embedding_columns.items():
+                # One row per known category plus the reserved row for the unknown code len(classes)
+                vocabulary_rows = len(category_lookups[source_column]) + 1
+                if self.embedding_hash_buckets:
+                    table_sizes[column] = min(vocabulary_rows, self.embedding_hash_buckets)
+                else:
+                    table_sizes[column] = vocabulary_rows
+            logging.info(f"Embedding table sizes: {table_sizes}")
+
+            return table_sizes
+        except Exception as e:
+            logging.error(f"Error during embedding table sizing: {e}")
+            raise CustomException(e, sys)
+
+    def create_embedding_model(self, feature_columns: list, table_sizes: dict, units: int = 128, num_layers: int = 2,
+                               dropout: float = 0.3, optimizer: str = "adam", learning_rate: float = 0.001):
+        inputs = keras.Input(shape=(len(feature_columns),))
+
+        # Numeric columns pass straight through; each ID column selects a row of its table.
+        # Codes are taken modulo the table size, so vocabulary tables are indexed directly, hashed
+        # tables stay a fixed size, and unseen IDs resolve in O(1) at serve time.
+        embedding_indices = sorted(feature_columns.index(col) for col in self.embedding_columns)
+        numeric_indices = [i for i in range(len(feature_columns)) if i not in embedding_indices]
+        parts = [keras.ops.take(inputs, numeric_indices, axis=1)]
+        for column_index in embedding_indices:
+            table_size = table_sizes[feature_columns[column_index]]
+            codes = keras.ops.mod(keras.ops.cast(keras.ops.take(inputs, column_index, axis=1), "int32"), table_size)
+            parts.append(Embedding(table_size, self.embedding_dim, name=embedding_layer_name(column_index))(codes))
+
+        x = Concatenate()(parts)
+        for _ in range(num_layers):
+            x = Dense(units, activation='relu')(x)
+            x = Dropout(dropout)(x)
+        outputs = Dense(1, dtype="float32")(x)
+
+        model = keras.Model(inputs, outputs)
+        model.compile(optimizer=OPTIMIZERS[optimizer](learning_rate=learning_rate), loss='mse', metrics=['mae'])
+
+        return model
+
+    def create_model(self, input_dim, feature_columns: list = None, table_sizes: dict = None, units: int = 128,
+                     num_layers: int = 2, dropout: float = 0.3, optimizer: str = "adam", learning_rate: float = 0.001):
+        if self.model_architecture == "embedding":
+            return self.create_embedding_model(feature_columns, table_sizes, units, num_layers, dropout, optimizer, learning_rate)
+        if self.model_architecture != "dense":
+            raise ValueError(f"Unknown model architecture '{self.model_architecture}', expected 'dense' or 'embedding'")
+
+        model = Sequential()
+        model.add(keras.Input(shape=(input_dim,)))
+        for _ in range(num_layers):
+            model.add(Dense(units, activation='relu'))
+            model.add(Dropout(dropout))
+
+        model.add(Dense(1, dtype="float32"))  # Output layer, kept in float32 under mixed precision
+
+        optimizer = OPTIMIZERS[optimizer](learning_rate=learning_rate)
         model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
         
         return model
-    
+
+    @instrument("model_trainer.export_numpy_model")
+    def export_numpy_model(self, model, X_val) -> str:
+        try:
+            os.makedirs(os.path.dirname(self.numpy_model_save_path), exist_ok=True)
+            export_numpy_model(model, self.numpy_model_save_path)
+
+            # --- Parity check: the NumPy forward pass must reproduce the Keras predictions ---
+            X_val = np.asarray(X_val, dtype=np.float32)
+            keras_predictions = model.predict(X_val, verbose=0)
+            numpy_predictions = NumpyModelRuntime(self.numpy_model_save_path).predict(X_val)
+            max_abs_diff = float(np.max(np.abs(keras_predictions - numpy_predictions))) if len(X_val) else 0.0
+            logging.info(f"NumPy runtime parity on {len(X_val)} rows: max abs diff {max_abs_diff:.2e}")
+
+            if not np.allclose(keras_predictions, numpy_predictions, rtol=1e-4, atol=1e-3):
+                raise ValueError(f"NumPy runtime predictions differ from Keras (max abs diff {max_abs_diff})")
+
+            return self.numpy_model_save_path
+
+        except Exception as e:
+            logging.error(f"Error during NumPy model export: {e}")
+            raise CustomException(e, sys)
+
+    @instrument("model_trainer.export_quantized_model")
+    def export_quantized_model(self, model, calibration_features, X_val, y_val) -> dict:
+        try:
+            os.makedirs(os.path.dirname(self.quantized_model_save_path), exist_ok=True)
+            export_quantized_model(model, self.quantized_model_save_path, calibration_features, self.quantization_mode)
+            return self.evaluate_quantized_model(X_val, y_val)
+
+        except Exception as e:
+            logging.error(f"Error during quantized model export: {e}")
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def measure_runtime(runtime, features: np.ndarray, single_row_calls: int = 200) -> dict:
+        # One thread, after a warm-up call: bulk rows/sec over all rows and the median single-row latency
+        runtime.warm_up()
+        bulk_seconds = min(timed_call(runtime.predict, features) for _ in range(3))
+        single_row_seconds = sorted(timed_call(runtime.predict, features[i % len(features)][None, :])
+                                    for i in range(single_row_calls))
+        return {"bulk_rows_per_sec": round(len(features) / bulk_seconds, 1),
+                "single_row_latency_us": round(single_row_seconds[single_row_calls // 2] * 1e6, 2)}
+
+    def evaluate_quantized_model(self, X_val, y_val) -> dict:
+        try:
+            # --- RMSE drift of the quantized model against the float model on the validation split ---
+            X_val = np.ascontiguousarray(X_val, dtype=np.float32)
+            y_val = np.asarray(y_val, dtype=np.float32).reshape(-1)
+
+            # The NumPy runtime is the float reference (its parity with Keras is checked on export)
+            float_runtime = NumpyModelRuntime(self.numpy_model_save_path)
+            quantized_runtime = TFLiteModelRuntime(self.quantized_model_save_path)
+            float_predictions = float_runtime.predict(X_val).reshape(-1)
+            quantized_predictions = quantized_runtime.predict(X_val).reshape(-1)
+
+            rmse_float = float(np.sqrt(np.mean((float_predictions - y_val) ** 2)))
+            rmse_quantized = float(np.sqrt(np.mean((quantized_predictions - y_val) ** 2)))
+            prediction_diff = np.abs(quantized_predictions - float_predictions)
+
+            report = {
+                "quantization": self.quantization_mode,
+                "validation_rows": len(y_val),
+                "rmse_float": round(rmse_float, 5),
+                "rmse_quantized": round(rmse_quantized, 5),
+                "rmse_drift": round(rmse_quantized - rmse_float, 5),
+                "rmse_drift_pct": round(100 * (rmse_quantized - rmse_float) / rmse_float, 3) if rmse_float else None,
+                "prediction_abs_diff_mean": round(float(prediction_diff.mean()), 5),
+                "prediction_abs_diff_max": round(float(prediction_diff.max()), 5),
+                "model_file_bytes": {"keras": os.path.getsize(self.model_save_path),
+                                     "numpy": os.path.getsize(self.numpy_model_save_path),
+                                     "tflite": os.path.getsize(self.quantized_model_save_path)},
+                "numpy": self.measure_runtime(float_runtime, X_val),
+                "tflite": self.measure_runtime(quantized_runtime, X_val),
+            }
+
+            with open(self.quantization_report_path, "w") as f:
+                json.dump(report, f, indent=2)
+            logging.info(f"Quantized model: RMSE {rmse_float:.4f} -> {rmse_quantized:.4f} on {len(y_val)} validation rows, "
+                         f"{report['numpy']['bulk_rows_per_sec']:.0f} -> {report['tflite']['bulk_rows_per_sec']:.0f} rows/sec; "
+                         f"report at {self.quantization_report_path}")
+
+            return report
+
+        except Exception as e:
+            logging.error(f"Error during quantized model evaluation: {e}")
+            raise CustomException(e, sys)
+
+    def export_saved_model(self) -> str:
+        try:
+            logging.info(f"Exporting the saved model {self.model_save_path} for the NumPy runtime")
+            with open(self.model_save_path, "rb") as f:
+                model = pickle.load(f)
+
+            # Check parity on a random sample when no training data is around
+            X_check = np.random.default_rng(42).normal(size=(1024, int(model.input_shape[-1]))).astype(np.float32)
+            return self.export_numpy_model(model, X_check)
+
+        except Exception as e:
+            logging.error(f"Error during saved model export: {e}")
+            raise CustomException(e, sys)
+
+    def quantize_saved_model(self) -> dict:
+        try:
+            logging.info(f"Quantizing the saved model {self.model_save_path}")
+            with open(self.model_save_path, "rb") as f:
+                model = pickle.load(f)
+
+            X_train, X_val, y_train, y_val = self.load_data()
+            calibration_features = X_train.sample(min(self.quantization_calibration_rows, len(X_train)),
+                                                  random_state=self.random_state)
+            return self.export_quantized_model(model, calibration_features, X_val, y_val)
+
+        except Exception as e:
+            logging.error(f"Error during saved model quantization: {e}")
+            raise CustomException(e, sys)
+
+    def gbdt_categorical_features(self, arrays: dict, feature_columns: list) -> np.ndarray:
+        # HistGradientBoosting takes categorical codes below max_bins; wider code columns are split as numbers
+        max_bins = self.gbdt_hyperparameters.get("max_bins", 255)
+        categorical = np.zeros(len(feature_columns), dtype=bool)
+        for col in self.gbdt_categorical_columns:
+            if col not in feature_columns:
+                continue
+            if int(arrays[col].max()) >= max_bins:
+                logging.warning(f"{col} has codes of {max_bins} or more, the GBDT uses it as a numeric column")
+                continue
+            categorical[feature_columns.index(col)] = True
+        logging.info(f"GBDT categorical columns: {[col for col, is_cat in zip(feature_columns, categorical) if is_cat]}")
+        return categorical
+
+    def train_gbdt_model(self):
+        try:
+            logging.info("Training gradient-boosted trees")
+
+            # Same rows and split as the MLP's tf_data pipeline, gathered once from the memory-mapped columns
+            with track("model_trainer.load_data") as step:
+                arrays, feature_columns, train_indices, val_indices = self.load_arrays()
+                X_train, y_train = self.gather_rows(arrays, feature_columns, train_indices)
+                X_val, y_val = self.gather_rows(arrays, feature_columns, val_indices)
+                step.rows = len(X_train) + len(X_val)
+
+            model = HistGradientBoostingRegressor(
+                categorical_features=self.gbdt_categorical_features(arrays, feature_columns),
+                early_stopping=True,
+                n_iter_no_change=self.gbdt_early_stopping_rounds,
+                random_state=self.random_state,
+                **self.gbdt_hyperparameters,
+            )
+
+            # Early stopping scores the validation split, not a random fraction of the training rows
+            with track("model_trainer.fit") as step:
+                model.fit(X_train, y_train, X_val=X_val, y_val=y_val)
+                step.rows = len(X_train) * model.n_iter_
+
+            val_rmse = float(np.sqrt(np.mean((model.predict(X_val) - y_val) ** 2)))
+            logging.info(f"GBDT trained: {model.n_iter_} trees, validation RMSE {val_rmse:.4f}")
+
+            os.makedirs(os.path.dirname(self.gbdt_model_save_path), exist_ok=True)
+            with open(self.gbdt_model_save_path, "wb") as f:
+                pickle.dump(model, f)
+            logging.info(f"GBDT model saved at {self.gbdt_model_save_path}")
+
+        except Exception as e:
+            logging.error(f"Error during GBDT training: {e}")
+            raise CustomException(e, sys)
+
     def initiate_model_trainer(self):
         try:
             logging.info("Model Trainer initiated")
+            if self.model_type == "gbdt":
+                return self.train_gbdt_model()
+            if self.model_type != "mlp":
+                raise ValueError(f"Unknown model type '{self.model_type}', expected 'mlp' or 'gbdt'")
+            self.configure_runtime()
+
             logging.info("Loading the data")
-            logging.info("Splitting the data into X_train, X_val, y_train, y_val")
-            # Load and split the data
-            X_train, X_val, y_train, y_val = self.load_data()
+            with track("model_trainer.load_data") as step:
+                if self.input_pipeline == "tf_data":
+                    arrays, feature_columns, train_indices, val_indices = self.load_arrays()
+                    train_data = self.build_dataset(arrays, feature_columns, train_indices, shuffle=True)
+                    validation_data = self.build_dataset(arrays, feature_columns, val_indices, shuffle=False)
+                    X_val, y_val = self.gather_rows(arrays, feature_columns, val_indices)
+                    calibration_indices = np.random.default_rng(self.random_state).choice(
+                        train_indices, min(self.quantization_calibration_rows, len(train_indices)), replace=False)
+                    calibration_features, _ = self.gather_rows(arrays, feature_columns, calibration_indices)
+                    input_dim, n_train = len(feature_columns), len(train_indices)
+                    fit_kwargs = {"shuffle": False}  # the dataset reshuffles itself every epoch
+                elif self.input_pipeline == "in_memory":
+                    logging.info("Splitting the data into X_train, X_val, y_train, y_val")
+                    X_train, X_val, y_train, y_val = self.load_data()
+                    train_data, validation_data = X_train, (X_val, y_val)
+                    calibration_features = X_train.sample(min(self.quantization_calibration_rows, len(X_train)),
+                                                          random_state=self.random_state)
+                    feature_columns = list(X_train.columns)
+                    input_dim, n_train = X_train.shape[1], len(X_train)
+                    fit_kwargs = {"y": y_train, "batch_size": self.batch_size}
+                else:
+                    raise ValueError(f"Unknown input pipeline '{self.input_pipeline}', expected 'tf_data' or 'in_memory'")
+                step.rows = n_train + len(X_val)
             logging.info("Data loaded and split successfully")
 
             logging.info("Creating the model")
             # Create the model
-            model = self.create_model(input_dim=X_train.shape[1])
-            logging.info("Model created successfully")
+            table_sizes = self.embedding_table_sizes() if self.model_architecture == "embedding" else None
+            model = self.create_model(input_dim, feature_columns, table_sizes, **self.model_hyperparameters)
+            logging.info(f"Model created successfully ({self.model_architecture} architecture, {model.count_params()} parameters)")
 
             logging.info("Fitting the model")
 
             early_stopping = keras.callbacks.EarlyStopping(
             monitor='val_loss',
-            patience=5,
+            patience=self.early_stopping_patience,
             restore_best_weights=True,
             verbose=1
             )
 
-            history = model.fit(
-            X_train, y_train,
-            epochs=2,
-            validation_data=(X_val, y_val),
-            callbacks=[early_stopping],
-            batch_size=32
-            )
+            with track("model_trainer.fit") as step:
+                history = model.fit(
+                train_data,
+                epochs=self.epochs,
+                validation_data=validation_data,
+                callbacks=[early_stopping, ThroughputLogger(n_train)],
+                **fit_kwargs
+                )
+                # Rows seen across all epochs that actually ran (early stopping may end the fit sooner)
+                step.rows = n_train * len(history.history['val_loss'])
 
             logging.info(f"Model trained successfully. Final validation loss: {history.history['val_loss'][-1]}")
 
+            if self.mixed_precision_policy:
+                # Mixed precision only speeds up training; the saved model computes in float32
+                keras.mixed_precision.set_global_policy("float32")
+                float32_model = self.create_model(input_dim, feature_columns, table_sizes, **self.model_hyperparameters)
+                float32_model.set_weights(model.get_weights())
+                model = float32_model
+
             model_path = self.model_save_path
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
             with open(model_path, "wb") as f:
                 pickle.dump(model, f)
             logging.info(f"Model saved at {model_path}")
 
+            # Export the weights so serving can run without TensorFlow
+            self.export_numpy_model(model, X_val)
+
+            if self.quantization_mode:
+                self.export_quantized_model(model, calibration_features, X_val, y_val)
 
-            # Fit the model
-            logging.info(f"Model trained successfully. Final validation loss: {history.history['val_loss'][-1]}")
         except Exception as e:
             raise CustomException(e, sys)
         
 
  
-# if __name__ == "__main__":
-#     model_trainer = ModelTrainer()
-#     model_trainer.initiate_model_trainer()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the model or export the saved one")
+    parser.add_argument("--export-numpy", action="store_true",
+                        help="Export saved_models/model.pkl to model.npz for the NumPy runtime instead of training")
+    parser.add_argument("--export-quantized", action="store_true",
+                        help="Quantize saved_models/model.pkl for the tflite backend and report its RMSE drift instead of training")
+    parser.add_argument("--quantization", choices=["int8", "dynamic_int8", "float16"], default=None,
+                        help="Post-training quantization mode (default: QUANTIZATION_MODE)")
+    parser.add_argument("--transformed-data-dir", default=None,
+                        help="Columnar training data of an earlier run, e.g. Artifacts/<timestamp>/data_transformation/transformed_data")
+    parser.add_argument("--epochs", type=int, default=None, help="Maximum training epochs (early stopping may end sooner)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Training batch size")
+    parser.add_argument("--input-pipeline", choices=["tf_data", "in_memory"], default=None,
+                        help="Stream batches from the columnar artifact or fit on DataFrames")
+    parser.add_argument("--mixed-precision", dest="mixed_precision_policy", default=None,
+                        help="Keras precision policy, e.g. mixed_bfloat16")
+    parser.add_argument("--architecture", dest="model_architecture", choices=["dense", "embedding"], default=None,
+                        help="Feed the ID columns to the MLP as numbers or through learned embeddings")
+    parser.add_argument("--model-type", choices=["mlp", "gbdt"], default=None,
+                        help="Train the Keras MLP or scikit-learn gradient-boosted trees (default: MODEL_TYPE)")
+    args = parser.parse_args()
+
+    model_trainer = ModelTrainer(args.epochs, args.batch_size, args.input_pipeline, args.mixed_precision_policy,
+                                 args.model_architecture, model_type=args.model_type, quantization_mode=args.quantization)
+    if args.transformed_data_dir:
+        model_trainer.transformed_data_dir = args.transformed_data_dir
+    if args.export_quantized and not model_trainer.quantization_mode:
+        parser.error("--export-quantized needs --quantization when QUANTIZATION_MODE is None")
+    if args.export_numpy:
+        model_trainer.export_saved_model()
+    elif args.export_quantized:
+        print(json.dumps(model_trainer.quantize_saved_model(), indent=2))
+    else:
+        model_trainer.initiate_model_trainer()
@@ -0,0 +1,159 @@
+from src.exceptions import CustomException
+from src.logger import logging
+
+import sys
+import numpy as np
+import pandas as pd
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.data_transformation import DataTransformation
+from src.entity.artifact_entity import DataTransformationArtifact, PreprocessingState
+from src.utils.columnar_storage import ColumnarFrameWriter, load_columnar_arrays
+
+
+# Fixed-size uniform row sample of a stream (Algorithm R, vectorized per chunk)
+class ReservoirSample:
+    def __init__(self, capacity: int, seed: int = 42):
+        self.capacity = capacity
+        self.rows_seen = 0
+        self.values = None
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        n_rows = len(values)
+        if self.values is None:
+            self.values = np.empty((self.capacity, values.shape[1]), dtype=np.float64)
+
+        # --- Fill the reservoir until it reaches capacity ---
+        n_fill = max(0, min(self.capacity - self.rows_seen, n_rows))
+        self.values[self.rows_seen:self.rows_seen + n_fill] = values[:n_fill]
+
+        # --- Row t replaces a random slot with probability capacity / (t + 1) ---
+        rest = values[n_fill:]
+        if len(rest):
+            positions = np.arange(self.rows_seen + n_fill, self.rows_seen + n_rows)
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            accepted = slots < self.capacity
+            self.values[slots[accepted]] = rest[accepted]
+
+        self.rows_seen += n_rows
+
+    def to_frame(self, columns: list) -> pd.DataFrame:
+        return pd.DataFrame(self.values[:min(self.rows_seen, self.capacity)], columns=columns)
+
+
+class StreamingDataPreprocessing:
+    def __init__(self, chunk_size: int = None):
+        self.data_preprocessing = DataPreprocessing()
+        self.data_transformation = DataTransformation()
+
+        self.data_preprocessing_config = self.data_preprocessing.data_preprocessing_config
+        self.data_file_path = self.data_preprocessing.data_file_path
+        self.transformed_data_dir = self.data_transformation.data_transformation_config.transformed_data_dir
+        self.chunk_size = chunk_size or self.data_preprocessing_config.chunk_size
+
+        self.categorical_columns = ['Podcast_Name', 'Episode_Title'] + self.data_transformation.columns_to_encode
+        # Column of the transformed artifact holding each categorical column's codes
+        self.code_columns = {'Podcast_Name': 'Podcast_ID', 'Episode_Title': 'Title_ID',
+                             **{col: col for col in self.data_transformation.columns_to_encode}}
+
+    def read_chunks(self):
+        return self.data_preprocessing.data_schema.read_csv(self.data_file_path, chunksize=self.chunk_size)
+
+    def collect_statistics(self) -> PreprocessingState:
+        try:
+            logging.info(f"Collecting training statistics from {self.data_file_path} in chunks of {self.chunk_size} rows")
+
+            sample = ReservoirSample(self.data_preprocessing_config.statistics_sample_size)
+            vocabularies = {col: set() for col in self.categorical_columns}
+            numeric_features = None
+
+            # --- First pass: bounded-size row sample for medians/means/quantiles, category vocabularies of all rows ---
+            for chunk in self.read_chunks():
+                if numeric_features is None:
+                    numeric_features, _ = self.data_preprocessing.types_of_columns(chunk)
+                sample.update(chunk[numeric_features].to_numpy(dtype=np.float64))
+                for col in self.categorical_columns:
+                    vocabularies[col].update(chunk[col].dropna().unique())
+
+            logging.info(f"Statistics pass read {sample.rows_seen} rows, sampled {min(sample.rows_seen, sample.capacity)}")
+
+            # --- Fit the preprocessing state on the sample exactly as the in-memory path does ---
+            sample_df = sample.to_frame(numeric_features)
+            self.data_preprocessing.preprocessing_state = PreprocessingState()
+            sample_df = self.data_preprocessing.fill_missing_values(sample_df)
+            sample_df = self.data_preprocessing.replace_zero_values(sample_df)
+            self.data_preprocessing.remove_outliers(sample_df, numeric_features)
+            self.data_preprocessing.save_preprocessing_state()
+
+            self.data_transformation.fit_encoders_from_vocabulary(vocabularies)
+
+            return self.data_preprocessing.preprocessing_state
+
+        except Exception as e:
+            logging.error(f"Error during streaming statistics collection: {e}")
+            raise CustomException(e, sys)
+
+    def remap_dropped_categories(self, kept_vocabularies: dict):
+        # The first pass also collects categories that only occur in rows the outlier filter drops, which the in-memory
+        # path never fits. The encoders are refit on the kept rows and the written codes are shifted to match them.
+        try:
+            first_pass_vocabularies = dict(self.data_transformation.categorical_encoder.vocabularies)
+            changed = [col for col in self.categorical_columns
+                       if len(set(kept_vocabularies[col])) != len(first_pass_vocabularies[col])]
+            if not changed:
+                return
+
+            self.data_transformation.fit_encoders_from_vocabulary(kept_vocabularies)
+            encoder = self.data_transformation.categorical_encoder
+            arrays = load_columnar_arrays(self.transformed_data_dir, [self.code_columns[col] for col in changed],
+                                          mmap_mode="r+")
+            for col in changed:
+                # Old code -> new code; the unknown bucket (old code len(old vocabulary)) stays the unknown bucket
+                table = np.append(encoder.vocabulary_codes(col, first_pass_vocabularies[col]),
+                                  len(encoder.vocabularies[col])).astype(arrays[self.code_columns[col]].dtype)
+                codes = arrays[self.code_columns[col]]
+                for start in range(0, len(codes), self.chunk_size):
+                    codes[start:start + self.chunk_size] = table[codes[start:start + self.chunk_size]]
+                codes.flush()
+                logging.info(f"{len(first_pass_vocabularies[col]) - len(encoder.vocabularies[col])} categories of {col} "
+                             f"only occur in dropped rows, codes remapped")
+
+        except Exception as e:
+            logging.error(f"Error during remapping dropped categories: {e}")
+            raise CustomException(e, sys)
+
+    def initiate_streaming_preprocessing(self) -> DataTransformationArtifact:
+        try:
+            logging.info("Streaming data preprocessing started")
+
+            state = self.collect_statistics()
+
+            writer = ColumnarFrameWriter(self.transformed_data_dir)
+            kept_vocabularies = {col: set() for col in self.categorical_columns}
+            rows_in = 0
+
+            # --- Second pass: fill -> zero-replace -> outlier filter -> encode, appended to the columnar artifact ---
+            for chunk in self.read_chunks():
+                rows_in += len(chunk)
+                numeric_features, _ = self.data_preprocessing.types_of_columns(chunk)
+
+                chunk = self.data_preprocessing.fill_missing_values(chunk, state=state)
+                chunk = self.data_preprocessing.replace_zero_values(chunk, state=state)
+                chunk = self.data_preprocessing.remove_outliers(chunk, numeric_features, state=state)
+                for col in self.categorical_columns:
+                    kept_vocabularies[col].update(chunk[col].dropna().unique())
+                chunk = self.data_transformation.transform_label_encoding(chunk)
+                chunk = self.data_transformation.transform_other_columns_encoding(chunk)
+                chunk = self.data_transformation.drop_unwanted_columns(chunk)
+
+                writer.append(chunk)
+
+            writer.close()
+            self.remap_dropped_categories(kept_vocabularies)
+            logging.info(f"Streaming preprocessing wrote {writer.n_rows} of {rows_in} rows to {self.transformed_data_dir}")
+
+            return DataTransformationArtifact(transformed_data_dir=self.transformed_data_dir)
+
+        except Exception as e:
+            logging.error(f"Error during streaming data preprocessing: {e}")
+            raise CustomException(e, sys)
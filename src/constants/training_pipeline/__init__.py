@@ -13,33 +13,193 @@ FILE_NAME: str = "submission.csv"
 DATA_FILE_NAME: str = "train.csv"
 VALIDATION_FILE_NAME: str = "test.csv"
 
-
-CLEANED_DATA_FILE_NAME: str = "cleaned_data.csv"
-
-TRAIN_FILE_NAME: str = "train.csv"
-TEST_FILE_NAME: str = "test.csv"
+# Intermediate artifacts are columnar directories (see src/utils/columnar_storage.py)
+CLEANED_DATA_DIR_NAME: str = "cleaned_data"
+TRANSFORMED_DATA_DIR_NAME: str = "transformed_data"
+INTEGER_STORAGE_DTYPE: str = "int32"
+FLOAT_STORAGE_DTYPE: str = "float32"
 
 DATASET_DIR_PATH: str = os.path.join("dataset")
 
 
-SCHEMA_FILE_PATH = os.path.join("data_schema","schema.yaml")
+SCHEMA_FILE_PATH = os.path.join("data_schema","data.yaml")
 
 SAVED_MODEL_DIR = os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
+NUMPY_MODEL_FILE_NAME = "model.npz"
+QUANTIZED_MODEL_FILE_NAME = "model_quantized.tflite"
+QUANTIZATION_REPORT_FILE_NAME = "quantization_report.json"
+GBDT_MODEL_FILE_NAME = "model_gbdt.pkl"
 
 SPLIT_RATIO = 0.2
 
 
 
+"""
+Stage cache related constants
+"""
+# Content-addressed stage outputs reused by main.py when inputs, config and code are unchanged
+STAGE_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "cache")
+
+
+"""
+Instrumentation related constants
+"""
+# Per-stage and per-step timings, row counts and memory written by main.py into Artifacts/<timestamp>/
+RUN_REPORT_FILE_NAME: str = "run_report.json"
+# cProfile dumps of single requests (app.py ?profile=true) and runs; requests are only profiled when enabled
+PROFILE_DIR: str = "profiles"
+REQUEST_PROFILING_ENABLED: bool = os.getenv("REQUEST_PROFILING_ENABLED", "0") == "1"
+
+
+"""
+Model registry related constants
+"""
+# Every training run registers its model, encoders and preprocessing state as one immutable bundle:
+#   saved_models/registry/versions/<version>/ and a LATEST file naming the version to serve
+MODEL_REGISTRY_DIR: str = os.path.join(SAVED_MODEL_DIR, "registry")
+MODEL_REGISTRY_LATEST_FILE_NAME: str = "LATEST"
+BUNDLE_MANIFEST_FILE_NAME: str = "manifest.json"
+# Oldest versions beyond this count are deleted on registration (the served version is always kept)
+MODEL_REGISTRY_KEEP_VERSIONS = 10
+# How often app.py checks LATEST for a new version; 0 disables hot reload (env MODEL_RELOAD_INTERVAL_SECONDS)
+MODEL_RELOAD_INTERVAL_SECONDS = 10
+
+
 """
 Data Ingestion  realated constanat start with DATA_INGESTION VAR NAME
 """
 
 
+"""
+Data Preprocessing related constants
+"""
+DATA_PREPROCESSING_DIR_NAME: str = "data_preprocessing"
+PREPROCESSING_STATE_PATH = os.path.join( "preprocessing_state.pkl")
+COLUMNS_TO_FILL = ["Episode_Length_minutes", "Guest_Popularity_percentage", "Number_of_Ads"]
+ZERO_AS_MISSING_COLUMNS = ["Episode_Length_minutes", "Host_Popularity_percentage",
+                           "Guest_Popularity_percentage", "Listening_Time_minutes"]
+CHUNK_SIZE = 100_000
+STATISTICS_SAMPLE_SIZE = 200_000
+
+
 """
 Data Transformation related constants
 """
+DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 TITLE_ENCODER_PATH = os.path.join( "title_encoder.pkl")
 PODCAST_ENCODER_PATH = os.path.join( "podcast_encoder.pkl")
 OTHER_CAT_ENCODER_PATH = os.path.join( "other_cat_encoder.pkl")
-STANDARSCALER_PATH = os.path.join( "standard_scaler.pkl")
\ No newline at end of file
+STANDARSCALER_PATH = os.path.join( "standard_scaler.pkl")
+
+
+"""
+Model Trainer related constants
+"""
+# "tf_data" streams batches from the memory-mapped transformed artifact, "in_memory" fits on DataFrames
+TRAINING_INPUT_PIPELINE: str = "tf_data"
+TRAINING_EPOCHS = 30
+TRAINING_BATCH_SIZE = 512
+EARLY_STOPPING_PATIENCE = 5
+VALIDATION_SPLIT = 0.2
+TRAINING_RANDOM_STATE = 42
+# None keeps float32; "mixed_bfloat16" speeds up CPUs with AVX512-BF16/AMX
+MIXED_PRECISION_POLICY = None
+# 0 lets TensorFlow pick the number of threads
+INTRA_OP_THREADS = 0
+INTER_OP_THREADS = 0
+# "dense" feeds every column into the MLP, "embedding" looks up learned vectors for the ID columns
+MODEL_ARCHITECTURE: str = "dense"
+# Post-training quantization for the "tflite" backend: "int8" (integer weights and activations, calibrated on
+# training rows), "dynamic_int8" (integer weights only), "float16" (half-precision weights) or None to skip it.
+# Opt-in (e.g. `python main.py --quantization int8`): int8 export needs TensorFlow's experimental quantization debugger
+QUANTIZATION_MODE: str = None
+QUANTIZATION_CALIBRATION_ROWS = 1000
+# "mlp" trains the Keras network, "gbdt" a scikit-learn HistGradientBoostingRegressor on the same columns
+MODEL_TYPE: str = "mlp"
+# Code columns from DataTransformation that the GBDT splits by category sets instead of code thresholds;
+# columns with codes at or above max_bins are used as numbers
+GBDT_CATEGORICAL_COLUMNS = ["Genre", "Publication_Day", "Publication_Time", "Episode_Sentiment", "Podcast_ID", "Title_ID"]
+GBDT_HYPERPARAMETERS = {
+    "learning_rate": 0.1,
+    "max_iter": 500,
+    "max_leaf_nodes": 63,
+    "min_samples_leaf": 20,
+    "l2_regularization": 0.0,
+    "max_bins": 255,
+}
+# Boosting stops after this many rounds without improvement of the validation loss
+GBDT_EARLY_STOPPING_ROUNDS = 20
+# Model input column -> source column whose fitted encoder defines the vocabulary
+EMBEDDING_COLUMNS = {"Podcast_ID": "Podcast_Name", "Title_ID": "Episode_Title"}
+EMBEDDING_DIM = 16
+# None sizes each table to its vocabulary plus one unknown row; an int caps every table at that many hashed rows
+EMBEDDING_HASH_BUCKETS = None
+
+
+"""
+Hyperparameter Tuning related constants
+"""
+# Not timestamped, so an interrupted search resumes on the next run
+TUNING_DIR: str = os.path.join(ARTIFACT_DIR, "tuning")
+TUNING_SEARCH_NAME: str = "podcast_mlp"
+BEST_HYPERPARAMETERS_FILE_NAME: str = "best_hyperparameters.json"
+TUNING_TRIALS = 20
+TUNING_WORKERS = 2
+TUNING_EPOCHS = 10
+# Median stopping: from this epoch on, a trial worse than the median of the other trials at the same epoch is stopped
+TUNING_MIN_EPOCHS_BEFORE_PRUNING = 2
+TUNING_SEED = 42
+# Lists are sampled uniformly, (low, high) tuples log-uniformly (same space as Notebooks/tuner_results)
+HYPERPARAMETER_SPACE = {
+    "units": [64, 128, 192, 256],
+    "num_layers": [1, 2, 3],
+    "dropout": [0.2, 0.3, 0.4, 0.5],
+    "optimizer": ["adam", "rmsprop", "sgd"],
+    "learning_rate": (1e-4, 1e-2),
+    "batch_size": [256, 512, 1024],
+}
+
+
+"""
+Cross-validation related constants
+"""
+# main.py --cv trains CV_FOLDS fold models in CV_WORKERS processes and serves their average
+CROSS_VALIDATION_DIR_NAME: str = "cross_validation"
+OOF_PREDICTIONS_FILE_NAME: str = "oof_predictions.npy"
+CROSS_VALIDATION_REPORT_FILE_NAME: str = "cv_report.json"
+CV_FOLDS = 5
+CV_WORKERS = 2
+
+
+"""
+Prediction related constants
+"""
+# "keras" serves model.pkl through TensorFlow, "numpy" serves model.npz without TensorFlow,
+# "tflite" serves the quantized model_quantized.tflite through the LiteRT interpreter (ai-edge-litert)
+# "gbdt" serves model_gbdt.pkl (MODEL_TYPE = "gbdt") through scikit-learn
+MODEL_BACKEND: str = "keras"
+# Backends able to serve each MODEL_TYPE; a registered bundle is served by the first one when MODEL_BACKEND cannot load it
+MODEL_TYPE_BACKENDS = {"mlp": ["keras", "numpy", "tflite"], "gbdt": ["gbdt"]}
+PREDICTION_BATCH_BUCKETS = [1, 8, 32, 128, 512, 2048]
+NUMPY_RUNTIME_BATCH_SIZE = 8192
+# Rows per interpreter call; small batches keep the int8 activations in cache
+TFLITE_RUNTIME_BATCH_SIZE = 512
+PREDICTION_OUTPUT_FILE_NAME: str = "predictions.csv"
+BATCH_PREDICTION_CHUNK_SIZE = 50_000
+BATCH_PREDICTION_WORKERS = 1
+# Fewer rows than this are scored in one process whatever the worker count: a spawned worker takes about 7 s to start
+# with the keras backend (TensorFlow import and model load) and under 1 s with the others, while one process scores
+# about 200k rows/sec, so sharding only pays off on files larger than start-up time x throughput
+BATCH_PREDICTION_PARALLEL_MIN_ROWS = {"keras": 2_000_000, "numpy": 200_000, "tflite": 200_000, "gbdt": 200_000}
+PREDICTION_UPLOAD_CHUNK_SIZE = 10_000
+PREDICTION_WORKER_THREADS = 4
+MICRO_BATCH_MAX_ROWS = 256
+MICRO_BATCH_MAX_WAIT_MS = 5
+# Predictions of repeated feature rows are served from an LRU cache (env PREDICTION_CACHE_ENABLED=0 turns it off)
+PREDICTION_CACHE_ENABLED: bool = True
+PREDICTION_CACHE_MAX_ENTRIES = 100_000
+PREDICTION_CACHE_TTL_SECONDS = 3600
+# SQLite file that receives entries evicted from memory, e.g. "Artifacts/prediction_cache.sqlite" (env PREDICTION_CACHE_DISK_PATH)
+PREDICTION_CACHE_DISK_PATH: str = None
+PREDICTION_CACHE_DISK_MAX_ENTRIES = 2_000_000
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict
 
 @dataclass
 class DataIngestionArtifact:
@@ -6,11 +7,30 @@ class DataIngestionArtifact:
 
 @dataclass
 class DataPreprocessingArtifact:
-   cleaned_data_file_path: str
+   cleaned_data_dir: str
 
 @dataclass
 class DataTransformationArtifact:
-   cleaned_data_file_path: str
+   transformed_data_dir: str
+
+@dataclass
+class PreprocessingState:
+   medians: Dict[str, float] = field(default_factory=dict)
+   means: Dict[str, float] = field(default_factory=dict)
+   lower_bounds: Dict[str, float] = field(default_factory=dict)
+   upper_bounds: Dict[str, float] = field(default_factory=dict)
+
+@dataclass
+class HyperparameterTunerArtifact:
+   best_hyperparameters_path: str
+   best_hyperparameters: Dict[str, object]
+   best_val_loss: float
+
+@dataclass
+class CrossValidationArtifact:
+   oof_predictions_path: str
+   report_path: str
+   oof_rmse: float
 
 class ModelTrainerArtifact:
    model_save_path: str
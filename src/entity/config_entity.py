@@ -2,9 +2,6 @@ from datetime import datetime
 import os
 from src.constants import training_pipeline
 
-print(training_pipeline.PIPELINE_NAME)
-print(training_pipeline.ARTIFACT_DIR)
-
 class TrainingPipelineConfig:
     def __init__(self,timestamp=datetime.now()):
         timestamp=timestamp.strftime("%m_%d_%Y_%H_%M_%S")
@@ -23,14 +20,20 @@ class DataIngestionConfig:
 class DataPreprocessingConfig:
     def __init__(self, training_pipeline_config: training_pipeline):
         self.data_file_path: str = os.path.join(training_pipeline.DATASET_DIR_PATH, training_pipeline.DATA_FILE_NAME)
-        self.cleaned_data_file_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.CLEANED_DATA_FILE_NAME)
+        self.data_preprocessing_dir: str = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.DATA_PREPROCESSING_DIR_NAME)
+        self.cleaned_data_dir: str = os.path.join(self.data_preprocessing_dir, training_pipeline.CLEANED_DATA_DIR_NAME)
+        self.preprocessing_state_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.PREPROCESSING_STATE_PATH)
+        self.columns_to_fill: list = training_pipeline.COLUMNS_TO_FILL
+        self.zero_as_missing_columns: list = training_pipeline.ZERO_AS_MISSING_COLUMNS
+        self.chunk_size: int = training_pipeline.CHUNK_SIZE
+        self.statistics_sample_size: int = training_pipeline.STATISTICS_SAMPLE_SIZE
        
 class DataTransformationConfig:
     def __init__(self, training_pipeline_config: training_pipeline):
-        self.cleaned_data_file_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.CLEANED_DATA_FILE_NAME)
+        self.cleaned_data_dir: str = DataPreprocessingConfig(training_pipeline_config).cleaned_data_dir
+        self.data_transformation_dir: str = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.DATA_TRANSFORMATION_DIR_NAME)
+        self.transformed_data_dir: str = os.path.join(self.data_transformation_dir, training_pipeline.TRANSFORMED_DATA_DIR_NAME)
         self.split_ratio: float = training_pipeline.SPLIT_RATIO
-        self.train_file_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.TRAIN_FILE_NAME)
-        self.test_file_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.TEST_FILE_NAME)
         self.title_encoder_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.TITLE_ENCODER_PATH)
         self.podcast_encoder_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.PODCAST_ENCODER_PATH)
         self.other_encoder_path: str = os.path.join(training_pipeline.ARTIFACT_DIR, training_pipeline.OTHER_CAT_ENCODER_PATH)
@@ -40,6 +43,112 @@ class DataTransformationConfig:
 
 class ModelTrainerConfig:
     def __init__(self, training_pipeline_config: training_pipeline):
-        self.cleaned_data_file_path: str = DataTransformationConfig(training_pipeline_config).cleaned_data_file_path
+        self.transformed_data_dir: str = DataTransformationConfig(training_pipeline_config).transformed_data_dir
         self.model_file_path: str = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.MODEL_FILE_NAME)
-        
\ No newline at end of file
+        self.numpy_model_file_path: str = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.NUMPY_MODEL_FILE_NAME)
+        self.quantized_model_file_path: str = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.QUANTIZED_MODEL_FILE_NAME)
+        self.quantization_report_path: str = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.QUANTIZATION_REPORT_FILE_NAME)
+        self.quantization_mode: str = training_pipeline.QUANTIZATION_MODE
+        self.quantization_calibration_rows: int = training_pipeline.QUANTIZATION_CALIBRATION_ROWS
+        self.model_type: str = training_pipeline.MODEL_TYPE
+        self.gbdt_model_file_path: str = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.GBDT_MODEL_FILE_NAME)
+        self.gbdt_categorical_columns: list = training_pipeline.GBDT_CATEGORICAL_COLUMNS
+        self.gbdt_hyperparameters: dict = training_pipeline.GBDT_HYPERPARAMETERS
+        self.gbdt_early_stopping_rounds: int = training_pipeline.GBDT_EARLY_STOPPING_ROUNDS
+        self.target_column: str = training_pipeline.TARGET_COLUMN
+        self.input_pipeline: str = training_pipeline.TRAINING_INPUT_PIPELINE
+        self.epochs: int = training_pipeline.TRAINING_EPOCHS
+        self.batch_size: int = training_pipeline.TRAINING_BATCH_SIZE
+        self.early_stopping_patience: int = training_pipeline.EARLY_STOPPING_PATIENCE
+        self.validation_split: float = training_pipeline.VALIDATION_SPLIT
+        self.random_state: int = training_pipeline.TRAINING_RANDOM_STATE
+        self.mixed_precision_policy: str = training_pipeline.MIXED_PRECISION_POLICY
+        self.intra_op_threads: int = training_pipeline.INTRA_OP_THREADS
+        self.inter_op_threads: int = training_pipeline.INTER_OP_THREADS
+        self.model_architecture: str = training_pipeline.MODEL_ARCHITECTURE
+        self.embedding_columns: dict = training_pipeline.EMBEDDING_COLUMNS
+        self.embedding_dim: int = training_pipeline.EMBEDDING_DIM
+        self.embedding_hash_buckets: int = training_pipeline.EMBEDDING_HASH_BUCKETS
+
+class HyperparameterTunerConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        self.transformed_data_dir: str = DataTransformationConfig(training_pipeline_config).transformed_data_dir
+        self.search_dir: str = os.path.join(training_pipeline.TUNING_DIR, training_pipeline.TUNING_SEARCH_NAME)
+        self.best_hyperparameters_path: str = os.path.join(self.search_dir, training_pipeline.BEST_HYPERPARAMETERS_FILE_NAME)
+        self.n_trials: int = training_pipeline.TUNING_TRIALS
+        self.workers: int = training_pipeline.TUNING_WORKERS
+        self.epochs: int = training_pipeline.TUNING_EPOCHS
+        self.min_epochs_before_pruning: int = training_pipeline.TUNING_MIN_EPOCHS_BEFORE_PRUNING
+        self.seed: int = training_pipeline.TUNING_SEED
+        self.hyperparameter_space: dict = training_pipeline.HYPERPARAMETER_SPACE
+
+class CrossValidationConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        self.transformed_data_dir: str = DataTransformationConfig(training_pipeline_config).transformed_data_dir
+        self.cross_validation_dir: str = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.CROSS_VALIDATION_DIR_NAME)
+        self.oof_predictions_path: str = os.path.join(self.cross_validation_dir, training_pipeline.OOF_PREDICTIONS_FILE_NAME)
+        self.report_path: str = os.path.join(self.cross_validation_dir, training_pipeline.CROSS_VALIDATION_REPORT_FILE_NAME)
+        self.n_folds: int = training_pipeline.CV_FOLDS
+        self.workers: int = training_pipeline.CV_WORKERS
+
+class StageCacheConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        self.cache_dir: str = training_pipeline.STAGE_CACHE_DIR
+        # Run-specific paths are left out of stage fingerprints
+        self.run_artifact_dir: str = training_pipeline_config.artifact_dir
+        self.run_report_path: str = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.RUN_REPORT_FILE_NAME)
+
+class ModelRegistryConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        self.registry_dir: str = training_pipeline.MODEL_REGISTRY_DIR
+        self.latest_file_name: str = training_pipeline.MODEL_REGISTRY_LATEST_FILE_NAME
+        self.manifest_file_name: str = training_pipeline.BUNDLE_MANIFEST_FILE_NAME
+        self.keep_versions: int = training_pipeline.MODEL_REGISTRY_KEEP_VERSIONS
+        self.reload_interval_seconds: float = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", training_pipeline.MODEL_RELOAD_INTERVAL_SECONDS))
+        # File name inside a bundle -> fixed path the training components write it to
+        self.data_bundle_files: dict = {
+            training_pipeline.PREPROCESSING_STATE_PATH: DataPreprocessingConfig(training_pipeline_config).preprocessing_state_path,
+            training_pipeline.PODCAST_ENCODER_PATH: DataTransformationConfig(training_pipeline_config).podcast_encoder_path,
+            training_pipeline.TITLE_ENCODER_PATH: DataTransformationConfig(training_pipeline_config).title_encoder_path,
+            training_pipeline.OTHER_CAT_ENCODER_PATH: DataTransformationConfig(training_pipeline_config).other_encoder_path,
+        }
+        # Files written by the model trainer, per model type
+        self.model_bundle_files: dict = {
+            "mlp": {
+                training_pipeline.MODEL_FILE_NAME: ModelTrainerConfig(training_pipeline_config).model_file_path,
+                training_pipeline.NUMPY_MODEL_FILE_NAME: ModelTrainerConfig(training_pipeline_config).numpy_model_file_path,
+            },
+            "gbdt": {
+                training_pipeline.GBDT_MODEL_FILE_NAME: ModelTrainerConfig(training_pipeline_config).gbdt_model_file_path,
+            },
+        }
+        # Added to an mlp bundle when the trainer also exported the quantized model
+        self.quantized_bundle_files: dict = {
+            training_pipeline.QUANTIZED_MODEL_FILE_NAME: ModelTrainerConfig(training_pipeline_config).quantized_model_file_path,
+            training_pipeline.QUANTIZATION_REPORT_FILE_NAME: ModelTrainerConfig(training_pipeline_config).quantization_report_path,
+        }
+
+class BatchPredictionConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        self.input_file_path: str = DataIngestionConfig(training_pipeline_config).validation_file_path
+        self.output_file_path: str = training_pipeline.PREDICTION_OUTPUT_FILE_NAME
+        self.chunk_size: int = training_pipeline.BATCH_PREDICTION_CHUNK_SIZE
+        self.workers: int = training_pipeline.BATCH_PREDICTION_WORKERS
+        self.parallel_min_rows: dict = training_pipeline.BATCH_PREDICTION_PARALLEL_MIN_ROWS
+
+class PredictionPipelineConfig:
+    def __init__(self, training_pipeline_config: training_pipeline):
+        model_trainer_config = ModelTrainerConfig(training_pipeline_config)
+        self.model_backend: str = os.getenv("MODEL_BACKEND", training_pipeline.MODEL_BACKEND)
+        self.model_type_backends: dict = training_pipeline.MODEL_TYPE_BACKENDS
+        self.model_file_paths: dict = {
+            "keras": model_trainer_config.model_file_path,
+            "numpy": model_trainer_config.numpy_model_file_path,
+            "tflite": model_trainer_config.quantized_model_file_path,
+            "gbdt": model_trainer_config.gbdt_model_file_path,
+        }
+        self.prediction_cache_enabled: bool = os.getenv("PREDICTION_CACHE_ENABLED", str(int(training_pipeline.PREDICTION_CACHE_ENABLED))) == "1"
+        self.prediction_cache_max_entries: int = training_pipeline.PREDICTION_CACHE_MAX_ENTRIES
+        self.prediction_cache_ttl_seconds: float = training_pipeline.PREDICTION_CACHE_TTL_SECONDS
+        self.prediction_cache_disk_path: str = os.getenv("PREDICTION_CACHE_DISK_PATH", training_pipeline.PREDICTION_CACHE_DISK_PATH)
+        self.prediction_cache_disk_max_entries: int = training_pipeline.PREDICTION_CACHE_DISK_MAX_ENTRIES
@@ -0,0 +1,21 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+# Field order matches the training CSV, which fixes the model's feature order
+class PodcastEpisode(BaseModel):
+   id: int
+   Podcast_Name: str
+   Episode_Title: str
+   Episode_Length_minutes: Optional[float] = None
+   Genre: str
+   Host_Popularity_percentage: float
+   Publication_Day: str
+   Publication_Time: str
+   Guest_Popularity_percentage: Optional[float] = None
+   Number_of_Ads: Optional[float] = None
+   Episode_Sentiment: str
+
+class EpisodePrediction(BaseModel):
+   ID: int
+   Predicted_Listening_Time: float
@@ -0,0 +1,181 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.entity.config_entity import BatchPredictionConfig, TrainingPipelineConfig
+from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.utils.data_schema import DataSchema
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+
+# Each worker process loads the fitted encoders, preprocessing state and model exactly once
+_worker_pipeline = None
+
+
+def _init_worker(intra_op_threads: int):
+    global _worker_pipeline
+    # Every row of a batch file is scored once, so caching would only cost hashing and memory
+    _worker_pipeline = PredictionPipeline(use_cache=False)
+
+    # Split the cores between workers instead of letting every process grab all of them
+    if _worker_pipeline.model_backend == "keras":
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    _worker_pipeline.warm_up()
+
+
+def _score_shard(shard: pd.DataFrame) -> pd.DataFrame:
+    return _worker_pipeline.initiate_prediction(shard)
+
+
+def count_lines(file_path: str) -> int:
+    n_lines = 0
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            n_lines += block.count(b"\n")
+    return n_lines
+
+
+class BatchPrediction:
+    def __init__(self, input_file_path: str = None, output_file_path: str = None, chunk_size: int = None, workers: int = None,
+                 parallel_min_rows: int = None):
+        self.batch_prediction_config = BatchPredictionConfig(training_pipeline_config=TrainingPipelineConfig())
+        self.input_file_path = input_file_path or self.batch_prediction_config.input_file_path
+        self.output_file_path = output_file_path or self.batch_prediction_config.output_file_path
+        self.chunk_size = chunk_size or self.batch_prediction_config.chunk_size
+        self.workers = workers or self.batch_prediction_config.workers
+        self.data_schema = DataSchema()
+
+        # Construction is cheap (the model loads on warm_up); in parallel mode only the worker processes load it
+        self.prediction_pipeline = PredictionPipeline(use_cache=False)
+        self.parallel_min_rows = (self.batch_prediction_config.parallel_min_rows[self.prediction_pipeline.model_backend]
+                                  if parallel_min_rows is None else parallel_min_rows)
+        self.parallel = False
+
+    def use_workers(self, rows_to_score: int) -> bool:
+        if self.workers == 1:
+            return False
+        if rows_to_score < self.parallel_min_rows:
+            logging.info(f"{rows_to_score} rows to score, below {self.parallel_min_rows} for the "
+                         f"'{self.prediction_pipeline.model_backend}' backend: scoring in this process instead of "
+                         f"{self.workers} workers")
+            return False
+        return True
+
+    def count_completed_rows(self) -> int:
+        try:
+            if not os.path.exists(self.output_file_path):
+                return 0
+
+            # Drop a partially written last line left behind by an interrupted run
+            with open(self.output_file_path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size == 0:
+                    return 0
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.seek(0)
+                    content_end = f.read().rfind(b"\n") + 1
+                    f.truncate(content_end)
+
+            # First line is the header
+            return max(count_lines(self.output_file_path) - 1, 0)
+
+        except Exception as e:
+            logging.error(f"Error during counting completed rows: {e}")
+            raise CustomException(e, sys)
+
+    def score_shards(self, reader):
+        if not self.parallel:
+            for shard in reader:
+                yield self.prediction_pipeline.initiate_prediction(shard)
+            return
+
+        intra_op_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker,
+                                 initargs=(intra_op_threads,)) as executor:
+            # Keep a bounded number of shards in flight and yield results in submission (input/id) order
+            pending = deque()
+            for shard in reader:
+                pending.append(executor.submit(_score_shard, shard))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def initiate_batch_prediction(self, resume: bool = False) -> str:
+        try:
+            logging.info(f"Batch prediction started for {self.input_file_path} with {self.workers} worker(s)")
+
+            completed_rows = self.count_completed_rows() if resume else 0
+            if completed_rows:
+                logging.info(f"Resuming after {completed_rows} already scored rows")
+
+            # Line count minus the header; a missing final newline only makes the estimate one row short
+            self.parallel = self.use_workers(max(count_lines(self.input_file_path) - 1 - completed_rows, 0))
+            if not self.parallel:
+                self.prediction_pipeline.warm_up()
+
+            start_time = time.perf_counter()
+            scored_rows = 0
+
+            with open(self.input_file_path, "r", newline="") as input_file:
+                header = pd.read_csv(input_file, nrows=0).columns.tolist()
+
+                # Skip already scored rows by streaming past them, without building a skiprows index
+                input_file.seek(0)
+                input_file.readline()
+                for _ in range(completed_rows):
+                    input_file.readline()
+
+                reader = self.data_schema.read_csv(input_file, include_target=False, header=None, names=header,
+                                                   chunksize=self.chunk_size)
+
+                with open(self.output_file_path, "a" if completed_rows else "w", newline="") as output_file:
+                    for chunk_index, results_df in enumerate(self.score_shards(reader)):
+                        results_df.to_csv(output_file, header=chunk_index == 0 and not completed_rows, index=False)
+                        output_file.flush()
+
+                        scored_rows += len(results_df)
+                        elapsed = time.perf_counter() - start_time
+                        logging.info(f"Scored {completed_rows + scored_rows} rows ({scored_rows / elapsed:.0f} rows/sec)")
+
+            elapsed = time.perf_counter() - start_time
+            rows_per_sec = scored_rows / elapsed if elapsed else 0.0
+            logging.info(f"Batch prediction wrote {scored_rows} rows to {self.output_file_path} in {elapsed:.1f}s ({rows_per_sec:.0f} rows/sec)")
+            print(f"Scored {scored_rows} rows in {elapsed:.1f}s ({rows_per_sec:.0f} rows/sec) -> {self.output_file_path}")
+
+            return self.output_file_path
+
+        except Exception as e:
+            logging.error(f"Error during batch prediction: {e}")
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV file in chunks and write ID,Predicted_Listening_Time")
+    parser.add_argument("--input", dest="input_file_path", default=None, help="CSV file to score (default: dataset/test.csv)")
+    parser.add_argument("--output", dest="output_file_path", default=None, help="Output CSV (default: predictions.csv)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per scoring batch (the shard size when --workers > 1)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of scoring processes (default: 1). Files with fewer rows than "
+                             "BATCH_PREDICTION_PARALLEL_MIN_ROWS (2M for keras, 200k for numpy, tflite and gbdt) are "
+                             "scored in one process, since worker start-up would cost more than it saves")
+    parser.add_argument("--parallel-min-rows", type=int, default=None,
+                        help="Override the row count from which --workers is used (0 always shards)")
+    parser.add_argument("--resume", action="store_true", help="Continue after the rows already present in the output file")
+    args = parser.parse_args()
+
+    batch_prediction = BatchPrediction(args.input_file_path, args.output_file_path, args.chunk_size, args.workers,
+                                       args.parallel_min_rows)
+    batch_prediction.initiate_batch_prediction(resume=args.resume)
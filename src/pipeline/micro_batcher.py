@@ -0,0 +1,95 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.constants import training_pipeline
+
+import sys
+import asyncio
+import pandas as pd
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, executor, max_batch_rows: int = None, max_wait_ms: float = None):
+        self.predict_fn = predict_fn
+        self.executor = executor
+        self.max_batch_rows = max_batch_rows or training_pipeline.MICRO_BATCH_MAX_ROWS
+        self.max_wait_seconds = (max_wait_ms if max_wait_ms is not None else training_pipeline.MICRO_BATCH_MAX_WAIT_MS) / 1000
+        self.queue = None
+        self._task = None
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Micro-batcher started (max {self.max_batch_rows} rows, {self.max_wait_seconds * 1000:.0f} ms)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((dataframe, future))
+        return await future
+
+    async def collect_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait_seconds
+
+        # Keep collecting until the batch is full or the oldest request has waited long enough
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+
+        return batch
+
+    async def score_separately(self, batch: list):
+        # After a failed batch every request is scored on its own, so only the requests that fail by themselves error
+        loop = asyncio.get_running_loop()
+        for dataframe, future in batch:
+            if future.done():
+                continue
+            try:
+                future.set_result(await loop.run_in_executor(self.executor, self.predict_fn, dataframe))
+            except Exception as e:
+                logging.error(f"Error during micro-batch request prediction: {e}")
+                future.set_exception(CustomException(e, sys))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.collect_batch()
+            frames = [dataframe for dataframe, _ in batch]
+
+            try:
+                # One preprocessing pass and one model call for every request in the batch
+                combined = pd.concat(frames, ignore_index=True)
+                results_df = await loop.run_in_executor(self.executor, self.predict_fn, combined)
+                logging.info(f"Micro-batch scored {len(combined)} rows for {len(batch)} requests")
+            except Exception as e:
+                logging.error(f"Error during micro-batch prediction: {e}")
+                if len(batch) > 1:
+                    await self.score_separately(batch)
+                else:
+                    _, future = batch[0]
+                    if not future.done():
+                        future.set_exception(CustomException(e, sys))
+                continue
+
+            # Fan the rows back out to the requests they came from
+            offset = 0
+            for dataframe, future in batch:
+                if not future.done():
+                    future.set_result(results_df.iloc[offset:offset + len(dataframe)])
+                offset += len(dataframe)
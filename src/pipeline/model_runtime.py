@@ -0,0 +1,487 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.constants import training_pipeline
+
+import io
+import os
+import re
+import sys
+import pickle
+import contextlib
+import threading
+import numpy as np
+
+NUMPY_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+}
+
+
+def embedding_layer_name(column_index: int) -> str:
+    # The layer name records which input column the table is looked up with
+    return f"embedding_column_{column_index}"
+
+
+def embedding_column_index(layer_name: str) -> int:
+    return int(layer_name.rsplit("_", 1)[-1])
+
+
+def dense_stack_arrays(layers) -> dict:
+    arrays = {}
+    n_dense = 0
+    embedding_columns = []
+    for layer in layers:
+        layer_type = layer.__class__.__name__
+        if layer_type in ("InputLayer", "Dropout", "Concatenate"):
+            # Dropout is the identity at inference time; the input split is rebuilt from embedding_columns
+            continue
+        if layer_type == "Embedding":
+            column_index = embedding_column_index(layer.name)
+            arrays[f"embedding_table_{column_index}"] = layer.get_weights()[0].astype(np.float32)
+            embedding_columns.append(column_index)
+            continue
+        if layer_type != "Dense":
+            raise ValueError(f"Layer type {layer_type} is not supported by the NumPy runtime")
+
+        activation = layer.activation.__name__
+        if activation not in NUMPY_ACTIVATIONS:
+            raise ValueError(f"Activation {activation} is not supported by the NumPy runtime")
+
+        kernel, bias = layer.get_weights()
+        arrays[f"kernel_{n_dense}"] = kernel.astype(np.float32)
+        arrays[f"bias_{n_dense}"] = bias.astype(np.float32)
+        arrays[f"activation_{n_dense}"] = np.array(activation)
+        n_dense += 1
+
+    arrays["n_layers"] = np.array(n_dense)
+    arrays["embedding_columns"] = np.array(sorted(embedding_columns), dtype=np.int64)
+    return arrays
+
+
+def export_numpy_model(model, file_path: str) -> str:
+    try:
+        logging.info(f"Exporting model weights to {file_path}")
+
+        # A fold ensemble (see cross_validation.py) averages member models with the same layers;
+        # their weights are stacked on a leading member axis and run as one batched forward pass
+        members = [layer for layer in model.layers if hasattr(layer, "layers")]
+        if members:
+            member_arrays = [dense_stack_arrays(member.layers) for member in members]
+            arrays = {name: np.stack([weights[name] for weights in member_arrays])
+                      if name.startswith(("kernel_", "bias_", "embedding_table_")) else value
+                      for name, value in member_arrays[0].items()}
+            arrays["n_members"] = np.array(len(members))
+        else:
+            arrays = dense_stack_arrays(model.layers)
+
+        arrays["n_features"] = np.array(int(model.input_shape[-1]))
+        np.savez(file_path, **arrays)
+        logging.info(f"Exported {int(arrays['n_layers'])} dense layers"
+                     f"{f' of {len(members)} ensemble members' if members else ''} to {file_path}")
+
+        return file_path
+
+    except Exception as e:
+        logging.error(f"Error during NumPy model export: {e}")
+        raise CustomException(e, sys)
+
+
+def export_quantized_model(model, file_path: str, calibration_features: np.ndarray, quantization: str) -> str:
+    try:
+        import tensorflow as tf
+
+        logging.info(f"Exporting {quantization} quantized model to {file_path}")
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization != "int8" and quantization != "dynamic_int8":
+            raise ValueError(f"Unknown quantization '{quantization}', expected 'int8', 'dynamic_int8' or 'float16'")
+
+        if quantization == "int8":
+            # Activation ranges are calibrated on training rows; input and output stay float32,
+            # so the runtime is a drop-in replacement for the float model
+            calibration_features = np.asarray(calibration_features, dtype=np.float32)
+            representative_dataset = lambda: ([calibration_features[i:i + 1]] for i in range(len(calibration_features)))
+            converter.representative_dataset = representative_dataset
+            # All input columns would share one int8 scale, set by the large id column, which flattens the small-range
+            # features (~9% RMSE drift). The ops that read the raw input, up to the first dense layer, stay float32.
+            debugger = tf.lite.experimental.QuantizationDebugger(
+                converter=converter, debug_dataset=representative_dataset,
+                debug_options=tf.lite.experimental.QuantizationDebugOptions(denylisted_nodes=input_node_names(model)))
+            model_content = debugger.get_nondebug_quantized_model()
+        else:
+            model_content = converter.convert()
+
+        with open(file_path, "wb") as f:
+            f.write(model_content)
+        logging.info(f"Quantized model written to {file_path} ({os.path.getsize(file_path)} bytes)")
+
+        return file_path
+
+    except Exception as e:
+        logging.error(f"Error during quantized model export: {e}")
+        raise CustomException(e, sys)
+
+
+def converted_ops(model_content: bytes) -> list:
+    # (op name, input tensor indices, output tensor indices) of the main graph, in execution order, read from the
+    # public model analyzer's listing ("Op#3 FULLY_CONNECTED(T#2, T#5, T#-1) -> [T#7]")
+    import tensorflow as tf
+
+    listing = io.StringIO()
+    with contextlib.redirect_stdout(listing):
+        tf.lite.experimental.Analyzer.analyze(model_content=model_content)
+    ops = []
+    for line in listing.getvalue().split("Subgraph#1")[0].splitlines():
+        match = re.match(r"\s*Op#\d+ (\w+)\((.*)\) -> \[(.*)\]", line)
+        if match:
+            op_name, inputs, outputs = match.groups()
+            ops.append((op_name, [int(i) for i in re.findall(r"T#(\d+)", inputs)],
+                        [int(i) for i in re.findall(r"T#(\d+)", outputs)]))
+    if not ops:
+        raise ValueError("The TFLite model analyzer listed no ops")
+    return ops
+
+
+def input_node_names(model) -> list:
+    # Output tensor names of the converted float graph's ops that see the raw input, up to and including the first
+    # dense layer of each branch (one branch per member of a fold ensemble)
+    import tensorflow as tf
+
+    model_content = tf.lite.TFLiteConverter.from_keras_model(model).convert()
+    interpreter = tf.lite.Interpreter(model_content=model_content)
+    tensor_names = {tensor["index"]: tensor["name"] for tensor in interpreter.get_tensor_details()}
+    raw_tensors = {detail["index"] for detail in interpreter.get_input_details()}
+    names = []
+    for op_name, inputs, outputs in converted_ops(model_content):
+        if not raw_tensors.intersection(inputs):
+            continue
+        names += [tensor_names[index] for index in outputs]
+        if op_name != "FULLY_CONNECTED":
+            raw_tensors.update(outputs)
+    if not names:
+        raise ValueError("The model has no dense layer to keep in float32")
+    return names
+
+
+def load_tflite_interpreter():
+    # The standalone LiteRT interpreter keeps TensorFlow out of the serving process; TensorFlow's copy is the fallback
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class KerasModelRuntime:
+    def __init__(self, model_file_path: str, batch_buckets: list = None):
+        self.model_file_path = model_file_path
+        self.batch_buckets = sorted(batch_buckets or training_pipeline.PREDICTION_BATCH_BUCKETS)
+        self.model = None
+        self.n_features = None
+        self._predict_fn = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._predict_fn is not None
+
+    def load(self):
+        try:
+            import tensorflow as tf
+
+            logging.info(f"Loading model from {self.model_file_path}")
+            with open(self.model_file_path, "rb") as f:
+                self.model = pickle.load(f)
+
+            self.n_features = int(self.model.input_shape[-1])
+
+            # A fixed input signature means the graph is traced once; batches are padded to
+            # bucket sizes so the kernels only ever see a handful of shapes.
+            model = self.model
+            self._predict_fn = tf.function(
+                lambda features: model(features, training=False),
+                input_signature=[tf.TensorSpec(shape=[None, self.n_features], dtype=tf.float32)],
+            )
+            logging.info(f"Model loaded with {self.n_features} input features")
+
+        except Exception as e:
+            logging.error(f"Error during model loading: {e}")
+            raise CustomException(e, sys)
+
+    def warm_up(self):
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            for bucket in self.batch_buckets:
+                self._predict_fn(np.zeros((bucket, self.n_features), dtype=np.float32))
+            logging.info(f"Model warmed up for batch buckets {self.batch_buckets}")
+
+        except Exception as e:
+            logging.error(f"Error during model warm-up: {e}")
+            raise CustomException(e, sys)
+
+    def bucket_size(self, n_rows: int) -> int:
+        for bucket in self.batch_buckets:
+            if n_rows <= bucket:
+                return bucket
+        return self.batch_buckets[-1]
+
+    def predict(self, features) -> np.ndarray:
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            features = np.asarray(features, dtype=np.float32)
+            max_bucket = self.batch_buckets[-1]
+            outputs = []
+
+            for start in range(0, len(features), max_bucket):
+                batch = features[start:start + max_bucket]
+                n_rows = len(batch)
+                bucket = self.bucket_size(n_rows)
+                if n_rows < bucket:
+                    batch = np.concatenate([batch, np.zeros((bucket - n_rows, self.n_features), dtype=np.float32)])
+                outputs.append(self._predict_fn(batch).numpy()[:n_rows])
+
+            if not outputs:
+                return np.empty((0, 1), dtype=np.float32)
+            return np.concatenate(outputs)
+
+        except Exception as e:
+            logging.error(f"Error during model prediction: {e}")
+            raise CustomException(e, sys)
+
+
+class NumpyModelRuntime:
+    def __init__(self, model_file_path: str, batch_size: int = None):
+        self.model_file_path = model_file_path
+        self.batch_size = batch_size or training_pipeline.NUMPY_RUNTIME_BATCH_SIZE
+        self.layers = None
+        self.n_features = None
+        self.embedding_tables = {}
+        self.numeric_columns = None
+        self.n_members = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.layers is not None
+
+    def load(self):
+        try:
+            logging.info(f"Loading NumPy model from {self.model_file_path}")
+            with np.load(self.model_file_path) as weights:
+                # Ensemble biases are (members, units); as (members, 1, units) they broadcast over the rows
+                self.n_members = int(weights["n_members"]) if "n_members" in weights else 0
+                self.layers = [
+                    (weights[f"kernel_{i}"],
+                     weights[f"bias_{i}"][:, None, :] if self.n_members else weights[f"bias_{i}"],
+                     NUMPY_ACTIVATIONS[str(weights[f"activation_{i}"])])
+                    for i in range(int(weights["n_layers"]))
+                ]
+                # Files exported before embedding support only hold the dense stack
+                if "embedding_columns" in weights:
+                    self.n_features = int(weights["n_features"])
+                    self.embedding_tables = {int(col): weights[f"embedding_table_{col}"]
+                                             for col in weights["embedding_columns"]}
+                else:
+                    self.n_features = self.layers[0][0].shape[0]
+            self.numeric_columns = [col for col in range(self.n_features) if col not in self.embedding_tables]
+            logging.info(f"NumPy model loaded with {len(self.layers)} dense layers"
+                         f"{f' in {self.n_members} ensemble members' if self.n_members else ''}")
+
+        except Exception as e:
+            logging.error(f"Error during NumPy model loading: {e}")
+            raise CustomException(e, sys)
+
+    def warm_up(self):
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            # No graph to trace; one call just faults in the weights and BLAS
+            self.predict(np.zeros((1, self.n_features), dtype=np.float32))
+            logging.info("NumPy model warmed up")
+
+        except Exception as e:
+            logging.error(f"Error during NumPy model warm-up: {e}")
+            raise CustomException(e, sys)
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        if self.embedding_tables:
+            # Same layout as the Keras model: numeric columns, then one vector per ID column (row = code mod table size)
+            parts = [batch[:, self.numeric_columns]]
+            if self.n_members:
+                parts[0] = np.broadcast_to(parts[0], (self.n_members, *parts[0].shape))
+            for col, table in self.embedding_tables.items():
+                parts.append(table[..., batch[:, col].astype(np.int64) % table.shape[-2], :])
+            batch = np.concatenate(parts, axis=-1)
+        # With stacked ensemble kernels the activations are (members, rows, units)
+        for kernel, bias, activation in self.layers:
+            batch = activation(batch @ kernel + bias)
+        return batch.mean(axis=0) if self.n_members else batch
+
+    def predict(self, features) -> np.ndarray:
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            features = np.asarray(features, dtype=np.float32)
+            if len(features) <= self.batch_size:
+                return self.forward(features)
+
+            # Bound the size of the hidden activations for very large inputs
+            return np.concatenate([self.forward(features[start:start + self.batch_size])
+                                   for start in range(0, len(features), self.batch_size)])
+
+        except Exception as e:
+            logging.error(f"Error during NumPy model prediction: {e}")
+            raise CustomException(e, sys)
+
+
+class TFLiteModelRuntime:
+    def __init__(self, model_file_path: str, batch_size: int = None):
+        self.model_file_path = model_file_path
+        self.batch_size = batch_size or training_pipeline.TFLITE_RUNTIME_BATCH_SIZE
+        self.model_content = None
+        self.n_features = None
+        self.input_index = None
+        self.output_index = None
+        # Interpreters are not thread-safe, so each prediction thread gets its own
+        self._local = threading.local()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model_content is not None
+
+    def load(self):
+        try:
+            logging.info(f"Loading quantized model from {self.model_file_path}")
+            with open(self.model_file_path, "rb") as f:
+                self.model_content = f.read()
+            interpreter = self.interpreter()
+            input_details = interpreter.get_input_details()[0]
+            self.n_features = int(input_details["shape"][-1])
+            # The details are rebuilt as dicts on every call, so the indices are looked up once
+            self.input_index = input_details["index"]
+            self.output_index = interpreter.get_output_details()[0]["index"]
+            logging.info(f"Quantized model loaded with {self.n_features} input features")
+
+        except Exception as e:
+            logging.error(f"Error during quantized model loading: {e}")
+            raise CustomException(e, sys)
+
+    def interpreter(self):
+        interpreter = getattr(self._local, "interpreter", None)
+        if interpreter is None:
+            interpreter = load_tflite_interpreter()(model_content=self.model_content, num_threads=1)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.batch_rows = None
+        return interpreter
+
+    def warm_up(self):
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            self.predict(np.zeros((1, self.n_features), dtype=np.float32))
+            logging.info("Quantized model warmed up")
+
+        except Exception as e:
+            logging.error(f"Error during quantized model warm-up: {e}")
+            raise CustomException(e, sys)
+
+    def forward(self, batch: np.ndarray) -> np.ndarray:
+        interpreter = self.interpreter()
+        # Resizing only re-plans the tensor arena (~10 µs), so batches are never padded
+        if self._local.batch_rows != len(batch):
+            interpreter.resize_tensor_input(self.input_index, batch.shape)
+            interpreter.allocate_tensors()
+            self._local.batch_rows = len(batch)
+        interpreter.set_tensor(self.input_index, batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(self.output_index)
+
+    def predict(self, features) -> np.ndarray:
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            features = np.ascontiguousarray(features, dtype=np.float32)
+            if len(features) == 0:
+                return np.empty((0, 1), dtype=np.float32)
+            if len(features) <= self.batch_size:
+                return self.forward(features)
+            return np.concatenate([self.forward(features[start:start + self.batch_size])
+                                   for start in range(0, len(features), self.batch_size)])
+
+        except Exception as e:
+            logging.error(f"Error during quantized model prediction: {e}")
+            raise CustomException(e, sys)
+
+
+class GBDTModelRuntime:
+    def __init__(self, model_file_path: str):
+        self.model_file_path = model_file_path
+        self.model = None
+        self.n_features = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self):
+        try:
+            logging.info(f"Loading gradient-boosted trees from {self.model_file_path}")
+            with open(self.model_file_path, "rb") as f:
+                self.model = pickle.load(f)
+            self.n_features = int(self.model.n_features_in_)
+            logging.info(f"Gradient-boosted trees loaded: {self.model.n_iter_} trees")
+
+        except Exception as e:
+            logging.error(f"Error during gradient-boosted trees loading: {e}")
+            raise CustomException(e, sys)
+
+    def warm_up(self):
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            self.predict(np.zeros((1, self.n_features), dtype=np.float32))
+            logging.info("Gradient-boosted trees warmed up")
+
+        except Exception as e:
+            logging.error(f"Error during gradient-boosted trees warm-up: {e}")
+            raise CustomException(e, sys)
+
+    def predict(self, features) -> np.ndarray:
+        try:
+            if not self.is_loaded:
+                self.load()
+
+            features = np.asarray(features, dtype=np.float32)
+            if len(features) == 0:
+                return np.empty((0, 1), dtype=np.float32)
+            return self.model.predict(features).astype(np.float32)[:, None]
+
+        except Exception as e:
+            logging.error(f"Error during gradient-boosted trees prediction: {e}")
+            raise CustomException(e, sys)
+
+
+def load_model_runtime(model_backend: str, model_file_paths: dict):
+    runtimes = {
+        "keras": KerasModelRuntime,
+        "numpy": NumpyModelRuntime,
+        "tflite": TFLiteModelRuntime,
+        "gbdt": GBDTModelRuntime,
+    }
+    if model_backend not in runtimes:
+        raise ValueError(f"Unknown model backend '{model_backend}', expected one of {sorted(runtimes)}")
+
+    logging.info(f"Using '{model_backend}' model backend")
+    return runtimes[model_backend](model_file_paths[model_backend])
@@ -1,95 +1,206 @@
 from src.exceptions import CustomException
 from src.logger import logging
-from src.entity.config_entity import DataIngestionConfig, TrainingPipelineConfig, ModelTrainerConfig
+from src.entity.config_entity import TrainingPipelineConfig, ModelTrainerConfig, PredictionPipelineConfig
 from src.components.data_preprocessing import DataPreprocessing
 from src.components.data_transformation import DataTransformation
+from src.pipeline.model_runtime import load_model_runtime
+from src.constants import training_pipeline
+from src.utils.instrumentation import instrument, track
+from src.utils.prediction_cache import PredictionCache, row_keys
+from src.utils.file_hashing import stat_fingerprint
 
 import os
 import sys
+import json
 import pandas as pd
-import joblib
-import pickle
 import numpy as np
 
 class PredictionPipeline:
-    def __init__(self):
-        data_ingestion_config = DataIngestionConfig(training_pipeline_config=TrainingPipelineConfig())
-        self.validation_file_path = data_ingestion_config.validation_file_path
-
+    def __init__(self, model_backend: str = None, use_cache: bool = None, bundle_dir: str = None):
         model_trainer_config = ModelTrainerConfig(training_pipeline_config=TrainingPipelineConfig())
         self.model_file_path = model_trainer_config.model_file_path
+        self.prediction_pipeline_config = PredictionPipelineConfig(training_pipeline_config=TrainingPipelineConfig())
+        self.model_backend = model_backend or self.prediction_pipeline_config.model_backend
         self.data_preprocessing = DataPreprocessing()
         self.data_transformation = DataTransformation()
+        self.data_schema = self.data_preprocessing.data_schema
+
+        # A registered bundle (see src/utils/model_registry.py) replaces the fixed saved_models/ and Artifacts/ paths
+        self.bundle_dir = bundle_dir
+        self.bundle_version = os.path.basename(os.path.normpath(bundle_dir)) if bundle_dir else None
+        if bundle_dir:
+            self.use_bundle_paths(bundle_dir)
+            self.model_backend = self.bundle_backend(bundle_dir)
+
+        # Fitted statistics, encoders (sklearn) and the model (TensorFlow for the keras backend) are heavy to import and load,
+        # so construction stays cheap and they are loaded once by warm_up() or on first prediction
+        self.preprocessing_state = None
+        self.model_runtime = load_model_runtime(self.model_backend, self.prediction_pipeline_config.model_file_paths)
+        self.is_ready = False
+
+        # Cached predictions are tied to the artifact files this pipeline loaded (see model_version)
+        config = self.prediction_pipeline_config
+        use_cache = config.prediction_cache_enabled if use_cache is None else use_cache
+        self.prediction_cache = PredictionCache(
+            max_entries=config.prediction_cache_max_entries,
+            ttl_seconds=config.prediction_cache_ttl_seconds,
+            disk_path=config.prediction_cache_disk_path,
+            disk_max_entries=config.prediction_cache_disk_max_entries,
+        ) if use_cache else None
+        self.cache_key_columns = self.data_schema.column_names(include_target=False)
+        self.model_version = None
+        self.stale_artifacts_logged = False
+
+    def use_bundle_paths(self, bundle_dir: str):
+        self.prediction_pipeline_config.model_file_paths = {
+            "keras": os.path.join(bundle_dir, training_pipeline.MODEL_FILE_NAME),
+            "numpy": os.path.join(bundle_dir, training_pipeline.NUMPY_MODEL_FILE_NAME),
+            "tflite": os.path.join(bundle_dir, training_pipeline.QUANTIZED_MODEL_FILE_NAME),
+            "gbdt": os.path.join(bundle_dir, training_pipeline.GBDT_MODEL_FILE_NAME),
+        }
+        self.model_file_path = self.prediction_pipeline_config.model_file_paths["keras"]
+        self.data_preprocessing.data_preprocessing_config.preprocessing_state_path = os.path.join(
+            bundle_dir, training_pipeline.PREPROCESSING_STATE_PATH)
+        transformation_config = self.data_transformation.data_transformation_config
+        transformation_config.podcast_encoder_path = os.path.join(bundle_dir, training_pipeline.PODCAST_ENCODER_PATH)
+        transformation_config.title_encoder_path = os.path.join(bundle_dir, training_pipeline.TITLE_ENCODER_PATH)
+        transformation_config.other_encoder_path = os.path.join(bundle_dir, training_pipeline.OTHER_CAT_ENCODER_PATH)
+
+    def bundle_backend(self, bundle_dir: str) -> str:
+        # The manifest records which model type the bundle holds; bundles registered before model types existed are MLPs
+        with open(os.path.join(bundle_dir, training_pipeline.BUNDLE_MANIFEST_FILE_NAME)) as f:
+            model_type = json.load(f)["metadata"].get("model_type", "mlp")
+        backends = self.prediction_pipeline_config.model_type_backends[model_type]
+        if self.model_backend not in backends:
+            logging.warning(f"Model backend '{self.model_backend}' cannot serve the '{model_type}' model of bundle "
+                            f"{self.bundle_version}, using '{backends[0]}'")
+            return backends[0]
+        # Quantization is opt-in, so an mlp bundle may have no model_quantized.tflite
+        if not os.path.exists(self.prediction_pipeline_config.model_file_paths[self.model_backend]):
+            logging.warning(f"Bundle {self.bundle_version} has no model file for the '{self.model_backend}' backend, "
+                            f"using '{backends[0]}'")
+            return backends[0]
+        return self.model_backend
+
+    def artifact_paths(self) -> list:
+        transformation_config = self.data_transformation.data_transformation_config
+        return [
+            self.model_runtime.model_file_path,
+            self.data_preprocessing.data_preprocessing_config.preprocessing_state_path,
+            transformation_config.podcast_encoder_path,
+            transformation_config.title_encoder_path,
+            transformation_config.other_encoder_path,
+        ]
+
+    def active_prediction_cache(self) -> PredictionCache:
+        if self.prediction_cache is None or self.bundle_version is not None:
+            # Bundles are immutable, so their version cannot go stale (and may be pruned while still being served)
+            return self.prediction_cache
+
+        # A retrain replaced the files under a running pipeline: drop the cached rows and score uncached,
+        # since this pipeline still holds the old model and must not cache its predictions under the new version
+        on_disk_version = stat_fingerprint(self.artifact_paths())
+        if on_disk_version != self.model_version:
+            self.prediction_cache.set_model_version(on_disk_version)
+            if not self.stale_artifacts_logged:
+                logging.warning("Model artifacts changed on disk; prediction cache bypassed until the pipeline is reloaded")
+                self.stale_artifacts_logged = True
+            return None
+
+        return self.prediction_cache
+
+    def load_artifacts(self):
+        if self.model_version is None:
+            # Fingerprinted before loading, so a file replaced mid-load shows up as a version change
+            self.model_version = self.bundle_version or stat_fingerprint(self.artifact_paths())
+            if self.prediction_cache is not None:
+                self.prediction_cache.set_model_version(self.model_version)
+        if self.preprocessing_state is None:
+            self.preprocessing_state = self.data_preprocessing.load_preprocessing_state()
+        if self.data_transformation.category_lookups is None:
+            self.data_transformation.load_fitted_encoders()
+
+    def warm_up(self):
+        try:
+            logging.info("Warming up prediction pipeline")
+            self.load_artifacts()
+            self.model_runtime.warm_up()
+            self.is_ready = True
+            logging.info("Prediction pipeline is ready")
+
+        except Exception as e:
+            logging.error(f"Error during prediction pipeline warm-up: {e}")
+            raise CustomException(e, sys)
+
+    @instrument("prediction.initiate_prediction")
     def initiate_prediction(self,valid_df: pd.DataFrame)-> pd.DataFrame:
 
         try:
+            logging.info(f"Prediction started for {len(valid_df)} rows")
+
+            self.load_artifacts()
+
+            # --- Validate the input frame against data_schema/data.yaml ---
+            self.data_schema.validate(valid_df)
+
+            # Keep the original ids; clipping below may touch the id feature
+            id_column = valid_df['id'].copy()
 
-            logging.info("Loading the Validation file for prediction") 
+            # --- Serve repeated rows from the prediction cache; only the misses are preprocessed and scored ---
+            prediction_cache = self.active_prediction_cache()
+            if prediction_cache is not None:
+                keys = row_keys(valid_df, self.cache_key_columns)
+                predictions, hit_mask = prediction_cache.get_many(keys)
+                if not hit_mask.all():
+                    miss_mask = ~hit_mask
+                    miss_df = valid_df if not hit_mask.any() else valid_df.take(np.flatnonzero(miss_mask))
+                    predictions[miss_mask] = self.score(miss_df)
+                    prediction_cache.put_many(keys[miss_mask], predictions[miss_mask])
+            else:
+                predictions = self.score(valid_df)
+            logging.info("Prediction completed.")
 
-            # valid_df = pd.read_csv(self.validation_file_path)
+            rounded_predictions = np.round(predictions.flatten().astype(np.float64), 3)
 
+            results_df = pd.DataFrame({
+                'ID': id_column,
+                'Predicted_Listening_Time': rounded_predictions
+            })
 
+            return results_df
 
-            logging.info("Loading the Validation file for prediction") 
+        except Exception as e:
+            logging.error(f"Error during prediction: {e}")
+            raise CustomException(e, sys)
 
+    def score(self, valid_df: pd.DataFrame) -> np.ndarray:
+        try:
             # --- Fill Missing Values ---
-            valid_df = self.data_preprocessing.fill_missing_values(valid_df)
+            valid_df = self.data_preprocessing.fill_missing_values(valid_df, state=self.preprocessing_state)
 
-                        # --- Replace Zero Values ---
-            valid_df = self.data_preprocessing.replace_zero_values(valid_df)
+            # --- Replace Zero Values ---
+            valid_df = self.data_preprocessing.replace_zero_values(valid_df, state=self.preprocessing_state)
 
-                        # --- Identify Types of Columns ---
+            # --- Identify Types of Columns ---
             numeric_features, categorical_features = self.data_preprocessing.types_of_columns(valid_df)
 
-                        # --- Remove Outliers ---
-            valid_df = self.data_preprocessing.remove_outliers(valid_df, numeric_features)
-
+            # --- Clip Outliers to Training Bounds (keeps one prediction per input row) ---
+            valid_df = self.data_preprocessing.remove_outliers(valid_df, numeric_features, state=self.preprocessing_state, clip=True)
 
-            valid_df = self.data_transformation.label_encoding(valid_df)
-            valid_df = self.data_transformation.other_columns_encoding(valid_df)
+            valid_df = self.data_transformation.transform_label_encoding(valid_df)
+            valid_df = self.data_transformation.transform_other_columns_encoding(valid_df)
 
             # Validate new columns before dropping originals
             if not all(col in valid_df.columns for col in ['Podcast_ID', 'Title_ID']):
                 raise CustomException("Label encoding failed, 'Podcast_ID' or 'Title_ID' missing.", sys)
 
-
-            if 'id' not in valid_df.columns:
-                raise CustomException("ID column not found in validation data.", sys)
-
-            id_column = valid_df['id'].copy()
-
             valid_df = self.data_transformation.drop_unwanted_columns(valid_df)
-            # valid_df = data_transformation.standardize_data(valid_df)
-
-
-
-            with open(self.model_file_path, "rb") as f:
-                model = pickle.load(f)
-
-            predictions = model.predict(valid_df)
-            logging.info("Prediction completed.")
-
-            rounded_predictions = np.round(predictions.flatten(), 3)
 
-            results_df = pd.DataFrame({
-                'ID': id_column,
-                'Predicted_Listening_Time': rounded_predictions  
-            })
-
-            # Save predictions to CSV
-            # results_df.to_csv("predictions.csv", index=False)
-            # logging.info("Predictions saved to predictions.csv")
-
-            
+            with track("prediction.model_predict", rows=len(valid_df)):
+                predictions = self.model_runtime.predict(valid_df.to_numpy(dtype=np.float32))
 
+            return np.asarray(predictions, dtype=np.float32).reshape(-1)
 
-            # print(predictions)
-
-
-
-            return results_df
-        
-        
         except Exception as e:
-            logging.error(f"Error during prediction: {e}")
+            logging.error(f"Error during scoring: {e}")
             raise CustomException(e, sys)
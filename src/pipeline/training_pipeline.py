@@ -0,0 +1,284 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.entity.config_entity import TrainingPipelineConfig, StageCacheConfig, ModelRegistryConfig
+from src.components import data_preprocessing, data_transformation, streaming_preprocessing, model_trainer, hyperparameter_tuner, \
+    cross_validation
+from src.components.data_ingestion import DataIngestion
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.data_transformation import DataTransformation
+from src.components.streaming_preprocessing import StreamingDataPreprocessing
+from src.components.model_trainer import ModelTrainer
+from src.components.hyperparameter_tuner import HyperparameterTuner
+from src.components.cross_validation import CrossValidationTrainer
+from src.pipeline import model_runtime
+from src.utils import columnar_storage, categorical_encoder, data_schema
+from src.utils.columnar_storage import load_columnar_frame, read_columnar_schema
+from src.utils.stage_cache import StageCache, config_fields, hash_sources
+from src.utils.model_registry import ModelRegistry
+from src.utils.instrumentation import metrics_registry, track, current_rss_bytes, peak_rss_bytes
+
+import os
+import sys
+import json
+import time
+
+
+class TrainingPipeline:
+    def __init__(self, streaming: bool = False, chunk_size: int = None, tune: bool = False, n_trials: int = None,
+                 use_cache: bool = True, trainer_kwargs: dict = None, cv: bool = False, cv_folds: int = None,
+                 cv_workers: int = None):
+        training_pipeline_config = TrainingPipelineConfig()
+        self.stage_cache_config = StageCacheConfig(training_pipeline_config=training_pipeline_config)
+        self.stage_cache = StageCache(self.stage_cache_config.cache_dir)
+        self.run_artifact_dir = self.stage_cache_config.run_artifact_dir
+        self.run_report_path = self.stage_cache_config.run_report_path
+        self.model_registry_config = ModelRegistryConfig(training_pipeline_config=training_pipeline_config)
+        self.model_registry = ModelRegistry()
+        self.model_version = None
+        self.model_type = None
+        self.model_files = None
+
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.tune = tune
+        self.n_trials = n_trials
+        self.cv = cv
+        self.cv_folds = cv_folds
+        self.cv_workers = cv_workers
+        self.use_cache = use_cache
+        self.trainer_kwargs = trainer_kwargs or {}
+
+        # One entry per stage: key, whether it was restored from the cache, how long it took, rows and memory
+        self.stage_results = []
+
+    def config_fingerprint(self, config) -> dict:
+        return config_fields(config, exclude_prefix=self.run_artifact_dir)
+
+    @staticmethod
+    def stage_output_rows(outputs: dict) -> int:
+        # Rows of the stage's columnar output, if it has one
+        for path in outputs.values():
+            if os.path.isdir(path):
+                return read_columnar_schema(path)["n_rows"]
+        return None
+
+    def run_stage(self, stage: str, upstream_key: str, fingerprint: dict, outputs: dict, run_stage_fn) -> str:
+        try:
+            fingerprint = {"upstream": upstream_key, **fingerprint}
+            key = self.stage_cache.stage_key(fingerprint)
+
+            with track(f"pipeline.{stage}") as step:
+                if self.use_cache and self.stage_cache.lookup(stage, key) is not None:
+                    self.stage_cache.restore(stage, key, outputs)
+                    cached = True
+                else:
+                    run_stage_fn()
+                    if self.use_cache:
+                        self.stage_cache.store(stage, key, fingerprint, outputs)
+                    cached = False
+                step.rows = self.stage_output_rows(outputs)
+
+            elapsed = step.seconds
+            self.stage_results.append({
+                "stage": stage, "key": key, "cached": cached, "seconds": round(elapsed, 3), "rows": step.rows,
+                "rows_per_sec": round(step.rows / elapsed, 1) if step.rows and elapsed else None,
+                "rss_delta_bytes": step.rss_delta_bytes,
+            })
+            logging.info(f"Stage '{stage}' {'restored from cache' if cached else 'executed'} in {elapsed:.1f}s (key {key})")
+
+            return key
+
+        except Exception as e:
+            logging.error(f"Error during stage '{stage}': {e}")
+            raise CustomException(e, sys)
+
+    def start_data_ingestion(self) -> str:
+        data_ingestion_artifact = DataIngestion().initiate_data_ingestion()
+        data_hash = self.stage_cache.file_fingerprint(data_ingestion_artifact.data_file_path)
+        return self.stage_cache.stage_key({"data_file": data_hash})
+
+    def start_data_preprocessing(self, upstream_key: str) -> str:
+        preprocessing = DataPreprocessing()
+        config = preprocessing.data_preprocessing_config
+        return self.run_stage(
+            "data_preprocessing", upstream_key,
+            {"config": self.config_fingerprint(config),
+             "schema": self.stage_cache.file_fingerprint(preprocessing.data_schema.schema_file_path),
+             "code": hash_sources([data_preprocessing, data_schema, columnar_storage])},
+            {"cleaned_data": config.cleaned_data_dir, "preprocessing_state.pkl": config.preprocessing_state_path},
+            preprocessing.initiate_data_preprocessing,
+        )
+
+    def start_data_transformation(self, upstream_key: str) -> str:
+        transformation = DataTransformation()
+        config = transformation.data_transformation_config
+
+        def transform():
+            # Copy-on-write memory map: encoding replaces columns without touching the cleaned artifact
+            cleaned_df = load_columnar_frame(transformation.cleaned_data_dir, mmap_mode="c")
+            transformation.initiate_data_transformation(cleaned_df, transformation.columns_to_encode)
+
+        return self.run_stage(
+            "data_transformation", upstream_key,
+            {"config": self.config_fingerprint(config),
+             "code": hash_sources([data_transformation, categorical_encoder, columnar_storage])},
+            {"transformed_data": config.transformed_data_dir, "podcast_encoder.pkl": config.podcast_encoder_path,
+             "title_encoder.pkl": config.title_encoder_path, "other_cat_encoder.pkl": config.other_encoder_path},
+            transform,
+        )
+
+    def start_streaming_preprocessing(self, upstream_key: str) -> str:
+        preprocessing = StreamingDataPreprocessing(chunk_size=self.chunk_size)
+        transformation_config = preprocessing.data_transformation.data_transformation_config
+        return self.run_stage(
+            "streaming_preprocessing", upstream_key,
+            {"config": self.config_fingerprint(preprocessing.data_preprocessing_config),
+             "transformation_config": self.config_fingerprint(transformation_config),
+             "chunk_size": preprocessing.chunk_size,
+             "schema": self.stage_cache.file_fingerprint(preprocessing.data_preprocessing.data_schema.schema_file_path),
+             "code": hash_sources([streaming_preprocessing, data_preprocessing, data_schema, data_transformation,
+                                   categorical_encoder, columnar_storage])},
+            {"transformed_data": preprocessing.transformed_data_dir,
+             "preprocessing_state.pkl": preprocessing.data_preprocessing_config.preprocessing_state_path,
+             "podcast_encoder.pkl": transformation_config.podcast_encoder_path,
+             "title_encoder.pkl": transformation_config.title_encoder_path,
+             "other_cat_encoder.pkl": transformation_config.other_encoder_path},
+            preprocessing.initiate_streaming_preprocessing,
+        )
+
+    def start_hyperparameter_tuning(self, upstream_key: str):
+        tuner = HyperparameterTuner(n_trials=self.n_trials, trainer_kwargs=self.trainer_kwargs)
+        settings = tuner.trainer_settings()
+        # One search directory per input data and model variant, so a resumed search never mixes their trials
+        tuner.search_dir = os.path.join(tuner.search_dir, f"{upstream_key}_{self.stage_cache.stage_key(settings)[:8]}")
+        tuner.best_hyperparameters_path = os.path.join(tuner.search_dir, os.path.basename(tuner.best_hyperparameters_path))
+        key = self.run_stage(
+            "hyperparameter_tuning", upstream_key,
+            {"config": self.config_fingerprint(tuner.hyperparameter_tuner_config), "n_trials": tuner.n_trials,
+             "settings": settings,
+             "code": hash_sources([hyperparameter_tuner, model_trainer])},
+            {"best_hyperparameters.json": tuner.best_hyperparameters_path},
+            tuner.initiate_hyperparameter_tuning,
+        )
+        with open(tuner.best_hyperparameters_path) as f:
+            return key, json.load(f)["hyperparameters"]
+
+    def trainer_model_files(self, trainer: ModelTrainer) -> dict:
+        # Bundle file name -> fixed path the trainer writes it to
+        files = dict(self.model_registry_config.model_bundle_files[trainer.model_type])
+        if trainer.model_type == "mlp" and trainer.quantization_mode:
+            files.update(self.model_registry_config.quantized_bundle_files)
+        return files
+
+    def start_model_trainer(self, upstream_key: str, hyperparameters: dict = None) -> str:
+        trainer = ModelTrainer(hyperparameters=hyperparameters, **self.trainer_kwargs)
+        config = trainer.model_trainer_config
+        self.model_type = trainer.model_type
+        self.model_files = self.trainer_model_files(trainer)
+        return self.run_stage(
+            "model_training", upstream_key,
+            {"config": self.config_fingerprint(config),
+             "settings": {"model_type": trainer.model_type, "epochs": trainer.epochs, "batch_size": trainer.batch_size,
+                          "input_pipeline": trainer.input_pipeline,
+                          "mixed_precision_policy": trainer.mixed_precision_policy,
+                          "model_architecture": trainer.model_architecture,
+                          "hyperparameters": trainer.hyperparameters,
+                          "quantization_mode": trainer.quantization_mode},
+             "code": hash_sources([model_trainer, model_runtime])},
+            dict(self.model_files),
+            trainer.initiate_model_trainer,
+        )
+
+    def start_cross_validation(self, upstream_key: str, hyperparameters: dict = None) -> str:
+        cross_validation_trainer = CrossValidationTrainer(n_folds=self.cv_folds, workers=self.cv_workers,
+                                                          hyperparameters=hyperparameters, trainer_kwargs=self.trainer_kwargs)
+        trainer = cross_validation_trainer.trainer
+        self.model_type = trainer.model_type
+        self.model_files = self.trainer_model_files(trainer)
+        # The fold ensemble replaces the single model, so the stage caches the same bundle plus the fold outputs
+        outputs = dict(self.model_files)
+        outputs.update({"oof_predictions.npy": cross_validation_trainer.oof_predictions_path,
+                        "cv_report.json": cross_validation_trainer.report_path})
+        return self.run_stage(
+            "cross_validation", upstream_key,
+            {"config": self.config_fingerprint(trainer.model_trainer_config),
+             "cv_config": self.config_fingerprint(cross_validation_trainer.cross_validation_config),
+             "settings": {"n_folds": cross_validation_trainer.n_folds, "epochs": trainer.epochs,
+                          "batch_size": trainer.batch_size, "input_pipeline": trainer.input_pipeline,
+                          "mixed_precision_policy": trainer.mixed_precision_policy,
+                          "model_architecture": trainer.model_architecture,
+                          "hyperparameters": trainer.hyperparameters,
+                          "quantization_mode": trainer.quantization_mode},
+             "code": hash_sources([cross_validation, model_trainer, model_runtime])},
+            outputs,
+            cross_validation_trainer.initiate_cross_validation,
+        )
+
+    def register_model(self) -> str:
+        # The stages above write to fixed paths shared by every run; the registry keeps this run's copy of them
+        files = {**self.model_files, **self.model_registry_config.data_bundle_files}
+        return self.model_registry.register(files, metadata={
+            "run_artifact_dir": self.run_artifact_dir,
+            "model_type": self.model_type,
+            "stages": [{key: result[key] for key in ("stage", "key", "cached")} for result in self.stage_results],
+        })
+
+    def write_run_report(self, elapsed: float) -> dict:
+        try:
+            report = {
+                "run_artifact_dir": self.run_artifact_dir,
+                "model_version": self.model_version,
+                "seconds": round(elapsed, 3),
+                "stages": self.stage_results,
+                # Steps of stages restored from the cache did not run and are absent here
+                "steps": metrics_registry.snapshot(),
+                "rss_bytes": current_rss_bytes(),
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+            os.makedirs(os.path.dirname(self.run_report_path), exist_ok=True)
+            with open(self.run_report_path, "w") as f:
+                json.dump(report, f, indent=2)
+            logging.info(f"Run report written to {self.run_report_path}")
+
+            return report
+
+        except Exception as e:
+            logging.error(f"Error during writing run report: {e}")
+            raise CustomException(e, sys)
+
+    def run_pipeline(self) -> list:
+        try:
+            logging.info(f"Training pipeline started (cache {'on' if self.use_cache else 'off'})")
+            start_time = time.perf_counter()
+
+            key = self.start_data_ingestion()
+            logging.info("Data ingestion completed successfully.")
+
+            if self.streaming:
+                key = self.start_streaming_preprocessing(key)
+            else:
+                key = self.start_data_preprocessing(key)
+                key = self.start_data_transformation(key)
+
+            hyperparameters = None
+            if self.tune and ModelTrainer(**self.trainer_kwargs).model_type == "gbdt":
+                # The search space is the MLP's
+                logging.warning("Hyperparameter tuning skipped: it only searches MLP hyperparameters")
+            elif self.tune:
+                key, hyperparameters = self.start_hyperparameter_tuning(key)
+
+            if self.cv:
+                self.start_cross_validation(key, hyperparameters)
+            else:
+                self.start_model_trainer(key, hyperparameters)
+
+            self.model_version = self.register_model()
+            logging.info(f"Registered model version {self.model_version}")
+
+            logging.info(f"Training pipeline completed: {self.stage_results}")
+            self.write_run_report(time.perf_counter() - start_time)
+            return self.stage_results
+
+        except Exception as e:
+            logging.error(f"Error during training pipeline: {e}")
+            raise CustomException(e, sys)
@@ -0,0 +1,112 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.constants import training_pipeline
+
+import sys
+import pickle
+import numpy as np
+import pandas as pd
+
+# Sorted vocabulary per string column, stored as a fixed-width numpy string array.
+# Codes are positions in the sorted vocabulary, the same codes sklearn's LabelEncoder gives, so models and
+# encoders saved before this module keep working. Values outside the vocabulary get code len(vocabulary).
+#
+# Fitting and transforming never touch the rows one by one in Python:
+#   categorical columns  the few categories are looked up, then the int codes are remapped with one take
+#   object columns       pd.factorize (one hash pass) reduces the rows to their distinct values first
+# Only the distinct values are sorted or binary-searched (np.searchsorted) against the vocabulary.
+
+CODE_DTYPE = np.dtype(training_pipeline.INTEGER_STORAGE_DTYPE)
+
+
+def factorize(values: pd.Series) -> tuple:
+    # (row codes, distinct values) with code -1 for missing values; categoricals already are this pair
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.to_numpy()
+    return pd.factorize(values)
+
+
+def used_values(row_codes: np.ndarray, distinct: np.ndarray) -> np.ndarray:
+    # Distinct values that occur in the rows (a categorical may declare unused categories) as a string array.
+    # One scatter over the codes; code -1 lands in the extra last slot, which is dropped.
+    used = np.zeros(len(distinct) + 1, dtype=bool)
+    used[row_codes] = True
+    return np.asarray(distinct[used[:-1]], dtype=str)
+
+
+class CategoricalEncoder:
+    def __init__(self, vocabularies: dict = None):
+        self.vocabularies = vocabularies or {}
+
+    @classmethod
+    def from_vocabularies(cls, vocabularies: dict) -> "CategoricalEncoder":
+        # Any iterable of distinct values per column, e.g. the sets collected by streaming preprocessing
+        return cls({col: np.unique(np.asarray(list(values), dtype=str)) for col, values in vocabularies.items()})
+
+    def fit(self, dataframe: pd.DataFrame, columns: list) -> "CategoricalEncoder":
+        self.fit_transform(dataframe, columns, transform=False)
+        return self
+
+    def fit_transform(self, dataframe: pd.DataFrame, columns: list, transform: bool = True) -> dict:
+        # Each column is factorized once for both the vocabulary and the codes
+        try:
+            codes = {}
+            for col in columns:
+                row_codes, distinct = factorize(dataframe[col])
+                self.vocabularies[col] = np.unique(used_values(row_codes, distinct))
+                if transform:
+                    codes[col] = self.encode_codes(col, row_codes, distinct)
+            return codes
+
+        except Exception as e:
+            logging.error(f"Error during fitting categorical encoder: {e}")
+            raise CustomException(e, sys)
+
+    def vocabulary_codes(self, column: str, values: np.ndarray) -> np.ndarray:
+        # Code of each distinct value: binary search in the sorted vocabulary, misses go to the unknown bucket
+        vocabulary = self.vocabularies[column]
+        values = np.asarray(values, dtype=str)
+        positions = np.searchsorted(vocabulary, values)
+        found = positions < len(vocabulary)
+        found[found] = vocabulary[positions[found]] == values[found]
+        return np.where(found, positions, len(vocabulary)).astype(CODE_DTYPE)
+
+    def encode_codes(self, column: str, row_codes: np.ndarray, distinct: np.ndarray) -> np.ndarray:
+        distinct_codes = self.vocabulary_codes(column, distinct)
+
+        # Missing values have row code -1, which picks the unknown bucket appended at the end
+        unknown_code = len(self.vocabularies[column])
+        table = np.append(distinct_codes, CODE_DTYPE.type(unknown_code))
+        codes = table[row_codes]
+
+        # Rows are only scanned for unknowns when some distinct value is unknown or missing
+        if len(row_codes) and ((distinct_codes == unknown_code).any() or row_codes.min() < 0):
+            n_unknown = int(np.count_nonzero(codes == unknown_code))
+            if n_unknown:
+                logging.info(f"{n_unknown} unknown categories in {column} mapped to code {unknown_code}")
+
+        return codes
+
+    def transform(self, values: pd.Series, column: str) -> np.ndarray:
+        try:
+            return self.encode_codes(column, *factorize(values))
+
+        except Exception as e:
+            logging.error(f"Error during categorical encoding of {column}: {e}")
+            raise CustomException(e, sys)
+
+    def save(self, file_path: str, columns: list):
+        # Plain dict of numpy arrays: compact, and loading needs neither sklearn nor this class
+        with open(file_path, "wb") as f:
+            pickle.dump({col: self.vocabularies[col] for col in columns}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, file_path: str, column: str = None) -> "CategoricalEncoder":
+        # Also reads the older formats: one fitted LabelEncoder (column must be given) or a dict of them
+        with open(file_path, "rb") as f:
+            saved = pickle.load(f)
+        if not isinstance(saved, dict):
+            saved = {column: saved}
+        for col, vocabulary in saved.items():
+            vocabulary = getattr(vocabulary, "classes_", vocabulary)
+            self.vocabularies[col] = np.asarray(vocabulary, dtype=str)
+        return self
@@ -0,0 +1,165 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.constants import training_pipeline
+
+import os
+import sys
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# Layout of a columnar artifact directory:
+#   schema.json              column order, kind and dtype, row count
+#   <column>.npy             numeric columns (int32 codes/ids, float32 features)
+#   <column>.codes.npy       dictionary-encoded string columns: int32 codes ...
+#   <column>.categories.npy  ... and the fixed-width unicode dictionary
+# Every .npy file can be opened with mmap_mode="r", so readers never parse text.
+
+SCHEMA_FILE_NAME = "schema.json"
+
+
+def storage_dtype(series: pd.Series) -> np.dtype:
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return np.dtype(training_pipeline.INTEGER_STORAGE_DTYPE)
+    return np.dtype(training_pipeline.FLOAT_STORAGE_DTYPE)
+
+
+def save_columnar_frame(dataframe: pd.DataFrame, dir_path: str) -> str:
+    try:
+        logging.info(f"Saving {len(dataframe)} rows as columnar artifact at {dir_path}")
+
+        if os.path.exists(dir_path):
+            shutil.rmtree(dir_path)
+        os.makedirs(dir_path, exist_ok=True)
+
+        columns = []
+        for col in dataframe.columns:
+            series = dataframe[col]
+            if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                dtype = storage_dtype(series)
+                np.save(os.path.join(dir_path, f"{col}.npy"), series.to_numpy(dtype=dtype))
+                columns.append({"name": col, "kind": "numeric", "dtype": dtype.name})
+            else:
+                categorical = pd.Categorical(series)
+                categories = np.asarray(categorical.categories, dtype=str)
+                np.save(os.path.join(dir_path, f"{col}.codes.npy"),
+                        categorical.codes.astype(training_pipeline.INTEGER_STORAGE_DTYPE))
+                np.save(os.path.join(dir_path, f"{col}.categories.npy"), categories)
+                columns.append({"name": col, "kind": "category", "dtype": training_pipeline.INTEGER_STORAGE_DTYPE})
+
+        with open(os.path.join(dir_path, SCHEMA_FILE_NAME), "w") as f:
+            json.dump({"n_rows": int(len(dataframe)), "columns": columns}, f, indent=2)
+
+        return dir_path
+
+    except Exception as e:
+        logging.error(f"Error during saving columnar artifact: {e}")
+        raise CustomException(e, sys)
+
+
+def read_columnar_schema(dir_path: str) -> dict:
+    try:
+        with open(os.path.join(dir_path, SCHEMA_FILE_NAME)) as f:
+            return json.load(f)
+    except Exception as e:
+        logging.error(f"Error during reading columnar schema: {e}")
+        raise CustomException(e, sys)
+
+
+def load_columnar_arrays(dir_path: str, columns: list = None, mmap_mode: str = "r") -> dict:
+    try:
+        schema = read_columnar_schema(dir_path)
+        arrays = {}
+        for column in schema["columns"]:
+            name = column["name"]
+            if columns is not None and name not in columns:
+                continue
+            if column["kind"] == "numeric":
+                arrays[name] = np.load(os.path.join(dir_path, f"{name}.npy"), mmap_mode=mmap_mode)
+            else:
+                arrays[name] = np.load(os.path.join(dir_path, f"{name}.codes.npy"), mmap_mode=mmap_mode)
+        return arrays
+
+    except Exception as e:
+        logging.error(f"Error during loading columnar arrays: {e}")
+        raise CustomException(e, sys)
+
+
+def load_columnar_frame(dir_path: str, columns: list = None, mmap_mode: str = "r") -> pd.DataFrame:
+    try:
+        logging.info(f"Loading columnar artifact from {dir_path}")
+
+        schema = read_columnar_schema(dir_path)
+        data = {}
+        for column in schema["columns"]:
+            name = column["name"]
+            if columns is not None and name not in columns:
+                continue
+            if column["kind"] == "numeric":
+                data[name] = np.load(os.path.join(dir_path, f"{name}.npy"), mmap_mode=mmap_mode)
+            else:
+                codes = np.load(os.path.join(dir_path, f"{name}.codes.npy"))
+                categories = np.load(os.path.join(dir_path, f"{name}.categories.npy"))
+                data[name] = pd.Categorical.from_codes(codes, categories=categories.astype(object))
+
+        return pd.DataFrame(data, copy=False)
+
+    except Exception as e:
+        logging.error(f"Error during loading columnar artifact: {e}")
+        raise CustomException(e, sys)
+
+
+class ColumnarFrameWriter:
+    # Appends numeric chunks to per-column raw files and turns them into .npy files on close()
+
+    def __init__(self, dir_path: str):
+        self.dir_path = dir_path
+        self.columns = None
+        self.n_rows = 0
+        self._files = {}
+
+    def append(self, dataframe: pd.DataFrame):
+        try:
+            if self.columns is None:
+                if os.path.exists(self.dir_path):
+                    shutil.rmtree(self.dir_path)
+                os.makedirs(self.dir_path, exist_ok=True)
+                self.columns = [
+                    {"name": col, "kind": "numeric", "dtype": storage_dtype(dataframe[col]).name}
+                    for col in dataframe.columns
+                ]
+                for column in self.columns:
+                    self._files[column["name"]] = open(os.path.join(self.dir_path, f"{column['name']}.bin"), "wb")
+
+            for column in self.columns:
+                values = dataframe[column["name"]].to_numpy(dtype=column["dtype"])
+                self._files[column["name"]].write(np.ascontiguousarray(values).tobytes())
+            self.n_rows += len(dataframe)
+
+        except Exception as e:
+            logging.error(f"Error during appending to columnar artifact: {e}")
+            raise CustomException(e, sys)
+
+    def close(self) -> str:
+        try:
+            for column in self.columns or []:
+                name = column["name"]
+                self._files[name].close()
+                raw_path = os.path.join(self.dir_path, f"{name}.bin")
+                header = {"descr": np.lib.format.dtype_to_descr(np.dtype(column["dtype"])),
+                          "fortran_order": False, "shape": (self.n_rows,)}
+                with open(os.path.join(self.dir_path, f"{name}.npy"), "wb") as out, open(raw_path, "rb") as raw:
+                    np.lib.format.write_array_header_1_0(out, header)
+                    shutil.copyfileobj(raw, out)
+                os.remove(raw_path)
+
+            with open(os.path.join(self.dir_path, SCHEMA_FILE_NAME), "w") as f:
+                json.dump({"n_rows": self.n_rows, "columns": self.columns or []}, f, indent=2)
+
+            logging.info(f"Columnar artifact with {self.n_rows} rows written at {self.dir_path}")
+            return self.dir_path
+
+        except Exception as e:
+            logging.error(f"Error during closing columnar artifact: {e}")
+            raise CustomException(e, sys)
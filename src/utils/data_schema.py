@@ -0,0 +1,81 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.constants import training_pipeline
+
+import sys
+import yaml
+import pandas as pd
+
+# Compact in-memory dtype for each dtype declared in data_schema/data.yaml. Strings become categoricals
+# (one small dictionary plus integer codes), floats are stored as float32 and ids as int32, matching the
+# columnar artifacts. Counts with missing values (Number_of_Ads) stay float32, since NaN has no integer form.
+COMPACT_DTYPES = {
+    "object": "category",
+    "float64": training_pipeline.FLOAT_STORAGE_DTYPE,
+    "int64": training_pipeline.INTEGER_STORAGE_DTYPE,
+}
+
+
+class SchemaValidationError(ValueError):
+    # Input data that does not match the schema; the API answers it with 422 instead of 500
+    pass
+
+
+class DataSchema:
+    def __init__(self, schema_file_path: str = None):
+        try:
+            self.schema_file_path = schema_file_path or training_pipeline.SCHEMA_FILE_PATH
+            with open(self.schema_file_path) as f:
+                schema = yaml.safe_load(f)
+
+            # data.yaml lists the columns as one-key mappings, in file order
+            self.columns = {name: str(dtype) for entry in schema["columns"] for name, dtype in entry.items()}
+            self.numerical_columns = list(schema.get("numerical_columns", []))
+            self.categorical_columns = list(schema.get("categorical_columns", []))
+            self.target_column = training_pipeline.TARGET_COLUMN
+
+        except Exception as e:
+            logging.error(f"Error during loading data schema: {e}")
+            raise CustomException(e, sys)
+
+    def column_names(self, include_target: bool = True) -> list:
+        return [col for col in self.columns if include_target or col != self.target_column]
+
+    def compact_dtypes(self, include_target: bool = True, categorical: bool = True) -> dict:
+        dtypes = {}
+        for col in self.column_names(include_target):
+            dtype = COMPACT_DTYPES.get(self.columns[col], self.columns[col])
+            if dtype == "category" and not categorical:
+                continue
+            dtypes[col] = dtype
+        return dtypes
+
+    def read_csv(self, file_path, include_target: bool = True, **kwargs):
+        # dtype at parse time: no float64/object intermediate frame is ever built
+        return pd.read_csv(file_path, dtype=self.compact_dtypes(include_target), **kwargs)
+
+    def apply_dtypes(self, dataframe: pd.DataFrame, categorical: bool = True) -> pd.DataFrame:
+        dtypes = {col: dtype for col, dtype in self.compact_dtypes(categorical=categorical).items() if col in dataframe.columns}
+        return dataframe.astype(dtypes, copy=False)
+
+    def validate_columns(self, columns: list, include_target: bool = False):
+        missing = [col for col in self.column_names(include_target) if col not in columns]
+        if missing:
+            raise SchemaValidationError(f"Columns missing from input data: {missing}")
+
+    def validate(self, dataframe: pd.DataFrame, include_target: bool = False):
+        expected = self.column_names(include_target)
+        self.validate_columns(list(dataframe.columns), include_target)
+
+        problems = []
+        numeric = [col for col in expected if self.columns[col] != "object"]
+        not_numeric = [col for col in numeric if not pd.api.types.is_numeric_dtype(dataframe[col])]
+        if not_numeric:
+            problems.append(f"non-numeric values in {not_numeric}")
+
+        # Other columns may be missing per row (imputed or mapped to the unknown category); ids may not
+        if "id" in expected and dataframe["id"].isna().any():
+            problems.append(f"{int(dataframe['id'].isna().sum())} rows without an id")
+
+        if problems:
+            raise SchemaValidationError(f"Input data does not match {self.schema_file_path}: {'; '.join(problems)}")
@@ -0,0 +1,25 @@
+import os
+import hashlib
+
+# File fingerprints shared by the stage cache, the model registry and the prediction cache.
+#   hash_file:         SHA-256 of the content, for identity that must survive copies (cache keys, bundle checks)
+#   stat_fingerprint:  size and modification time only, cheap enough to check on every request
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stat_fingerprint(file_paths: list) -> str:
+    # Notices a file replaced in place (e.g. a retrained model) without reading it
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
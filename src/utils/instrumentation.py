@@ -0,0 +1,151 @@
+from src.logger import logging
+
+import os
+import time
+import pstats
+import cProfile
+import resource
+import threading
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Per-step timing, row and memory counters shared by training and serving.
+#   with track("data_preprocessing.read_csv") as step: ...; step.rows = len(df)
+#   @instrument("data_preprocessing.fill_missing_values")   rows = length of the first DataFrame argument
+# metrics_registry.snapshot() feeds the JSON run report of main.py, to_prometheus() the /metrics endpoint of app.py.
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# (pid, fd) of /proc/self/statm; re-reading an open fd is ~1µs against ~10µs for open+read,
+# and the pid check reopens it in forked workers, where the inherited fd still points at the parent
+_statm = (None, None)
+
+
+def current_rss_bytes() -> int:
+    global _statm
+    try:
+        pid, fd = _statm
+        if pid != os.getpid():
+            fd = os.open("/proc/self/statm", os.O_RDONLY)
+            _statm = (os.getpid(), fd)
+        return int(os.pread(fd, 64, 0).split()[1]) * _PAGE_SIZE
+    except (OSError, AttributeError):
+        # No procfs: fall back to the peak, which is the best portable approximation
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class StepRecord:
+    def __init__(self, stage: str, rows: int = None):
+        self.stage = stage
+        self.rows = rows
+        self.seconds = 0.0
+        self.rss_delta_bytes = 0
+
+    def __enter__(self):
+        self._rss_before = current_rss_bytes()
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.seconds = time.perf_counter() - self._start_time
+        self.rss_delta_bytes = current_rss_bytes() - self._rss_before
+        metrics_registry.record(self)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, step: StepRecord):
+        with self._lock:
+            stats = self._stages.setdefault(step.stage, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0,
+                                                         "rss_delta_bytes": 0})
+            stats["calls"] += 1
+            stats["seconds"] += step.seconds
+            stats["max_seconds"] = max(stats["max_seconds"], step.seconds)
+            stats["rows"] += step.rows or 0
+            stats["rss_delta_bytes"] = step.rss_delta_bytes
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in self._stages.items()}
+        for stats in stages.values():
+            stats["seconds"] = round(stats["seconds"], 6)
+            stats["max_seconds"] = round(stats["max_seconds"], 6)
+            stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] and stats["rows"] else None
+        return stages
+
+    def to_prometheus(self, prefix: str = "podcast") -> str:
+        stages = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time spent in a pipeline step.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, stats in stages.items():
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["calls"]}')
+        lines += [f"# HELP {prefix}_stage_seconds_max Slowest single call of a pipeline step.",
+                  f"# TYPE {prefix}_stage_seconds_max gauge"]
+        lines += [f'{prefix}_stage_seconds_max{{stage="{stage}"}} {stats["max_seconds"]}' for stage, stats in stages.items()]
+        lines += [f"# HELP {prefix}_stage_rows_total Rows processed by a pipeline step.",
+                  f"# TYPE {prefix}_stage_rows_total counter"]
+        lines += [f'{prefix}_stage_rows_total{{stage="{stage}"}} {stats["rows"]}' for stage, stats in stages.items()]
+        lines += [f"# HELP {prefix}_stage_rss_delta_bytes Resident memory change over the last call of a pipeline step.",
+                  f"# TYPE {prefix}_stage_rss_delta_bytes gauge"]
+        lines += [f'{prefix}_stage_rss_delta_bytes{{stage="{stage}"}} {stats["rss_delta_bytes"]}' for stage, stats in stages.items()]
+        lines += ["# HELP process_resident_memory_bytes Resident memory size in bytes.",
+                  "# TYPE process_resident_memory_bytes gauge",
+                  f"process_resident_memory_bytes {current_rss_bytes()}",
+                  "# HELP process_peak_resident_memory_bytes Peak resident memory size in bytes.",
+                  "# TYPE process_peak_resident_memory_bytes gauge",
+                  f"process_peak_resident_memory_bytes {peak_rss_bytes()}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def track(stage: str, rows: int = None) -> StepRecord:
+    # Recorded on exit, also when the step raises; set step.rows inside the block when it is only known there
+    return StepRecord(stage, rows)
+
+
+def count_rows(args) -> int:
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series, np.ndarray)):
+            return len(arg)
+    return None
+
+
+def instrument(stage: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage, rows=count_rows(args)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_call(profile_path: str, func, *args, **kwargs):
+    # Runs one call under cProfile and writes the stats (load with pstats or snakeviz)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+        profiler.dump_stats(profile_path)
+        stats = pstats.Stats(profiler)
+        logging.info(f"Profile written to {profile_path} ({stats.total_calls} calls, {stats.total_tt:.3f}s)")
@@ -0,0 +1,162 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.entity.config_entity import TrainingPipelineConfig, ModelRegistryConfig
+from src.utils.file_hashing import hash_file
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+
+# Local registry of immutable model bundles.
+#   <registry_dir>/versions/<version>/  model, encoders, preprocessing state and manifest.json of one training run
+#   <registry_dir>/LATEST               name of the version to serve
+# Bundles are written to a hidden temporary directory and renamed into place, and LATEST is replaced with
+# os.replace, so a reader sees either the old or the new bundle and pointer, never a partial one.
+# Versions are "<YYYYmmdd_HHMMSS>_<content hash>": they sort by registration time, and registering files
+# identical to an existing bundle (e.g. a training stage restored from the stage cache) reuses that version.
+
+
+class ModelRegistry:
+    def __init__(self, registry_dir: str = None):
+        self.model_registry_config = ModelRegistryConfig(training_pipeline_config=TrainingPipelineConfig())
+        self.registry_dir = registry_dir or self.model_registry_config.registry_dir
+        self.versions_dir = os.path.join(self.registry_dir, "versions")
+        self.latest_path = os.path.join(self.registry_dir, self.model_registry_config.latest_file_name)
+        self.manifest_file_name = self.model_registry_config.manifest_file_name
+        self.keep_versions = self.model_registry_config.keep_versions
+
+    def bundle_dir(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self) -> list:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        # Hidden directories are registrations still being written
+        return sorted(name for name in os.listdir(self.versions_dir)
+                      if not name.startswith(".") and os.path.isdir(self.bundle_dir(name)))
+
+    def latest_version(self) -> str:
+        try:
+            with open(self.latest_path) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def load_manifest(self, version: str) -> dict:
+        with open(os.path.join(self.bundle_dir(version), self.manifest_file_name)) as f:
+            return json.load(f)
+
+    def register(self, files: dict, metadata: dict = None) -> str:
+        # files: name inside the bundle -> path of the file to copy in; the new version becomes LATEST
+        try:
+            file_hashes = {name: hash_file(path) for name, path in sorted(files.items())}
+            content_hash = hashlib.sha256(json.dumps(file_hashes, sort_keys=True).encode()).hexdigest()[:12]
+
+            existing = [version for version in self.list_versions() if version.endswith(f"_{content_hash}")]
+            if existing:
+                version = existing[-1]
+                logging.info(f"Model bundle unchanged, reusing registered version {version}")
+            else:
+                version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{content_hash}"
+                self.write_bundle(version, files, {
+                    "version": version,
+                    "content_hash": content_hash,
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "files": {name: {"sha256": file_hashes[name], "size_bytes": os.path.getsize(path)}
+                              for name, path in files.items()},
+                    "metadata": metadata or {},
+                })
+                logging.info(f"Registered model version {version} in {self.registry_dir}")
+
+            self.set_latest(version)
+            self.prune()
+
+            return version
+
+        except Exception as e:
+            logging.error(f"Error during model registration: {e}")
+            raise CustomException(e, sys)
+
+    def write_bundle(self, version: str, files: dict, manifest: dict):
+        tmp_dir = os.path.join(self.versions_dir, f".{version}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            for name, path in files.items():
+                shutil.copy2(path, os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, self.manifest_file_name), "w") as f:
+                json.dump(manifest, f, indent=2)
+            # Read-only files: a bundle is never modified once registered
+            for name in os.listdir(tmp_dir):
+                os.chmod(os.path.join(tmp_dir, name), 0o444)
+            os.rename(tmp_dir, self.bundle_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def set_latest(self, version: str):
+        try:
+            if not os.path.isdir(self.bundle_dir(version)):
+                raise ValueError(f"Model version {version} is not registered in {self.registry_dir}")
+            tmp_path = f"{self.latest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(version + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.latest_path)
+            logging.info(f"Model version {version} is now the latest")
+
+        except Exception as e:
+            logging.error(f"Error during setting the latest model version: {e}")
+            raise CustomException(e, sys)
+
+    def verify(self, version: str) -> bool:
+        manifest = self.load_manifest(version)
+        return all(hash_file(os.path.join(self.bundle_dir(version), name)) == entry["sha256"]
+                   for name, entry in manifest["files"].items())
+
+    def prune(self) -> list:
+        # Oldest first; the latest version stays even when it is an old bundle that was promoted again
+        if not self.keep_versions:
+            return []
+        latest = self.latest_version()
+        removable = [version for version in self.list_versions() if version != latest]
+        removed = removable[:max(len(removable) - (self.keep_versions - 1), 0)]
+        for version in removed:
+            shutil.rmtree(self.bundle_dir(version))
+            logging.info(f"Pruned model version {version}")
+        return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List registered model versions, promote one to LATEST (rollback) "
+                                                 "or check that LATEST is a servable bundle")
+    parser.add_argument("command", choices=["list", "promote", "check"])
+    parser.add_argument("version", nargs="?")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "check":
+        # Used by the Dockerfile: an image without a bundle would never become ready
+        latest = registry.latest_version()
+        if latest is None:
+            sys.exit(f"No model bundle in {registry.registry_dir}: run `python main.py`, or copy a registry with a "
+                     f"LATEST version there, before building or starting the server")
+        if not registry.verify(latest):
+            sys.exit(f"Model bundle {latest} in {registry.registry_dir} does not match its manifest")
+        print(f"Serving model version {latest}")
+        sys.exit(0)
+    if args.command == "promote":
+        if not args.version:
+            parser.error("promote needs a version")
+        registry.set_latest(args.version)
+
+    latest = registry.latest_version()
+    for version in registry.list_versions():
+        manifest = registry.load_manifest(version)
+        print(f"{'*' if version == latest else ' '} {version}  {manifest['created_at']}  "
+              f"{manifest['metadata'].get('model_type', 'mlp'):<4}  {manifest['metadata'].get('run_artifact_dir', '')}")
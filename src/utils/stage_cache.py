@@ -0,0 +1,146 @@
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils.file_hashing import hash_file
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import inspect
+
+# Layout of the stage cache:
+#   file_hashes.json               content hashes of input files, keyed by path, size and mtime
+#   <stage>/<key>/manifest.json    fingerprint inputs and the outputs stored in this entry
+#   <stage>/<key>/<output name>    cached copy of each output file or directory
+# A stage key hashes the upstream stage key, the input file hashes, the stage's config fields and the
+# source code of the modules it runs. Changing any of them changes the key of that stage and of every
+# stage after it.
+
+MANIFEST_FILE_NAME = "manifest.json"
+FILE_HASHES_FILE_NAME = "file_hashes.json"
+
+
+def hash_sources(modules: list) -> str:
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(inspect.getsourcefile(module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def config_fields(config, exclude_prefix: str = None) -> dict:
+    # Paths under the timestamped run directory differ on every run and say nothing about the content
+    return {
+        name: value for name, value in sorted(vars(config).items())
+        if not (exclude_prefix and isinstance(value, str) and value.startswith(exclude_prefix))
+    }
+
+
+class StageCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def file_fingerprint(self, file_path: str) -> str:
+        try:
+            # Re-hash only when the file's size or modification time changed since the last run
+            hashes_path = os.path.join(self.cache_dir, FILE_HASHES_FILE_NAME)
+            known = {}
+            if os.path.exists(hashes_path):
+                with open(hashes_path) as f:
+                    known = json.load(f)
+
+            stat = os.stat(file_path)
+            entry = known.get(os.path.abspath(file_path))
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                return entry["sha256"]
+
+            start_time = time.perf_counter()
+            sha256 = hash_file(file_path)
+            logging.info(f"Hashed {file_path} in {time.perf_counter() - start_time:.1f}s")
+
+            known[os.path.abspath(file_path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(hashes_path, "w") as f:
+                json.dump(known, f, indent=2)
+
+            return sha256
+
+        except Exception as e:
+            logging.error(f"Error during file fingerprinting: {e}")
+            raise CustomException(e, sys)
+
+    def stage_key(self, fingerprint: dict) -> str:
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode()).hexdigest()[:20]
+
+    def entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    def lookup(self, stage: str, key: str) -> dict:
+        manifest_path = os.path.join(self.entry_dir(stage, key), MANIFEST_FILE_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def copy_output(source: str, destination: str):
+        # Columnar directories are never modified in place (writers rmtree and recreate them), so they are
+        # hard-linked. Single files such as pickles are rewritten in place by later runs, so they are copied.
+        if os.path.isdir(destination):
+            shutil.rmtree(destination)
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        if os.path.isdir(source):
+            def link_or_copy(src, dst):
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+            shutil.copytree(source, destination, copy_function=link_or_copy)
+        else:
+            shutil.copy2(source, destination)
+
+    def store(self, stage: str, key: str, fingerprint: dict, outputs: dict) -> dict:
+        try:
+            entry_dir = self.entry_dir(stage, key)
+            tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir)
+            os.makedirs(tmp_dir)
+
+            for name, path in outputs.items():
+                self.copy_output(path, os.path.join(tmp_dir, name))
+
+            manifest = {
+                "stage": stage,
+                "key": key,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "fingerprint": fingerprint,
+                "outputs": outputs,
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE_NAME), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            # The manifest only becomes visible once every output is in place
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(tmp_dir, entry_dir)
+            logging.info(f"Cached stage '{stage}' under {entry_dir}")
+
+            return manifest
+
+        except Exception as e:
+            logging.error(f"Error during storing stage '{stage}' in cache: {e}")
+            raise CustomException(e, sys)
+
+    def restore(self, stage: str, key: str, outputs: dict):
+        try:
+            entry_dir = self.entry_dir(stage, key)
+            for name, path in outputs.items():
+                self.copy_output(os.path.join(entry_dir, name), path)
+            logging.info(f"Restored stage '{stage}' from {entry_dir}")
+
+        except Exception as e:
+            logging.error(f"Error during restoring stage '{stage}' from cache: {e}")
+            raise CustomException(e, sys)
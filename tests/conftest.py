@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import pytest
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.utils.data_schema import DataSchema
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAIN_ROWS = 5000
+TEST_ROWS = 3000
+
+
+def create_project_dir(project_dir):
+    # Laid out like the project root: the schema and a synthetic dataset/train.csv and test.csv
+    shutil.copytree(os.path.join(REPO_DIR, "data_schema"), os.path.join(project_dir, "data_schema"))
+    schema = DataSchema(os.path.join(project_dir, "data_schema", "data.yaml"))
+    os.makedirs(os.path.join(project_dir, "dataset"))
+    generate_podcast_data(TRAIN_ROWS, schema=schema).to_csv(os.path.join(project_dir, "dataset", "train.csv"), index=False)
+    generate_podcast_data(TEST_ROWS, start_id=TRAIN_ROWS, include_target=False, seed=7, schema=schema).to_csv(
+        os.path.join(project_dir, "dataset", "test.csv"), index=False)
+
+
+@pytest.fixture(scope="session")
+def trained_workspace(tmp_path_factory):
+    # A project directory with a small gbdt model trained and registered in it
+    workspace = tmp_path_factory.mktemp("workspace")
+    create_project_dir(workspace)
+
+    from src.pipeline.training_pipeline import TrainingPipeline
+    cwd = os.getcwd()
+    os.chdir(workspace)
+    try:
+        TrainingPipeline(use_cache=False, trainer_kwargs={"model_type": "gbdt"}).run_pipeline()
+    finally:
+        os.chdir(cwd)
+    return workspace
+
+
+@pytest.fixture
+def workspace(trained_workspace, monkeypatch):
+    # Configs use paths relative to the working directory, spawned workers inherit it and the environment
+    monkeypatch.chdir(trained_workspace)
+    monkeypatch.setenv("MODEL_BACKEND", "gbdt")
+    return trained_workspace
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    # An untrained project directory of the test's own, for tests that train or register models
+    create_project_dir(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
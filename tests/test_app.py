@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.constants import training_pipeline
+
+UPLOAD_ROWS = 50
+
+
+@pytest.fixture(scope="module")
+def app_module(trained_workspace):
+    # app.py loads the registered model of the working directory on import, and its lifespan shuts the executor down,
+    # so one client serves the whole module
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(trained_workspace)
+        monkeypatch.setattr(training_pipeline, "PREDICTION_UPLOAD_CHUNK_SIZE", 20)
+        import app
+        with TestClient(app.app) as client:
+            while not app.pipeline.is_ready:
+                time.sleep(0.1)
+            app.client = client
+            yield app
+
+
+@pytest.fixture
+def upload(trained_workspace) -> pd.DataFrame:
+    return pd.read_csv(os.path.join(trained_workspace, "dataset", "test.csv")).head(UPLOAD_ROWS)
+
+
+def post_csv(app_module, dataframe: pd.DataFrame, output_format: str):
+    body = dataframe.to_csv(index=False) if dataframe is not None else ""
+    return app_module.client.post(f"/predict/?format={output_format}", files={"file": ("episodes.csv", body)})
+
+
+def expected_predictions(app_module, dataframe: pd.DataFrame) -> pd.DataFrame:
+    schema = app_module.pipeline.data_schema
+    return app_module.pipeline.initiate_prediction(schema.read_csv(io.StringIO(dataframe.to_csv(index=False)),
+                                                                   include_target=False))
+
+
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_upload_streams_predictions_in_input_order(app_module, upload, output_format):
+    response = post_csv(app_module, upload, output_format)
+
+    assert response.status_code == 200
+    if output_format == "csv":
+        assert response.headers["content-type"].startswith("text/csv")
+        # One header line, then the rows of every chunk
+        predictions = pd.read_csv(io.StringIO(response.text))
+    else:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        predictions = pd.DataFrame([json.loads(line) for line in response.text.splitlines()])
+    expected = expected_predictions(app_module, upload)
+    assert list(predictions.columns) == list(expected.columns)
+    assert predictions.iloc[:, 0].tolist() == upload["id"].tolist()
+    pd.testing.assert_frame_equal(predictions, expected, check_dtype=False, rtol=1e-5)
+
+
+@pytest.mark.parametrize("bad_upload", ["missing_column", "text_in_numeric_column", "empty_file"])
+def test_upload_not_matching_schema_answers_422(app_module, upload, bad_upload):
+    if bad_upload == "missing_column":
+        upload = upload.drop(columns=["Genre"])
+    elif bad_upload == "text_in_numeric_column":
+        upload["Number_of_Ads"] = upload["Number_of_Ads"].astype(object)
+        upload.loc[3, "Number_of_Ads"] = "many"
+    else:
+        upload = None
+
+    response = post_csv(app_module, upload, "ndjson")
+
+    assert response.status_code == 422
+    assert response.json()["detail"]
+
+
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_failed_stream_ends_with_error_trailer(app_module, upload, output_format):
+    # A row without an id in the second chunk: the first chunk is already sent with status 200
+    upload["id"] = upload["id"].astype(object)
+    upload.loc[30, "id"] = None
+
+    response = post_csv(app_module, upload, output_format)
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    if output_format == "csv":
+        assert len(lines) == 1 + 20 + 1
+        assert lines[-1].startswith("# error 422: ")
+    else:
+        assert len(lines) == 20 + 1
+        assert json.loads(lines[-1])["error"]["status_code"] == 422
@@ -0,0 +1,52 @@
+import os
+
+from src.pipeline.batch_prediction import BatchPrediction, count_lines
+
+INPUT_FILE_PATH = os.path.join("dataset", "test.csv")
+
+
+def run_batch(output_file_path, resume: bool = False, **kwargs) -> BatchPrediction:
+    batch_prediction = BatchPrediction(INPUT_FILE_PATH, str(output_file_path), chunk_size=500, **kwargs)
+    batch_prediction.initiate_batch_prediction(resume=resume)
+    return batch_prediction
+
+
+def read_bytes(file_path) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def test_sharded_output_matches_sequential(workspace, tmp_path):
+    sequential = run_batch(tmp_path / "sequential.csv", workers=1)
+    sharded = run_batch(tmp_path / "sharded.csv", workers=2, parallel_min_rows=0)
+
+    assert not sequential.parallel and sharded.parallel
+    # Shards come back in input order, so the files are byte for byte the same
+    assert read_bytes(tmp_path / "sharded.csv") == read_bytes(tmp_path / "sequential.csv")
+    assert count_lines(tmp_path / "sequential.csv") == count_lines(INPUT_FILE_PATH)
+
+
+def test_small_file_is_scored_in_one_process(workspace, tmp_path):
+    batch_prediction = run_batch(tmp_path / "predictions.csv", workers=2)
+
+    # Far below the gbdt crossover, so no worker processes are started
+    assert not batch_prediction.parallel
+
+
+def test_resume_after_interrupted_run(workspace, tmp_path):
+    run_batch(tmp_path / "full.csv")
+    full = read_bytes(tmp_path / "full.csv")
+
+    # An interrupted run: the header, 1200 complete rows and half of the next row
+    lines = full.splitlines(keepends=True)
+    with open(tmp_path / "resumed.csv", "wb") as f:
+        f.write(b"".join(lines[:1201]) + lines[1201][:5])
+
+    resumed = BatchPrediction(INPUT_FILE_PATH, str(tmp_path / "resumed.csv"))
+    assert resumed.count_completed_rows() == 1200
+    run_batch(tmp_path / "resumed.csv", resume=True)
+    assert read_bytes(tmp_path / "resumed.csv") == full
+
+    # Resuming a finished file scores nothing and leaves it unchanged
+    run_batch(tmp_path / "resumed.csv", resume=True)
+    assert read_bytes(tmp_path / "resumed.csv") == full
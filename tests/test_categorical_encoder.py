@@ -0,0 +1,65 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from src.utils.categorical_encoder import CategoricalEncoder
+
+GENRES = pd.Series(["News", "Comedy", "True Crime", "News", "Music", "Comedy"])
+PODCASTS = pd.Series(["Tech Talk", "Daily News", "Tech Talk", "Mystery Hour", "Daily News", "Joke Time"])
+# A categorical declaring a category that no row holds
+GENRES_WITH_UNUSED = GENRES.astype(pd.CategoricalDtype(["Sports", *GENRES.unique()]))
+
+
+def fit_encoder() -> CategoricalEncoder:
+    return CategoricalEncoder().fit(pd.DataFrame({"Genre": GENRES, "Podcast_Name": PODCASTS}), ["Genre", "Podcast_Name"])
+
+
+def test_codes_match_label_encoder():
+    encoder = fit_encoder()
+
+    for values in [GENRES, GENRES.astype("category"), GENRES_WITH_UNUSED]:
+        np.testing.assert_array_equal(encoder.transform(values, "Genre"), LabelEncoder().fit_transform(GENRES))
+    # Categories declared but absent from the rows are not part of the vocabulary
+    fitted_on_categorical = CategoricalEncoder().fit(pd.DataFrame({"Genre": GENRES_WITH_UNUSED}), ["Genre"])
+    np.testing.assert_array_equal(fitted_on_categorical.vocabularies["Genre"], encoder.vocabularies["Genre"])
+
+
+def test_unknown_and_missing_values_share_one_bucket():
+    encoder = fit_encoder()
+    values = pd.Series(["News", "Podcasting", None, "Music", "Health"])
+
+    codes = encoder.transform(values, "Genre")
+
+    unknown_code = GENRES.nunique()
+    assert codes.tolist() == [2, unknown_code, unknown_code, 1, unknown_code]
+    np.testing.assert_array_equal(encoder.transform(values.astype("category"), "Genre"), codes)
+
+
+def test_save_and_load(tmp_path):
+    encoder = fit_encoder()
+    encoder.save(str(tmp_path / "encoders.pkl"), ["Genre", "Podcast_Name"])
+
+    loaded = CategoricalEncoder().load(str(tmp_path / "encoders.pkl"))
+
+    for col in ["Genre", "Podcast_Name"]:
+        np.testing.assert_array_equal(loaded.vocabularies[col], encoder.vocabularies[col])
+    np.testing.assert_array_equal(loaded.transform(PODCASTS, "Podcast_Name"), encoder.transform(PODCASTS, "Podcast_Name"))
+
+
+def test_legacy_label_encoder_pickles_load(tmp_path):
+    # Older runs pickled one LabelEncoder per ID column and a dict of LabelEncoders for the other columns
+    with open(tmp_path / "podcast_encoder.pkl", "wb") as f:
+        pickle.dump(LabelEncoder().fit(PODCASTS), f)
+    with open(tmp_path / "other_cat_encoder.pkl", "wb") as f:
+        pickle.dump({"Genre": LabelEncoder().fit(GENRES)}, f)
+
+    loaded = CategoricalEncoder()
+    loaded.load(str(tmp_path / "podcast_encoder.pkl"), column="Podcast_Name")
+    loaded.load(str(tmp_path / "other_cat_encoder.pkl"))
+
+    encoder = fit_encoder()
+    for col, values in [("Genre", GENRES), ("Podcast_Name", PODCASTS)]:
+        np.testing.assert_array_equal(loaded.vocabularies[col], encoder.vocabularies[col])
+        np.testing.assert_array_equal(loaded.transform(values, col), encoder.transform(values, col))
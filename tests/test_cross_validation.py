@@ -0,0 +1,52 @@
+import json
+import os
+import pickle
+
+import numpy as np
+from tensorflow import keras
+
+from src.components.cross_validation import CrossValidationTrainer, fold_indices
+from src.pipeline.model_runtime import NumpyModelRuntime
+from src.pipeline.training_pipeline import TrainingPipeline
+from src.utils.columnar_storage import read_columnar_schema
+
+
+def test_folds_hold_out_every_row_once():
+    folds = fold_indices(103, 4, random_state=42)
+
+    held_out = np.concatenate([val_indices for _, val_indices in folds])
+    assert np.array_equal(np.sort(held_out), np.arange(103))
+    for train_indices, val_indices in folds:
+        assert len(train_indices) + len(val_indices) == 103
+        assert not np.intersect1d(train_indices, val_indices).size
+    # Recomputed identically in every worker process
+    assert all(np.array_equal(a[1], b[1]) for a, b in zip(folds, fold_indices(103, 4, random_state=42)))
+
+
+def test_cross_validation_outputs(project_dir):
+    pipeline = TrainingPipeline(cv=True, cv_folds=2, cv_workers=1, use_cache=False,
+                                trainer_kwargs={"epochs": 1, "model_architecture": "dense"})
+    pipeline.run_pipeline()
+    cross_validation = CrossValidationTrainer()
+    n_rows = read_columnar_schema(cross_validation.transformed_data_dir)["n_rows"]
+
+    # One out-of-fold prediction per training row and one report entry per fold
+    oof_predictions = np.load(cross_validation.oof_predictions_path)
+    assert oof_predictions.shape == (n_rows,) and not np.isnan(oof_predictions).any()
+    with open(cross_validation.report_path) as f:
+        report = json.load(f)
+    assert report["rows"] == n_rows
+    assert [fold["fold"] for fold in report["folds"]] == [0, 1]
+    assert sum(fold["val_rows"] for fold in report["folds"]) == n_rows
+
+    # The registered model averages the fold models and takes the same feature rows as a single model
+    bundle_dir = pipeline.model_registry.bundle_dir(pipeline.model_version)
+    assert pipeline.model_registry.load_manifest(pipeline.model_version)["metadata"]["model_type"] == "mlp"
+    with open(os.path.join(bundle_dir, "model.pkl"), "rb") as f:
+        model = pickle.load(f)
+    assert isinstance(model.layers[-1], keras.layers.Average) and len(model.layers[-1].input) == 2
+    features = np.zeros((3, model.input_shape[1]), dtype=np.float32)
+    keras_predictions = model.predict(features, verbose=0)
+    assert keras_predictions.shape == (3, 1)
+    np.testing.assert_allclose(NumpyModelRuntime(os.path.join(bundle_dir, "model.npz")).predict(features),
+                               keras_predictions, rtol=1e-4, atol=1e-5)
@@ -0,0 +1,95 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.components.data_preprocessing import DataPreprocessing
+
+
+def make_preprocessing(tmp_path) -> DataPreprocessing:
+    preprocessing = DataPreprocessing()
+    preprocessing.data_preprocessing_config.preprocessing_state_path = str(tmp_path / "preprocessing_state.pkl")
+    return preprocessing
+
+
+def fit_statistics(preprocessing: DataPreprocessing, dataframe: pd.DataFrame) -> pd.DataFrame:
+    dataframe = preprocessing.fill_missing_values(dataframe)
+    dataframe = preprocessing.replace_zero_values(dataframe)
+    numeric_features, _ = preprocessing.types_of_columns(dataframe)
+    return preprocessing.remove_outliers(dataframe, numeric_features)
+
+
+def apply_statistics(preprocessing: DataPreprocessing, dataframe: pd.DataFrame) -> pd.DataFrame:
+    state = preprocessing.preprocessing_state
+    dataframe = preprocessing.fill_missing_values(dataframe, state=state)
+    dataframe = preprocessing.replace_zero_values(dataframe, state=state)
+    numeric_features, _ = preprocessing.types_of_columns(dataframe)
+    return preprocessing.remove_outliers(dataframe, numeric_features, state=state, clip=True)
+
+
+def test_preprocessing_state_round_trip(tmp_path):
+    fitting = make_preprocessing(tmp_path)
+    fit_statistics(fitting, generate_podcast_data(2000))
+    fitting.save_preprocessing_state()
+
+    loaded = make_preprocessing(tmp_path).load_preprocessing_state()
+
+    assert dataclasses.asdict(loaded) == dataclasses.asdict(fitting.preprocessing_state)
+    assert set(loaded.medians) == set(fitting.data_preprocessing_config.columns_to_fill)
+    assert loaded.lower_bounds and loaded.upper_bounds
+
+
+def test_inference_uses_training_statistics(tmp_path):
+    fitting = make_preprocessing(tmp_path)
+    fit_statistics(fitting, generate_podcast_data(2000))
+    fitting.save_preprocessing_state()
+
+    serving = make_preprocessing(tmp_path)
+    serving.load_preprocessing_state()
+    batch = generate_podcast_data(200, seed=7, include_target=False)
+    batch.loc[0, "Guest_Popularity_percentage"] = np.nan
+
+    # A row scored alone gets the same values as inside a batch, filled with the training median
+    single_row = apply_statistics(serving, batch.head(1).copy())
+    in_batch = apply_statistics(serving, batch.copy()).head(1)
+    pd.testing.assert_frame_equal(single_row, in_batch)
+    assert single_row.loc[0, "Guest_Popularity_percentage"] == pytest.approx(
+        fitting.preprocessing_state.medians["Guest_Popularity_percentage"])
+    # Inference clips instead of dropping rows
+    assert len(apply_statistics(serving, batch.copy())) == len(batch)
+
+
+def remove_outliers_column_by_column(dataframe: pd.DataFrame, lower_bounds: dict, upper_bounds: dict) -> pd.DataFrame:
+    # The filter remove_outliers used to run: one boolean index and frame copy per column
+    for col in lower_bounds:
+        dataframe = dataframe[(dataframe[col] >= lower_bounds[col]) & (dataframe[col] <= upper_bounds[col])]
+    return dataframe
+
+
+def test_one_pass_outlier_filter_matches_column_loop(tmp_path):
+    preprocessing = make_preprocessing(tmp_path)
+    dataframe = generate_podcast_data(5000)
+    # Extreme values in several columns, some in the same rows
+    dataframe.loc[[3, 10, 11], "Host_Popularity_percentage"] = 1e4
+    dataframe.loc[[10, 42], "Listening_Time_minutes"] = -500.0
+    numeric_features, _ = preprocessing.types_of_columns(dataframe)
+
+    filtered = preprocessing.remove_outliers(dataframe.copy(), numeric_features)
+    state = preprocessing.preprocessing_state
+
+    # All bounds come from the unfiltered frame, one quantile pass for every column
+    quartiles = dataframe[numeric_features].quantile([0.25, 0.75])
+    iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+    assert state.lower_bounds == pytest.approx((quartiles.loc[0.25] - 1.5 * iqr).to_dict())
+    assert state.upper_bounds == pytest.approx((quartiles.loc[0.75] + 1.5 * iqr).to_dict())
+
+    expected = remove_outliers_column_by_column(dataframe, state.lower_bounds, state.upper_bounds)
+    pd.testing.assert_frame_equal(filtered, expected)
+    assert not filtered.index.isin([3, 10, 11, 42]).any()
+
+    # With saved bounds the single mask keeps exactly the rows the column loop keeps
+    batch = generate_podcast_data(1000, seed=3)
+    pd.testing.assert_frame_equal(preprocessing.remove_outliers(batch.copy(), numeric_features, state=state),
+                                  remove_outliers_column_by_column(batch, state.lower_bounds, state.upper_bounds))
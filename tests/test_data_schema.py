@@ -0,0 +1,57 @@
+import io
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.utils.data_schema import DataSchema, SchemaValidationError
+
+
+def test_valid_frame_passes():
+    schema = DataSchema()
+    schema.validate(generate_podcast_data(20, include_target=False))
+    schema.validate(generate_podcast_data(20), include_target=True)
+
+
+def test_missing_columns_are_named():
+    schema = DataSchema()
+    dataframe = generate_podcast_data(20, include_target=False).drop(columns=["Genre", "Number_of_Ads"])
+
+    with pytest.raises(SchemaValidationError, match=r"\['Genre', 'Number_of_Ads'\]"):
+        schema.validate(dataframe)
+    # The target is only required for training data
+    with pytest.raises(SchemaValidationError, match="Listening_Time_minutes"):
+        schema.validate_columns(list(generate_podcast_data(20, include_target=False).columns), include_target=True)
+
+
+def test_values_not_matching_the_schema_are_rejected():
+    schema = DataSchema()
+    dataframe = generate_podcast_data(20, include_target=False)
+    dataframe["Number_of_Ads"] = dataframe["Number_of_Ads"].astype(object)
+    dataframe.loc[3, "Number_of_Ads"] = "many"
+    dataframe.loc[[1, 2], "id"] = np.nan
+
+    with pytest.raises(SchemaValidationError) as error:
+        schema.validate(dataframe)
+    assert "non-numeric values in ['Number_of_Ads']" in str(error.value)
+    assert "2 rows without an id" in str(error.value)
+
+
+def test_missing_feature_values_are_allowed():
+    schema = DataSchema()
+    dataframe = generate_podcast_data(20, include_target=False)
+    dataframe.loc[0, ["Episode_Length_minutes", "Genre"]] = np.nan
+
+    schema.validate(dataframe)
+
+
+def test_read_csv_uses_compact_dtypes():
+    schema = DataSchema()
+    csv_text = generate_podcast_data(20).to_csv(index=False)
+
+    dataframe = schema.read_csv(io.StringIO(csv_text))
+
+    assert dataframe["id"].dtype == np.int32
+    assert dataframe["Episode_Length_minutes"].dtype == np.float32
+    assert dataframe["Genre"].dtype == "category"
+    schema.validate(dataframe, include_target=True)
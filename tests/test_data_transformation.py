@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.components.data_transformation import DataTransformation
+
+TRAIN_ROWS = pd.DataFrame({
+    "Podcast_Name": ["Tech Talk", "Daily News", "Tech Talk", "Mystery Hour"],
+    "Episode_Title": ["Episode 1", "Episode 7", "Episode 2", "Episode 1"],
+    "Genre": ["Technology", "News", "Technology", "True Crime"],
+    "Publication_Day": ["Monday", "Friday", "Monday", "Sunday"],
+    "Publication_Time": ["Morning", "Night", "Evening", "Night"],
+    "Episode_Sentiment": ["Positive", "Neutral", "Negative", "Neutral"],
+})
+
+
+def make_transformation(tmp_path) -> DataTransformation:
+    transformation = DataTransformation()
+    config = transformation.data_transformation_config
+    config.podcast_encoder_path = str(tmp_path / "podcast_encoder.pkl")
+    config.title_encoder_path = str(tmp_path / "title_encoder.pkl")
+    config.other_encoder_path = str(tmp_path / "other_cat_encoder.pkl")
+    return transformation
+
+
+def fit_encoders(tmp_path) -> pd.DataFrame:
+    transformation = make_transformation(tmp_path)
+    return transformation.other_columns_encoding(transformation.label_encoding(TRAIN_ROWS.copy()))
+
+
+def transform_only(tmp_path, dataframe: pd.DataFrame) -> pd.DataFrame:
+    transformation = make_transformation(tmp_path)
+    return transformation.transform_other_columns_encoding(transformation.transform_label_encoding(dataframe.copy()))
+
+
+def test_transform_only_matches_fitted_codes(tmp_path):
+    fitted = fit_encoders(tmp_path)
+    transformed = transform_only(tmp_path, TRAIN_ROWS)
+
+    for col in ["Podcast_ID", "Title_ID", "Genre", "Publication_Day", "Publication_Time", "Episode_Sentiment"]:
+        np.testing.assert_array_equal(transformed[col].to_numpy(), fitted[col].to_numpy())
+
+
+def test_transform_only_maps_unseen_categories_to_one_bucket(tmp_path):
+    fit_encoders(tmp_path)
+    rows = TRAIN_ROWS.head(2).copy()
+    rows.loc[1, ["Podcast_Name", "Genre"]] = ["Brand New Show", "Comedy"]
+
+    transformed = transform_only(tmp_path, rows)
+
+    # Known values keep their codes, unseen ones get the code after the last known one
+    assert transformed.loc[0, "Podcast_ID"] == 2
+    assert transformed.loc[1, "Podcast_ID"] == TRAIN_ROWS["Podcast_Name"].nunique()
+    assert transformed.loc[1, "Genre"] == TRAIN_ROWS["Genre"].nunique()
+    # Encoding never refits: the saved vocabularies are unchanged
+    assert "Brand New Show" not in make_transformation(tmp_path).load_fitted_encoders()["Podcast_Name"]
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.exceptions import CustomException
+from src.pipeline.micro_batcher import MicroBatcher
+
+
+class DoublingModel:
+    # Doubles "x" and fails on any batch holding a negative value, recording the size of every call
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        self.calls.append(len(dataframe))
+        if (dataframe["x"] < 0).any():
+            raise ValueError("negative value")
+        return pd.DataFrame({"y": dataframe["x"] * 2})
+
+
+async def submit_together(model: DoublingModel, requests: list) -> list:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        micro_batcher = MicroBatcher(model, executor, max_batch_rows=100, max_wait_ms=50)
+        await micro_batcher.start()
+        try:
+            return await asyncio.gather(*(micro_batcher.submit(pd.DataFrame({"x": values})) for values in requests),
+                                        return_exceptions=True)
+        finally:
+            await micro_batcher.stop()
+
+
+def test_concurrent_requests_share_one_model_call():
+    model = DoublingModel()
+    results = asyncio.run(submit_together(model, [[1], [2, 3], [4]]))
+
+    assert model.calls == [4]
+    assert [result["y"].tolist() for result in results] == [[2], [4, 6], [8]]
+
+
+def test_failing_request_does_not_fail_its_batch():
+    model = DoublingModel()
+    results = asyncio.run(submit_together(model, [[1], [-1], [3]]))
+
+    # The merged call fails, then every request is retried on its own
+    assert model.calls == [3, 1, 1, 1]
+    assert results[0]["y"].tolist() == [2]
+    assert isinstance(results[1], CustomException)
+    assert results[2]["y"].tolist() == [6]
+
+
+def test_single_request_failure_is_raised():
+    model = DoublingModel()
+    [result] = asyncio.run(submit_together(model, [[-1]]))
+
+    # Nothing to retry separately: the one failed call is the request's error
+    assert isinstance(result, CustomException)
+    assert model.calls == [1]
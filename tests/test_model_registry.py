@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.exceptions import CustomException
+from src.utils.model_registry import ModelRegistry
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_files(tmp_path, model_content: str) -> dict:
+    files = {"model.pkl": tmp_path / "model.pkl", "preprocessing_state.pkl": tmp_path / "preprocessing_state.pkl"}
+    files["model.pkl"].write_text(model_content)
+    files["preprocessing_state.pkl"].write_text("state")
+    return {name: str(path) for name, path in files.items()}
+
+
+def make_registry(tmp_path, keep_versions: int = 10) -> ModelRegistry:
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    registry.keep_versions = keep_versions
+    return registry
+
+
+def test_register_writes_a_bundle_and_moves_latest(tmp_path):
+    registry = make_registry(tmp_path)
+    assert registry.latest_version() is None
+
+    version = registry.register(write_files(tmp_path, "model 1"), metadata={"model_type": "gbdt"})
+
+    assert registry.latest_version() == version
+    assert registry.list_versions() == [version]
+    manifest = registry.load_manifest(version)
+    assert set(manifest["files"]) == {"model.pkl", "preprocessing_state.pkl"}
+    assert manifest["metadata"] == {"model_type": "gbdt"}
+    with open(os.path.join(registry.bundle_dir(version), "model.pkl")) as f:
+        assert f.read() == "model 1"
+    assert registry.verify(version)
+
+
+def test_identical_files_reuse_the_version(tmp_path):
+    registry = make_registry(tmp_path)
+    first = registry.register(write_files(tmp_path, "model 1"))
+    second = registry.register(write_files(tmp_path, "model 2"))
+
+    assert second != first and registry.latest_version() == second
+    # Re-registering the first files (e.g. a stage restored from the cache) points LATEST back at their bundle
+    assert registry.register(write_files(tmp_path, "model 1")) == first
+    assert registry.latest_version() == first
+    assert len(registry.list_versions()) == 2
+
+
+def test_promote_rolls_back(tmp_path):
+    registry = make_registry(tmp_path)
+    first = registry.register(write_files(tmp_path, "model 1"))
+    registry.register(write_files(tmp_path, "model 2"))
+
+    registry.set_latest(first)
+
+    assert registry.latest_version() == first
+    with pytest.raises(CustomException):
+        registry.set_latest("20000101_000000_unknown")
+    assert registry.latest_version() == first
+
+
+def test_prune_keeps_the_latest_version(tmp_path):
+    registry = make_registry(tmp_path, keep_versions=2)
+    versions = [registry.register(write_files(tmp_path, f"model {i}")) for i in range(4)]
+
+    assert len(registry.list_versions()) == 2
+    assert versions[-1] in registry.list_versions()
+
+    # A promoted version is kept however old it is
+    oldest = registry.list_versions()[0]
+    registry.set_latest(oldest)
+    registry.keep_versions = 1
+    registry.prune()
+    assert registry.list_versions() == [oldest]
+
+
+def test_verify_detects_a_modified_bundle(tmp_path):
+    registry = make_registry(tmp_path)
+    version = registry.register(write_files(tmp_path, "model 1"))
+    model_path = os.path.join(registry.bundle_dir(version), "model.pkl")
+
+    os.chmod(model_path, 0o644)
+    with open(model_path, "w") as f:
+        f.write("tampered")
+
+    assert not registry.verify(version)
+
+
+def run_registry_command(*args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "src.utils.model_registry", *args], capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": REPO_DIR})
+
+
+def test_check_command_accepts_the_trained_bundle(workspace):
+    result = run_registry_command("check")
+
+    assert result.returncode == 0, result.stderr
+    assert ModelRegistry().latest_version() in result.stdout
+
+
+def test_check_command_fails_without_a_bundle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = run_registry_command("check")
+
+    assert result.returncode != 0
+    assert "No model bundle" in result.stderr
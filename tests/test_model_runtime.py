@@ -0,0 +1,96 @@
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import HistGradientBoostingRegressor
+from tensorflow import keras
+
+from src.components.model_trainer import ModelTrainer
+from src.pipeline.model_runtime import NumpyModelRuntime, GBDTModelRuntime
+from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.utils.model_registry import ModelRegistry
+
+FEATURE_COLUMNS = ["id", "Podcast_ID", "Episode_Length_minutes", "Title_ID", "Number_of_Ads"]
+TABLE_SIZES = {"Podcast_ID": 7, "Title_ID": 11}
+
+
+def make_features(n_rows: int = 64) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(n_rows, len(FEATURE_COLUMNS))).astype(np.float32)
+    # ID columns hold integer codes, some past the table size to cover the modulo lookup
+    for column in TABLE_SIZES:
+        features[:, FEATURE_COLUMNS.index(column)] = rng.integers(0, 20, size=n_rows)
+    return features
+
+
+def make_model(trainer: ModelTrainer):
+    return trainer.create_model(len(FEATURE_COLUMNS), FEATURE_COLUMNS, TABLE_SIZES, units=8, num_layers=2)
+
+
+def assert_numpy_parity(trainer: ModelTrainer, model, tmp_path):
+    trainer.numpy_model_save_path = str(tmp_path / "model.npz")
+    features = make_features()
+    # export_numpy_model runs the same check and raises on a mismatch
+    trainer.export_numpy_model(model, features)
+
+    keras_predictions = model.predict(features, verbose=0)
+    numpy_predictions = NumpyModelRuntime(trainer.numpy_model_save_path).predict(features)
+    assert numpy_predictions.shape == keras_predictions.shape
+    np.testing.assert_allclose(numpy_predictions, keras_predictions, rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize("architecture", ["dense", "embedding"])
+def test_numpy_runtime_matches_keras(architecture, tmp_path):
+    trainer = ModelTrainer(model_architecture=architecture)
+    assert_numpy_parity(trainer, make_model(trainer), tmp_path)
+
+
+@pytest.mark.parametrize("architecture", ["dense", "embedding"])
+def test_numpy_runtime_matches_keras_fold_ensemble(architecture, tmp_path):
+    # Same layout as CrossValidationTrainer.ensemble_model: the average of members with identical layers
+    trainer = ModelTrainer(model_architecture=architecture)
+    inputs = keras.Input(shape=(len(FEATURE_COLUMNS),))
+    outputs = keras.layers.Average()([make_model(trainer)(inputs) for _ in range(3)])
+    assert_numpy_parity(trainer, keras.Model(inputs, outputs), tmp_path)
+
+
+def test_numpy_runtime_single_row(tmp_path):
+    trainer = ModelTrainer(model_architecture="dense")
+    model = make_model(trainer)
+    assert_numpy_parity(trainer, model, tmp_path)
+
+    row = make_features(1)
+    np.testing.assert_allclose(NumpyModelRuntime(trainer.numpy_model_save_path).predict(row),
+                               model.predict(row, verbose=0), rtol=1e-4, atol=1e-5)
+
+
+def test_gbdt_runtime_matches_scikit_learn(tmp_path):
+    features = make_features(500)
+    target = features @ np.arange(len(FEATURE_COLUMNS), dtype=np.float32) + features[:, 1] % 3
+    categorical = np.isin(FEATURE_COLUMNS, list(TABLE_SIZES))
+    model = HistGradientBoostingRegressor(max_iter=20, categorical_features=categorical, random_state=0)
+    model.fit(features, target)
+    with open(tmp_path / "model_gbdt.pkl", "wb") as f:
+        pickle.dump(model, f)
+
+    runtime = GBDTModelRuntime(str(tmp_path / "model_gbdt.pkl"))
+    runtime.warm_up()
+
+    # Same (rows, 1) float32 layout as the other backends
+    predictions = runtime.predict(features)
+    assert predictions.shape == (len(features), 1) and predictions.dtype == np.float32
+    np.testing.assert_allclose(predictions[:, 0], model.predict(features), rtol=1e-6)
+    np.testing.assert_allclose(runtime.predict(features[:1])[:, 0], model.predict(features[:1]), rtol=1e-6)
+    assert runtime.predict(features[:0]).shape == (0, 1)
+
+
+def test_bundle_backend_follows_manifest(workspace, monkeypatch):
+    # The workspace bundle holds a gbdt model, which the MLP backends cannot serve
+    monkeypatch.setenv("MODEL_BACKEND", "numpy")
+    registry = ModelRegistry()
+    pipeline = PredictionPipeline(use_cache=False, bundle_dir=registry.bundle_dir(registry.latest_version()))
+
+    assert pipeline.model_backend == "gbdt"
+    assert isinstance(pipeline.model_runtime, GBDTModelRuntime)
+    rows = pipeline.data_schema.read_csv("dataset/test.csv", include_target=False, nrows=100)
+    assert len(pipeline.initiate_prediction(rows)) == len(rows)
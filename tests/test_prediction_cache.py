@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from src.pipeline.prediction_pipeline import PredictionPipeline
+from src.utils import prediction_cache
+from src.utils.prediction_cache import PredictionCache, row_keys
+
+# Above 2**63, so the unsigned-to-signed conversion of the SQLite keys is exercised
+KEYS = np.array([1, 2, 3, 2**63 + 5, 2**64 - 1], dtype=np.uint64)
+PREDICTIONS = np.array([10.0, 20.0, 30.0, 40.0, 50.0], dtype=np.float32)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def make_cache(monkeypatch, **kwargs) -> tuple:
+    clock = FakeClock()
+    monkeypatch.setattr(prediction_cache, "time", clock)
+    cache = PredictionCache(**{"max_entries": 100, "ttl_seconds": 60, **kwargs})
+    cache.set_model_version("v1")
+    return cache, clock
+
+
+def test_hits_and_misses(monkeypatch):
+    cache, _ = make_cache(monkeypatch)
+    cache.put_many(KEYS[:3], PREDICTIONS[:3])
+
+    predictions, hit_mask = cache.get_many(KEYS)
+
+    assert hit_mask.tolist() == [True, True, True, False, False]
+    np.testing.assert_array_equal(predictions[:3], PREDICTIONS[:3])
+    assert np.isnan(predictions[3:]).all()
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_rows_are_evicted(monkeypatch):
+    cache, _ = make_cache(monkeypatch, max_entries=3)
+    cache.put_many(KEYS[:3], PREDICTIONS[:3])
+    cache.get_many(KEYS[:1])
+    cache.put_many(KEYS[3:4], PREDICTIONS[3:4])
+
+    _, hit_mask = cache.get_many(KEYS[:4])
+
+    assert hit_mask.tolist() == [True, False, True, True]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = make_cache(monkeypatch)
+    cache.put_many(KEYS, PREDICTIONS)
+
+    clock.now += 59
+    assert cache.get_many(KEYS)[1].all()
+    clock.now += 2
+    assert not cache.get_many(KEYS)[1].any()
+    assert cache.stats()["expired"] == len(KEYS)
+
+
+def test_new_model_version_invalidates_entries(monkeypatch, tmp_path):
+    cache, _ = make_cache(monkeypatch, max_entries=2, disk_path=str(tmp_path / "cache.sqlite"))
+    cache.put_many(KEYS, PREDICTIONS)
+
+    cache.set_model_version("v2")
+
+    assert not cache.get_many(KEYS)[1].any()
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["disk_entries"] == 0
+    # Setting the same version again keeps the entries
+    cache.put_many(KEYS[:1], PREDICTIONS[:1])
+    cache.set_model_version("v2")
+    assert cache.get_many(KEYS[:1])[1].all()
+
+
+def test_evicted_rows_spill_to_sqlite(monkeypatch, tmp_path):
+    disk_path = str(tmp_path / "cache.sqlite")
+    cache, _ = make_cache(monkeypatch, max_entries=2, disk_path=disk_path)
+    cache.put_many(KEYS, PREDICTIONS)
+    assert cache.stats()["spilled"] == 3 and cache.stats()["entries"] == 2
+
+    predictions, hit_mask = cache.get_many(KEYS)
+
+    assert hit_mask.all()
+    np.testing.assert_array_equal(predictions, PREDICTIONS)
+    assert cache.stats()["disk_hits"] == 3
+
+    # The spill outlives the process that wrote it; the lookups above spilled the last two rows as well
+    reopened, _ = make_cache(monkeypatch, max_entries=2, disk_path=disk_path)
+    predictions, hit_mask = reopened.get_many(KEYS)
+    assert hit_mask.all()
+    np.testing.assert_array_equal(predictions, PREDICTIONS)
+
+
+def test_full_disk_cache_is_pruned(monkeypatch, tmp_path):
+    cache, _ = make_cache(monkeypatch, max_entries=1, disk_path=str(tmp_path / "cache.sqlite"), disk_max_entries=10)
+    keys = np.arange(1, 30, dtype=np.uint64)
+    for key in keys:
+        cache.put_many(np.array([key]), np.array([float(key)]))
+
+    assert cache.stats()["disk_entries"] <= 10
+
+
+def test_row_keys_do_not_depend_on_dtypes():
+    rows = pd.DataFrame({"id": [1, 2], "Genre": ["News", "Comedy"], "Number_of_Ads": [1.0, 2.0]})
+    compact = rows.astype({"id": np.int32, "Genre": "category", "Number_of_Ads": np.float32})
+    columns = list(rows.columns)
+
+    np.testing.assert_array_equal(row_keys(rows, columns), row_keys(compact, columns))
+    assert row_keys(rows, columns)[0] != row_keys(rows, columns)[1]
+
+
+def test_cached_predictions_match_scored_ones(workspace):
+    pipeline = PredictionPipeline(use_cache=True)
+    rows = pipeline.data_schema.read_csv("dataset/test.csv", include_target=False, nrows=200)
+
+    scored = pipeline.initiate_prediction(rows.copy())
+    cached = pipeline.initiate_prediction(rows.copy())
+
+    pd.testing.assert_frame_equal(cached, scored)
+    assert pipeline.prediction_cache.stats()["hits"] == len(rows)
@@ -0,0 +1,65 @@
+import os
+
+from src.pipeline.training_pipeline import TrainingPipeline
+from src.utils.stage_cache import StageCache
+
+
+def write_file(file_path, content: str):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(content)
+
+
+def read_file(file_path) -> str:
+    with open(file_path) as f:
+        return f.read()
+
+
+def test_store_and_restore_outputs(tmp_path):
+    stage_cache = StageCache(str(tmp_path / "cache"))
+    outputs = {"cleaned_data": str(tmp_path / "run" / "cleaned_data"), "state.pkl": str(tmp_path / "run" / "state.pkl")}
+    write_file(os.path.join(outputs["cleaned_data"], "column.npy"), "columnar")
+    write_file(outputs["state.pkl"], "state")
+    key = stage_cache.stage_key({"upstream": "abc", "config": {"chunk_size": 10}})
+
+    assert stage_cache.lookup("data_preprocessing", key) is None
+    manifest = stage_cache.store("data_preprocessing", key, {"upstream": "abc"}, outputs)
+    assert stage_cache.lookup("data_preprocessing", key) == manifest
+    # Another stage or another fingerprint is a miss
+    assert stage_cache.lookup("data_transformation", key) is None
+    assert stage_cache.lookup("data_preprocessing", stage_cache.stage_key({"upstream": "abd"})) is None
+
+    write_file(outputs["state.pkl"], "overwritten by a later run")
+    stage_cache.restore("data_preprocessing", key, outputs)
+    assert read_file(outputs["state.pkl"]) == "state"
+    assert read_file(os.path.join(outputs["cleaned_data"], "column.npy")) == "columnar"
+
+
+def test_file_fingerprint_follows_content(tmp_path):
+    stage_cache = StageCache(str(tmp_path / "cache"))
+    data_file_path = str(tmp_path / "train.csv")
+    write_file(data_file_path, "id\n1\n")
+    fingerprint = stage_cache.file_fingerprint(data_file_path)
+
+    assert stage_cache.file_fingerprint(data_file_path) == fingerprint
+    write_file(data_file_path, "id\n2\n")
+    assert stage_cache.file_fingerprint(data_file_path) != fingerprint
+
+
+def run_stages(**kwargs) -> dict:
+    pipeline = TrainingPipeline(trainer_kwargs={"model_type": "gbdt"}, **kwargs)
+    return {result["stage"]: result["cached"] for result in pipeline.run_pipeline()}
+
+
+def test_unchanged_stages_are_restored(project_dir):
+    assert run_stages() == {"data_preprocessing": False, "data_transformation": False, "model_training": False}
+    assert run_stages() == {"data_preprocessing": True, "data_transformation": True, "model_training": True}
+
+    # A schema change reruns preprocessing and, through the upstream key, every stage after it
+    with open(os.path.join("data_schema", "data.yaml"), "a") as f:
+        f.write("\n# edited\n")
+    assert run_stages() == {"data_preprocessing": False, "data_transformation": False, "model_training": False}
+
+    # Without the cache every stage runs
+    assert run_stages(use_cache=False) == {"data_preprocessing": False, "data_transformation": False,
+                                           "model_training": False}
@@ -0,0 +1,66 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_data import generate_podcast_data
+from src.components.data_preprocessing import DataPreprocessing
+from src.components.data_transformation import DataTransformation
+from src.components.streaming_preprocessing import StreamingDataPreprocessing
+from src.utils.columnar_storage import load_columnar_arrays, load_columnar_frame
+
+
+def write_dataset(tmp_path, n_rows: int = 3000) -> str:
+    dataframe = generate_podcast_data(n_rows)
+    # Extreme rows the outlier filter drops, one of them the only row of its podcast
+    dataframe.loc[[5, 17], "Episode_Length_minutes"] = 1e4
+    dataframe["Podcast_Name"] = dataframe["Podcast_Name"].cat.add_categories("Dropped Show")
+    dataframe.loc[17, "Podcast_Name"] = "Dropped Show"
+    data_file_path = str(tmp_path / "train.csv")
+    dataframe.to_csv(data_file_path, index=False)
+    return data_file_path
+
+
+def point_at(tmp_path, preprocessing: DataPreprocessing, transformation: DataTransformation, data_file_path: str):
+    preprocessing.data_file_path = data_file_path
+    preprocessing.data_preprocessing_config.cleaned_data_dir = str(tmp_path / "cleaned_data")
+    preprocessing.data_preprocessing_config.preprocessing_state_path = str(tmp_path / "preprocessing_state.pkl")
+    config = transformation.data_transformation_config
+    config.transformed_data_dir = str(tmp_path / "transformed_data")
+    config.podcast_encoder_path = str(tmp_path / "podcast_encoder.pkl")
+    config.title_encoder_path = str(tmp_path / "title_encoder.pkl")
+    config.other_encoder_path = str(tmp_path / "other_cat_encoder.pkl")
+
+
+def run_in_memory(tmp_path, data_file_path: str):
+    preprocessing, transformation = DataPreprocessing(), DataTransformation()
+    point_at(tmp_path, preprocessing, transformation, data_file_path)
+    artifact = preprocessing.initiate_data_preprocessing()
+    cleaned = load_columnar_frame(artifact.cleaned_data_dir, mmap_mode="c")
+    artifact = transformation.initiate_data_transformation(cleaned, transformation.columns_to_encode)
+    return preprocessing.preprocessing_state, load_columnar_arrays(artifact.transformed_data_dir)
+
+
+def run_streaming(tmp_path, data_file_path: str, chunk_size: int):
+    streaming = StreamingDataPreprocessing(chunk_size=chunk_size)
+    point_at(tmp_path, streaming.data_preprocessing, streaming.data_transformation, data_file_path)
+    streaming.data_file_path = data_file_path
+    streaming.transformed_data_dir = streaming.data_transformation.data_transformation_config.transformed_data_dir
+    artifact = streaming.initiate_streaming_preprocessing()
+    return streaming.data_preprocessing.preprocessing_state, load_columnar_arrays(artifact.transformed_data_dir)
+
+
+def test_streaming_matches_in_memory_preprocessing(tmp_path):
+    data_file_path = write_dataset(tmp_path)
+    in_memory_state, in_memory = run_in_memory(tmp_path / "in_memory", data_file_path)
+    # Chunks that do not divide the row count; the statistics sample holds every row, so it sees what pandas sees
+    streaming_state, streaming = run_streaming(tmp_path / "streaming", data_file_path, chunk_size=700)
+
+    for field, values in dataclasses.asdict(in_memory_state).items():
+        assert getattr(streaming_state, field) == pytest.approx(values), field
+
+    assert list(streaming) == list(in_memory)
+    assert len(in_memory["id"]) < 3000
+    for col, values in in_memory.items():
+        assert streaming[col].dtype == values.dtype, col
+        np.testing.assert_allclose(streaming[col], values, rtol=1e-6, err_msg=col)